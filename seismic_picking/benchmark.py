@@ -0,0 +1,337 @@
+"""
+Benchmarks for the Seismic Picking Pipeline
+Compare optimized code paths against the original implementations
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from data.data_loader import SeismicDataLoader
+from utils.augmentation import SeismicAugmentor
+
+
+def time_call(func, repeats=3):
+    """
+    Best wall-clock time of func() over repeats runs
+
+    Returns: (seconds, result of the last call)
+    """
+    best = np.inf
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def synthetic_batch(batch_size, sampling_rate=100, window_size=30, seed=0):
+    """Batch of preprocessed synthetic windows (B, T, 3)"""
+    loader = SeismicDataLoader(None, sampling_rate, window_size)
+    X, _, _, _ = loader.synthetic_windows(batch_size, seed=seed)
+    return X[:batch_size]
+
+
+def benchmark_augmentation(batch_size=256, sampling_rate=100, repeats=3):
+    """
+    Frequency masking and full augmentation: per-sample loop vs batch API
+    """
+    print("=" * 60)
+    print("AUGMENTATION BENCHMARK")
+    print("=" * 60)
+
+    X = synthetic_batch(batch_size, sampling_rate)
+    augmentor = SeismicAugmentor(augmentation_prob=1.0, seed=0)
+    rng = np.random.default_rng(0)
+    low_freq = rng.uniform(5, 10, batch_size)
+    high_freq = low_freq + rng.uniform(1, 5, batch_size)
+
+    print(f"Batch: {X.shape} {X.dtype}")
+
+    # Same bands through both band-stop implementations
+    t_loop, reference = time_call(lambda: np.array([
+        augmentor._bandstop(X[i], sampling_rate, low_freq[i], high_freq[i])
+        for i in range(batch_size)
+    ]), repeats)
+    t_batch, batched = time_call(
+        lambda: augmentor._bandstop_fft_batch(X, sampling_rate, low_freq, high_freq), repeats)
+
+    error = np.abs(batched - reference)
+    edge = sampling_rate  # filtfilt and the FFT path pad the ends differently
+    print("\nFrequency masking (all samples masked)")
+    print(f"  filtfilt per sample: {t_loop * 1000:8.1f} ms")
+    print(f"  rFFT batch:          {t_batch * 1000:8.1f} ms  ({t_loop / t_batch:.1f}x)")
+    print(f"  max |diff| interior: {error[:, edge:-edge].max():.2e}, at edges: {error.max():.2e}")
+
+    augmentor.prob = 0.5
+    t_loop, _ = time_call(
+        lambda: np.array([augmentor.apply_all_augmentations(x, sampling_rate) for x in X]), repeats)
+    t_batch, _ = time_call(lambda: augmentor.augment_batch(X, sampling_rate), repeats)
+
+    print("\nFull augmentation (augmentation_prob=0.5)")
+    print(f"  apply_all_augmentations loop: {t_loop * 1000:8.1f} ms")
+    print(f"  augment_batch:                {t_batch * 1000:8.1f} ms  ({t_loop / t_batch:.1f}x)")
+    print(f"  throughput: {batch_size / t_loop:,.0f} -> {batch_size / t_batch:,.0f} windows/s")
+
+
+def benchmark_scan(duration=600, sampling_rate=100, window_size=30, repeats=3):
+    """
+    Windowed SeismicCNNPicker inference vs the single-pass SeismicCNNScanner
+    """
+    from models.cnn_picker import SeismicCNNPicker
+
+    print("=" * 60)
+    print("SCANNING BENCHMARK")
+    print("=" * 60)
+
+    n_samples = window_size * sampling_rate
+    picker = SeismicCNNPicker(input_shape=(n_samples, 3, 1))
+    model = picker.build_model()
+    scanner = picker.to_scanner()
+
+    trace = np.random.default_rng(0).standard_normal(
+        (duration * sampling_rate, 3)).astype(np.float32)
+    views = np.lib.stride_tricks.sliding_window_view(trace, n_samples, axis=0)
+
+    print(f"Trace: {duration}s ({len(trace)} samples), window {n_samples} samples, "
+          f"model stride {scanner.stride}")
+
+    window_step = n_samples // 4
+    scan_step = round(window_step / scanner.stride) * scanner.stride
+
+    def windowed(step):
+        windows = views[::step].transpose(0, 2, 1)[..., np.newaxis]
+        return model.predict(windows, batch_size=256, verbose=0)
+
+    scanner.scan(trace[:2 * n_samples], step=scan_step)  # Build / trace once
+    t_window, _ = time_call(lambda: windowed(window_step), repeats)
+    t_scan, (_, scanned) = time_call(lambda: scanner.scan(trace, step=scan_step), repeats)
+    t_approx, _ = time_call(
+        lambda: scanner.scan(trace, step=scan_step, exact_edges=False), repeats)
+    error = np.abs(scanned - windowed(scan_step)).max()
+
+    print(f"\nWindowed, step {window_step}:        {t_window:8.2f} s")
+    print(f"Scanner, step {scan_step}:         {t_scan:8.2f} s  ({t_window / t_scan:.1f}x)")
+    print(f"Scanner, no edge correction: {t_approx:8.2f} s  ({t_window / t_approx:.1f}x)")
+    print(f"max |diff| vs windowed at step {scan_step}: {error:.2e}")
+
+    # Finest step: one window position per model stride
+    short = trace[:4 * n_samples]
+    scanner.scan(short)
+    t_dense, (starts, dense) = time_call(lambda: scanner.scan(short), repeats)
+    windows = views[starts].transpose(0, 2, 1)[..., np.newaxis]
+    t_dense_window, reference = time_call(
+        lambda: model.predict(windows, batch_size=256, verbose=0), repeats)
+
+    print(f"\nStep {scanner.stride} on {len(short)} samples ({len(starts)} positions)")
+    print(f"  windowed: {t_dense_window:8.2f} s")
+    print(f"  scanner:  {t_dense:8.2f} s  ({t_dense_window / t_dense:.1f}x)")
+    print(f"  max |diff|: {np.abs(dense - reference).max():.2e}")
+
+
+def count_flops(model):
+    """
+    FLOPs (2 x multiply-adds) of the conv and dense layers for one input
+    Returns: (flops, activation elements of all layer outputs)
+    """
+    from tensorflow.keras import layers
+
+    flops = 0
+    activations = 0
+    for layer in model.layers:
+        if isinstance(layer, layers.InputLayer):
+            continue
+        output_shape = layer.output.shape[1:]
+        activations += int(np.prod(output_shape))
+        if isinstance(layer, (layers.Conv1D, layers.Conv2D)):
+            positions = np.prod(output_shape[:-1])
+            flops += 2 * int(np.prod(layer.kernel.shape)) * int(positions)
+        elif isinstance(layer, layers.Dense):
+            flops += 2 * int(np.prod(layer.kernel.shape))
+
+    return flops, activations
+
+
+def benchmark_models(batch_size=64, sampling_rate=100, window_size=30, repeats=3):
+    """
+    FLOPs, activation size and CPU latency of the Conv2D pickers vs their Conv1D variants
+    """
+    from models.cnn_picker import SeismicCNNPicker, UNetPicker, SeismicCNN1DPicker, UNet1DPicker
+
+    print("=" * 60)
+    print("MODEL BENCHMARK (Conv2D vs Conv1D)")
+    print("=" * 60)
+
+    n_samples = window_size * sampling_rate
+    X = synthetic_batch(batch_size, sampling_rate, window_size).astype(np.float32)
+    print(f"Batch: {X.shape}, {repeats} timing repeats (best); Act. MB = float32 layer outputs per window")
+
+    variants = [
+        ('CNN 2D', SeismicCNNPicker(input_shape=(n_samples, 3, 1)), X[..., np.newaxis]),
+        ('CNN 1D', SeismicCNN1DPicker(input_shape=(n_samples, 3)), X),
+        ('U-Net 2D', UNetPicker(input_shape=(n_samples, 3, 1)), X[..., np.newaxis]),
+        ('U-Net 1D', UNet1DPicker(input_shape=(n_samples, 3)), X),
+    ]
+
+    print(f"\n{'Model':<10} {'Params':>10} {'GFLOPs':>8} {'Act. MB':>8} "
+          f"{'1 window':>10} {f'batch {batch_size}':>10} {'windows/s':>10}")
+    for name, picker, inputs in variants:
+        model = picker.build_model()
+        flops, activations = count_flops(model)
+
+        single = inputs[:1]
+        model.predict_on_batch(single)
+        model.predict_on_batch(inputs)
+        t_single, _ = time_call(lambda: model.predict_on_batch(single), repeats)
+        t_batch, _ = time_call(lambda: model.predict_on_batch(inputs), repeats)
+
+        print(f"{name:<10} {model.count_params():>10,} {flops / 1e9:>8.3f} "
+              f"{activations * 4 / 2 ** 20:>8.1f} {t_single * 1000:>8.1f}ms "
+              f"{t_batch * 1000:>8.0f}ms {len(inputs) / t_batch:>10,.0f}")
+
+
+def benchmark_tflite(batch_size=64, sampling_rate=100, window_size=30, repeats=3, train_epochs=3):
+    """
+    Keras CNN picker vs float / dynamic-range / int8 TFLite exports on CPU
+    """
+    import tempfile
+    from models.cnn_picker import SeismicCNNPicker
+    from models.tflite import export_tflite, TFLitePicker
+
+    print("=" * 60)
+    print("TFLITE BENCHMARK")
+    print("=" * 60)
+
+    n_samples = window_size * sampling_rate
+    loader = SeismicDataLoader(None, sampling_rate, window_size)
+    X_train, y_train, _, _ = loader.synthetic_windows(4 * batch_size, seed=0)
+    X_eval, y_eval, _, _ = loader.synthetic_windows(batch_size, seed=1)
+    X_train, X_eval = X_train[..., np.newaxis], X_eval[:batch_size, ..., np.newaxis]
+    y_eval = y_eval[:batch_size]
+
+    # Briefly trained weights so accuracy and agreement are meaningful
+    model = SeismicCNNPicker(input_shape=(n_samples, 3, 1)).build_model()
+    model.fit(X_train, np.eye(3, dtype=np.float32)[y_train], batch_size=32,
+              epochs=train_epochs, verbose=0)
+    X_calibration = X_train[:256]
+
+    model.predict(X_eval, batch_size=batch_size, verbose=0)
+    t_keras, reference = time_call(
+        lambda: model.predict(X_eval, batch_size=batch_size, verbose=0), repeats)
+    labels = np.argmax(reference, axis=1)
+
+    print(f"Model trained {train_epochs} epochs on {len(X_train)} synthetic windows; "
+          f"int8 calibrated on {len(X_calibration)} of them")
+    print(f"Evaluation batch: {X_eval.shape}")
+    print(f"\n{'Backend':<16} {'Size MB':>8} {'ms/window':>10} {'Speedup':>8} "
+          f"{'max |dp|':>9} {'Agreement':>10} {'Accuracy':>9}")
+    print(f"{'Keras':<16} {'':>8} {1000 * t_keras / len(X_eval):>10.2f} {'1.0x':>8} "
+          f"{'':>9} {'':>10} {np.mean(labels == y_eval):>9.4f}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for quantization in ('float', 'dynamic', 'int8'):
+            path = os.path.join(tmp_dir, f'{quantization}.tflite')
+            size = export_tflite(model, path, quantization, calibration_windows=X_calibration)
+            picker = TFLitePicker(path)
+            picker.predict(X_eval, batch_size=batch_size)
+            t_lite, predictions = time_call(
+                lambda: picker.predict(X_eval, batch_size=batch_size), repeats)
+
+            lite_labels = np.argmax(predictions, axis=1)
+            print(f"{'TFLite ' + quantization:<16} {size / 2 ** 20:>8.2f} "
+                  f"{1000 * t_lite / len(X_eval):>10.2f} {t_keras / t_lite:>7.1f}x "
+                  f"{np.abs(predictions - reference).max():>9.4f} "
+                  f"{np.mean(lite_labels == labels):>10.2%} {np.mean(lite_labels == y_eval):>9.4f}")
+
+
+def benchmark_xla(batch_size=32, sampling_rate=100, window_size=30, repeats=3, train_steps=5):
+    """
+    Training steps/sec and predict latency with and without XLA (jit_compile)
+    """
+    from models.cnn_picker import SeismicCNNPicker
+    from models.compiled import CompiledPredictor
+
+    print("=" * 60)
+    print("XLA BENCHMARK")
+    print("=" * 60)
+
+    n_samples = window_size * sampling_rate
+    X = synthetic_batch(train_steps * batch_size, sampling_rate, window_size)[..., np.newaxis]
+    X = np.resize(X, (train_steps * batch_size, *X.shape[1:]))
+    y = np.eye(3, dtype=np.float32)[np.arange(len(X)) % 3]
+    X_batch = X[:batch_size]
+    print(f"Input: {X.shape[1:]}, batch {batch_size}, {train_steps} training steps per timing")
+
+    results = {}
+    for jit_compile in (False, True):
+        model = SeismicCNNPicker(input_shape=(n_samples, 3, 1)).build_model(jit_compile=jit_compile)
+
+        model.fit(X_batch, y[:batch_size], batch_size=batch_size, epochs=1, verbose=0)  # Compile
+        t_train, _ = time_call(
+            lambda: model.fit(X, y, batch_size=batch_size, epochs=1, verbose=0), repeats)
+
+        model.predict(X_batch, batch_size=batch_size, verbose=0)
+        t_predict, _ = time_call(
+            lambda: model.predict(X_batch, batch_size=batch_size, verbose=0), repeats)
+
+        predictor = CompiledPredictor(model, batch_size=batch_size, jit_compile=jit_compile)
+        single = CompiledPredictor(model, batch_size=1, jit_compile=jit_compile)
+        predictor.predict_on_batch(X_batch)
+        single.predict_on_batch(X_batch[:1])
+        t_function, _ = time_call(lambda: predictor.predict_on_batch(X_batch), repeats)
+        t_single, _ = time_call(lambda: single.predict_on_batch(X_batch[:1]), repeats)
+
+        results[jit_compile] = (train_steps / t_train, t_predict, t_function, t_single)
+
+    print(f"\n{'':<10} {'train steps/s':>14} {'model.predict':>14} "
+          f"{'fixed function':>15} {'1 window':>10}")
+    for jit_compile, (steps, t_predict, t_function, t_single) in results.items():
+        print(f"{'XLA' if jit_compile else 'default':<10} {steps:>14.2f} "
+              f"{t_predict * 1000:>12.0f}ms {t_function * 1000:>13.0f}ms {t_single * 1000:>8.1f}ms")
+
+    base, xla = results[False], results[True]
+    print(f"\nXLA speedup: training {xla[0] / base[0]:.2f}x, model.predict {base[1] / xla[1]:.2f}x, "
+          f"fixed function {base[2] / xla[2]:.2f}x (vs default model.predict {base[1] / xla[2]:.2f}x)")
+
+
+def main():
+    """
+    Command-line interface for benchmarks
+    """
+    parser = argparse.ArgumentParser(description='Seismic Picking Benchmarks')
+    parser.add_argument('benchmark', choices=['augment', 'scan', 'models', 'tflite', 'xla'],
+                        help='Benchmark to run')
+    parser.add_argument('--batch-size', type=int, default=256,
+                        help='Batch size (default: 256)')
+    parser.add_argument('--sampling-rate', type=int, default=100,
+                        help='Sampling rate in Hz (default: 100)')
+    parser.add_argument('--repeats', type=int, default=3,
+                        help='Timing repeats, best is reported (default: 3)')
+    parser.add_argument('--train-epochs', type=int, default=3,
+                        help='Epochs of synthetic training before the TFLite export (default: 3)')
+    parser.add_argument('--duration', type=int, default=600,
+                        help='Trace length in seconds for the scan benchmark (default: 600)')
+
+    args = parser.parse_args()
+
+    if args.benchmark == 'augment':
+        benchmark_augmentation(args.batch_size, args.sampling_rate, args.repeats)
+    elif args.benchmark == 'scan':
+        benchmark_scan(args.duration, args.sampling_rate, repeats=args.repeats)
+    elif args.benchmark == 'models':
+        benchmark_models(args.batch_size, args.sampling_rate, repeats=args.repeats)
+    elif args.benchmark == 'tflite':
+        benchmark_tflite(args.batch_size, args.sampling_rate, repeats=args.repeats,
+                         train_epochs=args.train_epochs)
+    elif args.benchmark == 'xla':
+        benchmark_xla(args.batch_size, args.sampling_rate, repeats=args.repeats)
+
+
+if __name__ == '__main__':
+    main()
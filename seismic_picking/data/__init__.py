@@ -1,3 +1,30 @@
 from .data_loader import SeismicDataLoader, SyntheticDataGenerator
+from .preprocessing import PreprocessingEngine
+from .waveform_store import WaveformStore
+from .streaming import StreamingDataset
+from .synthetic_stream import SyntheticStream
+from .continuous import ContinuousRecordReader
+from .splits import WindowSubset, file_groups, split_window_indices
+from .virtual_windows import VirtualWindowDataset
+from .shards import (ShardWriter, ShardedDataset, ShardSubset, split_shards, convert_csv_to_shards,
+                     shard_attrs)
 
-__all__ = ['SeismicDataLoader', 'SyntheticDataGenerator']
+__all__ = [
+    'SeismicDataLoader',
+    'SyntheticDataGenerator',
+    'PreprocessingEngine',
+    'WaveformStore',
+    'StreamingDataset',
+    'SyntheticStream',
+    'ContinuousRecordReader',
+    'WindowSubset',
+    'file_groups',
+    'split_window_indices',
+    'VirtualWindowDataset',
+    'ShardWriter',
+    'ShardedDataset',
+    'ShardSubset',
+    'split_shards',
+    'convert_csv_to_shards',
+    'shard_attrs'
+]
@@ -0,0 +1,145 @@
+"""
+Chunked Reader for Long Continuous Records
+Walks day-long CSV records in fixed-size blocks with bounded memory
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class ContinuousRecordReader:
+    """
+    Read, preprocess and window a long CSV record block by block
+
+    Only one raw block plus the filter padding and one window of processed
+    samples are kept in memory, regardless of record length.
+
+    Differences from preprocessing a whole file at once:
+    - Detrend and bandpass run on each block with filter_pad_seconds of
+      neighbouring samples on both sides, so block edges are seamless. The
+      bandpass removes the offset left by per-block detrending; without it
+      windows across block boundaries would see a DC step, so the filter
+      cannot be disabled here
+    - Normalization is applied per window (each window's channels are scaled
+      to a peak of 1) instead of per record
+    """
+
+    def __init__(self, filepath, loader, chunk_seconds=600, filter_pad_seconds=10,
+                 overlap=0.75, apply_filter=True):
+        """
+        Args:
+            filepath: CSV record path
+            loader: SeismicDataLoader providing sampling rate, window size and preprocessing
+            chunk_seconds: Length of each raw block read from the CSV
+            filter_pad_seconds: Context added on each side of a block before filtering
+            overlap: Window overlap (0.75 = 25% step)
+            apply_filter: Must be True (see class docstring); kept for API symmetry
+        """
+        self.filepath = filepath
+        self.loader = loader
+        self.chunk_samples = int(chunk_seconds * loader.sampling_rate)
+        self.pad = int(filter_pad_seconds * loader.sampling_rate)
+        self.step = int(loader.n_samples * (1 - overlap))
+        self.apply_filter = apply_filter
+
+        self.p_arrival = None
+        self.s_arrival = None
+        self.n_samples_read = 0
+
+        if self.step <= 0:
+            raise ValueError(f"overlap must be < 1 (got {overlap})")
+        if not apply_filter:
+            raise ValueError("apply_filter=False is not supported for chunked reading: "
+                             "per-block detrending leaves DC steps at block boundaries")
+
+    def iter_raw_blocks(self):
+        """
+        Yield raw (block_samples, 3) waveform blocks in record order
+        """
+        self.n_samples_read = 0
+
+        for df in pd.read_csv(self.filepath, chunksize=self.chunk_samples):
+            waveform, p_arrival, s_arrival = self.loader.extract_waveform(df)
+
+            if self.n_samples_read == 0:
+                self.p_arrival = p_arrival
+                self.s_arrival = s_arrival
+
+            self.n_samples_read += len(waveform)
+            yield waveform
+
+    def _filter_segment(self, segment):
+        """Detrend and bandpass a raw segment along time"""
+        engine = self.loader.preprocessor
+        processed = engine.detrend(segment, axis=0)
+        if self.apply_filter:
+            processed = engine.bandpass(processed, axis=0)
+        return processed
+
+    def iter_processed_blocks(self):
+        """
+        Yield (start_sample, processed_block) covering the record without gaps
+
+        A block is emitted once pad samples after it have been read, so the
+        zero-phase filter sees context on both sides of every output sample.
+        """
+        raw = np.zeros((0, 3), dtype=self.loader.dtype)
+        raw_start = 0  # Record index of raw[0]
+        out_pos = 0    # First record sample not yet emitted
+
+        for block in self.iter_raw_blocks():
+            raw = np.concatenate([raw, block])
+            raw_end = raw_start + len(raw)
+
+            emit_end = raw_end - self.pad
+            if emit_end <= out_pos:
+                continue
+
+            seg_start = max(out_pos - self.pad, raw_start)
+            processed = self._filter_segment(raw[seg_start - raw_start:])
+            yield out_pos, processed[out_pos - seg_start:emit_end - seg_start]
+            out_pos = emit_end
+
+            # Keep only the context needed for the next block
+            keep_from = max(out_pos - self.pad, raw_start)
+            raw = raw[keep_from - raw_start:]
+            raw_start = keep_from
+
+        raw_end = raw_start + len(raw)
+        if raw_end > out_pos:
+            seg_start = max(out_pos - self.pad, raw_start)
+            processed = self._filter_segment(raw[seg_start - raw_start:])
+            yield out_pos, processed[out_pos - seg_start:]
+
+    def iter_windows(self):
+        """
+        Yield (window_starts, windows) batches as blocks are processed
+
+        windows is (n, n_samples, 3), normalized per window and channel;
+        window_starts are record sample indices (multiples of the step).
+        """
+        n_samples = self.loader.n_samples
+        buffer = np.zeros((0, 3), dtype=self.loader.dtype)
+        buffer_start = 0  # Record index of buffer[0]
+        next_start = 0    # Record index of the next window start
+
+        for block_start, block in self.iter_processed_blocks():
+            buffer = np.concatenate([buffer, block])
+            buffer_end = buffer_start + len(buffer)
+
+            if next_start + n_samples > buffer_end:
+                continue
+
+            n_windows = (buffer_end - n_samples - next_start) // self.step + 1
+            offset = next_start - buffer_start
+            windows = np.lib.stride_tricks.sliding_window_view(
+                buffer[offset:offset + (n_windows - 1) * self.step + n_samples],
+                n_samples, axis=0
+            )[::self.step].transpose(0, 2, 1)
+
+            starts = next_start + np.arange(n_windows) * self.step
+            yield starts, self.loader.preprocessor.normalize(windows, axis=1)
+
+            next_start += n_windows * self.step
+            buffer = buffer[next_start - buffer_start:]
+            buffer_start = next_start
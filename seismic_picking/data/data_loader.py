@@ -9,6 +9,16 @@ import pandas as pd
 from scipy import signal
 from sklearn.model_selection import train_test_split
 import glob
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ThreadPoolExecutor
+
+from .preprocessing import PreprocessingEngine
+from .waveform_store import WaveformStore
+from .feature_cache import FeatureCache
+from .streaming import StreamingDataset
+from .shards import convert_csv_to_shards
+from .splits import WindowSubset, file_groups, split_window_indices
 
 
 class SeismicDataLoader:
@@ -16,57 +26,87 @@ class SeismicDataLoader:
     Load and preprocess seismic data from CSV files
     """
 
-    def __init__(self, data_dir, sampling_rate=100, window_size=30):
+    def __init__(self, data_dir, sampling_rate=100, window_size=30, cache_dir=None,
+                 feature_cache_dir=None, feature_cache_max_gb=20.0,
+                 dtype=np.float32, storage_dtype=np.float32):
         """
         Args:
             data_dir: Directory containing CSV files
             sampling_rate: Sampling rate in Hz (default 100 Hz)
             window_size: Window size in seconds (default 30s)
+            cache_dir: Directory for the binary waveform store (None = parse CSVs every time)
+            feature_cache_dir: Directory for cached preprocessed windows (None = disabled)
+            feature_cache_max_gb: Size limit of the feature cache in GB
+            dtype: Floating dtype of loaded waveforms, windows and labels (default float32)
+            storage_dtype: Dtype of preprocessed windows in the feature cache and shards
+                           (float16 halves disk and I/O; data is returned as dtype)
         """
         self.data_dir = data_dir
         self.sampling_rate = sampling_rate
         self.window_size = window_size
         self.n_samples = int(sampling_rate * window_size)
-
-    def load_csv_file(self, filepath):
+        self.cache_dir = cache_dir
+        self.dtype = np.dtype(dtype)
+        self.storage_dtype = np.dtype(storage_dtype)
+        self.preprocessor = PreprocessingEngine(sampling_rate)
+
+        self.feature_cache = None
+        self.feature_cache_stats = None
+        if feature_cache_dir is not None:
+            self.feature_cache = FeatureCache(feature_cache_dir,
+                                              max_bytes=int(feature_cache_max_gb * 1024 ** 3),
+                                              storage_dtype=self.storage_dtype)
+
+    def load_csv_file(self, filepath, raise_errors=False):
         """
         Load single CSV file containing seismic waveform
         Expected columns: time, Z, N, E, p_arrival, s_arrival
         or: time, amplitude, p_arrival, s_arrival (single channel)
+
+        If raise_errors is False, errors are printed and (None, None, None) is returned
         """
         try:
             df = pd.read_csv(filepath)
-
-            # Check available columns
-            if 'Z' in df.columns and 'N' in df.columns and 'E' in df.columns:
-                # 3-component data
-                waveform = df[['Z', 'N', 'E']].values
-            elif 'amplitude' in df.columns:
-                # Single component - replicate to 3 channels
-                amp = df['amplitude'].values.reshape(-1, 1)
-                waveform = np.repeat(amp, 3, axis=1)
-            else:
-                # Use first 3 numeric columns
-                numeric_cols = df.select_dtypes(include=[np.number]).columns
-                if len(numeric_cols) >= 3:
-                    waveform = df[numeric_cols[:3]].values
-                else:
-                    waveform = df[numeric_cols].values
-                    # Pad if less than 3 channels
-                    if waveform.shape[1] < 3:
-                        padding = np.zeros((waveform.shape[0], 3 - waveform.shape[1]))
-                        waveform = np.hstack([waveform, padding])
-
-            # Get P and S arrival times (in samples or seconds)
-            p_arrival = df['p_arrival'].iloc[0] if 'p_arrival' in df.columns else None
-            s_arrival = df['s_arrival'].iloc[0] if 's_arrival' in df.columns else None
-
-            return waveform, p_arrival, s_arrival
+            return self.extract_waveform(df)
 
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Error loading {filepath}: {e}")
             return None, None, None
 
+    def extract_waveform(self, df):
+        """
+        Extract (waveform, p_arrival, s_arrival) from a waveform DataFrame
+        """
+        # Check available columns
+        if 'Z' in df.columns and 'N' in df.columns and 'E' in df.columns:
+            # 3-component data
+            waveform = df[['Z', 'N', 'E']].values
+        elif 'amplitude' in df.columns:
+            # Single component - replicate to 3 channels
+            amp = df['amplitude'].values.reshape(-1, 1)
+            waveform = np.repeat(amp, 3, axis=1)
+        else:
+            # Use first 3 numeric columns
+            numeric_cols = df.select_dtypes(include=[np.number]).columns
+            if len(numeric_cols) >= 3:
+                waveform = df[numeric_cols[:3]].values
+            else:
+                waveform = df[numeric_cols].values
+                # Pad if less than 3 channels
+                if waveform.shape[1] < 3:
+                    padding = np.zeros((waveform.shape[0], 3 - waveform.shape[1]))
+                    waveform = np.hstack([waveform, padding])
+
+        waveform = waveform.astype(self.dtype, copy=False)
+
+        # Get P and S arrival times (in samples or seconds)
+        p_arrival = df['p_arrival'].iloc[0] if 'p_arrival' in df.columns else None
+        s_arrival = df['s_arrival'].iloc[0] if 's_arrival' in df.columns else None
+
+        return waveform, p_arrival, s_arrival
+
     def preprocess_waveform(self, waveform, apply_filter=True):
         """
         Preprocess seismic waveform
@@ -77,144 +117,465 @@ class SeismicDataLoader:
         if waveform is None:
             return None
 
-        processed = waveform.copy()
-
-        # Detrend each channel
-        for i in range(processed.shape[1]):
-            processed[:, i] = signal.detrend(processed[:, i])
-
-        # Bandpass filter (1-20 Hz typical for local earthquakes)
-        if apply_filter:
-            nyquist = self.sampling_rate / 2
-            low = 1.0 / nyquist
-            high = 20.0 / nyquist
-            b, a = signal.butter(4, [low, high], btype='band')
-
-            for i in range(processed.shape[1]):
-                processed[:, i] = signal.filtfilt(b, a, processed[:, i])
-
-        # Normalize each channel
-        for i in range(processed.shape[1]):
-            max_val = np.max(np.abs(processed[:, i]))
-            if max_val > 0:
-                processed[:, i] = processed[:, i] / max_val
+        return self.preprocessor.process(waveform, apply_filter=apply_filter)
 
-        return processed
+    def preprocess_batch(self, waveforms, apply_filter=True):
+        """
+        Preprocess a batch of equal-length waveforms (n_traces, n_samples, 3) in one call
+        """
+        return self.preprocessor.process(waveforms, apply_filter=apply_filter, axis=1)
 
-    def create_windows(self, waveform, p_arrival, s_arrival, overlap=0.5):
+    def create_windows(self, waveform, p_arrival, s_arrival, overlap=0.5, copy=False):
         """
         Create sliding windows from waveform
         Returns windows with labels
-        """
-        windows = []
-        labels = []
 
+        By default windows are a read-only strided view into waveform
+        (no data is copied); pass copy=True for an independent writable array.
+        """
         if waveform is None:
             return np.array([]), np.array([])
 
         # Calculate step size
         step = int(self.n_samples * (1 - overlap))
+        if step <= 0:
+            raise ValueError(f"overlap must be < 1 (got {overlap})")
 
-        # Generate windows
-        for start in range(0, len(waveform) - self.n_samples + 1, step):
-            end = start + self.n_samples
-            window = waveform[start:end, :]
-
-            # Determine label based on P and S arrivals
-            window_center = (start + end) / 2
-
-            if p_arrival is not None and s_arrival is not None:
-                if abs(window_center - p_arrival) < self.n_samples / 4:
-                    label = 1  # P-wave
-                elif abs(window_center - s_arrival) < self.n_samples / 4:
-                    label = 2  # S-wave
-                else:
-                    label = 0  # Noise
-            else:
-                label = 0  # Unknown/Noise
+        n_windows = max(0, (len(waveform) - self.n_samples) // step + 1)
+        if n_windows == 0:
+            windows = np.zeros((0, self.n_samples, waveform.shape[1]), dtype=waveform.dtype)
+            return windows, np.zeros(0, dtype=np.int64)
 
-            windows.append(window)
-            labels.append(label)
+        # (n_windows, n_samples, channels) view: sliding_window_view puts the
+        # window axis last, so swap it back in front of the channel axis
+        windows = np.lib.stride_tricks.sliding_window_view(
+            waveform, self.n_samples, axis=0
+        )[::step].transpose(0, 2, 1)
 
-        return np.array(windows), np.array(labels)
+        # Determine labels based on P and S arrivals
+        labels = self.window_labels(np.arange(n_windows) * step, p_arrival, s_arrival)
 
-    def create_arrival_labels(self, waveform_length, p_arrival, s_arrival):
+        if copy:
+            windows = windows.copy()
+
+        return windows, labels
+
+    def window_labels(self, starts, p_arrival, s_arrival):
+        """
+        Class label of windows starting at starts
+        P-wave (1) / S-wave (2) if the window centre is within a quarter window
+        of the arrival, otherwise Noise (0). Arrivals may be scalars or per-window
+        arrays (None/NaN = unknown, which labels the window as Noise).
+        """
+        window_centers = np.asarray(starts) + self.n_samples / 2
+        p = np.asarray(np.nan if p_arrival is None else p_arrival, dtype=np.float64)
+        s = np.asarray(np.nan if s_arrival is None else s_arrival, dtype=np.float64)
+
+        window_centers, p, s = np.broadcast_arrays(window_centers, p, s)
+        labels = np.zeros(window_centers.shape, dtype=np.int64)  # Noise
+
+        known = ~np.isnan(p) & ~np.isnan(s)
+        is_p = known & (np.abs(window_centers - p) < self.n_samples / 4)
+        is_s = known & ~is_p & (np.abs(window_centers - s) < self.n_samples / 4)
+        labels[is_p] = 1  # P-wave
+        labels[is_s] = 2  # S-wave
+
+        return labels
+
+    def create_arrival_labels(self, waveform_length, p_arrival, s_arrival,
+                              dtype=np.float32, truncate=None):
         """
         Create pixel-wise labels for U-Net style models
         Returns: (time_samples, 3) array with probabilities for [Noise, P, S]
+
+        p_arrival and s_arrival may also be 1D arrays with one arrival pair per
+        trace (None/NaN for a missing arrival); the result is then
+        (n_traces, time_samples, 3).
+
+        Args:
+            waveform_length: Number of time samples
+            p_arrival, s_arrival: Arrival sample index, or arrays of them
+            dtype: Output dtype (default float32)
+            truncate: If set, each Gaussian is only evaluated within
+                      ±truncate·sigma of its arrival and is zero outside
         """
-        labels = np.zeros((waveform_length, 3))
+        batched = np.ndim(p_arrival) > 0 or np.ndim(s_arrival) > 0
 
-        # Default to noise
-        labels[:, 0] = 1.0
+        p = np.atleast_1d(np.asarray(np.nan if p_arrival is None else p_arrival, dtype=np.float64))
+        s = np.atleast_1d(np.asarray(np.nan if s_arrival is None else s_arrival, dtype=np.float64))
+        p, s = np.broadcast_arrays(p, s)
 
         # Create Gaussian distributions around arrivals
         sigma = self.sampling_rate * 0.5  # 0.5 second spread
 
-        if p_arrival is not None:
-            p_idx = int(p_arrival)
-            for i in range(waveform_length):
-                prob = np.exp(-0.5 * ((i - p_idx) / sigma) ** 2)
-                labels[i, 1] = prob
-                labels[i, 0] = max(0, labels[i, 0] - prob)
+        labels = np.empty((len(p), waveform_length, 3), dtype=dtype)
+        labels[..., 1] = self._arrival_gaussians(waveform_length, p, sigma, truncate, dtype)
+        labels[..., 2] = self._arrival_gaussians(waveform_length, s, sigma, truncate, dtype)
 
-        if s_arrival is not None:
-            s_idx = int(s_arrival)
-            for i in range(waveform_length):
-                prob = np.exp(-0.5 * ((i - s_idx) / sigma) ** 2)
-                labels[i, 2] = prob
-                labels[i, 0] = max(0, labels[i, 0] - prob)
+        # Noise is whatever probability is left after P and S
+        np.maximum(1 - labels[..., 1] - labels[..., 2], 0, out=labels[..., 0])
 
         # Normalize
-        labels = labels / (labels.sum(axis=1, keepdims=True) + 1e-10)
+        labels /= labels.sum(axis=-1, keepdims=True) + 1e-10
 
-        return labels
+        return labels if batched else labels[0]
+
+    @staticmethod
+    def _arrival_gaussians(waveform_length, arrivals, sigma, truncate, dtype):
+        """
+        Gaussian curves centred on each arrival: (n_arrivals, waveform_length)
+        Rows with a NaN arrival are all zeros
+        """
+        # Arrivals are sample indices; fractional values are truncated as int() would
+        arrivals = np.trunc(arrivals)
+        rows = np.flatnonzero(~np.isnan(arrivals))
+        curves = np.zeros((len(arrivals), waveform_length), dtype=dtype)
+
+        if truncate is None:
+            t = np.arange(waveform_length, dtype=dtype)
+            centres = arrivals[rows, np.newaxis].astype(dtype)
+            curves[rows] = np.exp(-0.5 * ((t - centres) / np.dtype(dtype).type(sigma)) ** 2)
+        else:
+            # Every arrival is an integer shift of the same kernel, so the
+            # exponential is evaluated once on ±truncate·sigma
+            radius = int(np.ceil(truncate * sigma))
+            offsets = np.arange(-radius, radius + 1)
+            kernel = np.exp(-0.5 * (offsets / sigma) ** 2).astype(dtype)
+
+            positions = arrivals[rows, np.newaxis].astype(np.int64) + offsets
+            inside = (positions >= 0) & (positions < waveform_length)
+            row_idx = np.broadcast_to(rows[:, np.newaxis], positions.shape)
+            curves[row_idx[inside], positions[inside]] = np.broadcast_to(kernel, positions.shape)[inside]
+
+        return curves
+
+    def sync_waveform_store(self, csv_files=None):
+        """
+        Convert CSV files into the binary waveform store at cache_dir
+        Only new or changed files are parsed again
+        Returns: WaveformStore
+        """
+        if self.cache_dir is None:
+            raise ValueError("cache_dir is not set")
+
+        if csv_files is None:
+            csv_files = glob.glob(os.path.join(self.data_dir, '*.csv'))
+
+        store = WaveformStore(self.cache_dir)
+        stats = store.sync(csv_files, self.load_csv_file)
+
+        print(f"Waveform store: {stats['unchanged']} cached, {stats['added']} added, "
+              f"{stats['updated']} updated, {stats['removed']} removed, "
+              f"{stats['failed']} failed")
 
-    def load_dataset(self, max_files=None):
+        return store
+
+    def feature_params(self, overlap=0.5, apply_filter=True):
+        """
+        Preprocessing parameters that determine the windows of a file
+        (used as part of the feature cache key)
+        """
+        return {
+            'sampling_rate': self.sampling_rate,
+            'window_size': self.window_size,
+            'overlap': overlap,
+            'band': [self.preprocessor.freqmin, self.preprocessor.freqmax],
+            'filter_order': self.preprocessor.order,
+            'apply_filter': apply_filter,
+            'dtype': self.dtype.str,
+            'storage_dtype': self.storage_dtype.str
+        }
+
+    def load_preprocessed(self, filepath, store=None, apply_filter=True):
+        """
+        Load a file (from the waveform store if given) and preprocess it
+        Raises on errors
+        Returns: waveform, p_arrival, s_arrival
+        """
+        if store is not None:
+            waveform, p_arrival, s_arrival = store.get(filepath)
+            if waveform is None:
+                raise ValueError("file is missing from the waveform store")
+            waveform = np.asarray(waveform, dtype=self.dtype)
+        else:
+            waveform, p_arrival, s_arrival = self.load_csv_file(filepath, raise_errors=True)
+
+        waveform = self.preprocess_waveform(waveform, apply_filter=apply_filter)
+
+        return waveform, p_arrival, s_arrival
+
+    def process_file(self, filepath, store=None, overlap=0.5, apply_filter=True):
+        """
+        Load, preprocess and window a single file
+        Returns: windows, labels, metadata entry ('error' is set if the file failed)
+
+        With a feature cache, results are looked up by source content and
+        preprocessing parameters; metadata then has 'cached' True (hit) or False (miss).
+        """
+        meta = {
+            'filename': os.path.basename(filepath),
+            'p_arrival': None,
+            's_arrival': None,
+            'n_windows': 0
+        }
+
+        cache_key = None
+        if self.feature_cache is not None:
+            try:
+                cache_key = self.feature_cache.make_key(
+                    filepath, self.feature_params(overlap, apply_filter))
+            except OSError:
+                cache_key = None
+
+            cached = self.feature_cache.get(cache_key) if cache_key else None
+            if cached is not None:
+                windows, labels, cached_meta = cached
+                if windows.dtype != self.dtype:
+                    windows = windows.astype(self.dtype)
+                meta.update(cached_meta)
+                meta['cached'] = True
+                return windows, labels, meta
+
+        try:
+            waveform, p_arrival, s_arrival = self.load_preprocessed(filepath, store, apply_filter)
+
+            # Create windows
+            windows, labels = self.create_windows(waveform, p_arrival, s_arrival, overlap=overlap)
+
+        except Exception as e:
+            meta['error'] = f"{type(e).__name__}: {e}"
+            return None, None, meta
+
+        meta.update({
+            'p_arrival': p_arrival,
+            's_arrival': s_arrival,
+            'n_windows': len(windows)
+        })
+
+        if cache_key is not None:
+            self.feature_cache.put(cache_key, windows, labels, meta)
+            meta['cached'] = False
+
+        return windows, labels, meta
+
+    def report_feature_cache(self):
+        """
+        Print feature cache hits, misses and evictions so far
+        Returns: stats dict (also kept in feature_cache_stats), None without a cache
+        """
+        if self.feature_cache is None:
+            return None
+
+        self.feature_cache_stats = self.feature_cache.stats()
+        print(f"Feature cache: {self.feature_cache_stats['hits']} hits, "
+              f"{self.feature_cache_stats['misses']} misses, "
+              f"{self.feature_cache_stats['evicted']} evicted")
+
+        return self.feature_cache_stats
+
+    def load_dataset(self, max_files=None, n_workers=1):
         """
         Load entire dataset from directory
+
+        Files are processed in sorted filename order, so X and y are
+        deterministic regardless of n_workers. Files that fail to load are
+        listed in metadata with an 'error' entry and contribute no windows.
+
+        Args:
+            max_files: Maximum number of files to load (None = all)
+            n_workers: Number of worker processes (1 = load in this process)
+
         Returns: X (waveforms), y (labels), metadata
         """
-        csv_files = glob.glob(os.path.join(self.data_dir, '*.csv'))
+        csv_files = sorted(glob.glob(os.path.join(self.data_dir, '*.csv')))
 
         if max_files:
             csv_files = csv_files[:max_files]
 
         print(f"Found {len(csv_files)} CSV files")
 
-        all_windows = []
-        all_labels = []
-        metadata = []
+        store = self.sync_waveform_store(csv_files) if self.cache_dir else None
 
-        for idx, filepath in enumerate(csv_files):
-            if idx % 100 == 0:
-                print(f"Processing file {idx + 1}/{len(csv_files)}")
+        if n_workers is not None and n_workers > 1 and len(csv_files) > 1:
+            X, y, metadata = self._load_dataset_parallel(csv_files, n_workers)
+        else:
+            all_windows = []
+            all_labels = []
+            metadata = []
 
-            waveform, p_arrival, s_arrival = self.load_csv_file(filepath)
+            for idx, filepath in enumerate(csv_files):
+                if idx % 100 == 0:
+                    print(f"Processing file {idx + 1}/{len(csv_files)}")
 
-            if waveform is None:
-                continue
+                windows, labels, meta = self.process_file(filepath, store)
+                metadata.append(meta)
 
-            # Preprocess
-            waveform = self.preprocess_waveform(waveform)
+                if windows is None:
+                    continue
 
-            # Create windows
-            windows, labels = self.create_windows(waveform, p_arrival, s_arrival)
+                all_windows.append(windows)
+                all_labels.append(labels)
 
-            all_windows.extend(windows)
-            all_labels.extend(labels)
+            # Windows are views into each waveform; concatenate copies them once
+            X = np.concatenate(all_windows) if all_windows else np.array([], dtype=self.dtype)
+            y = np.concatenate(all_labels) if all_labels else np.array([])
 
-            metadata.append({
-                'filename': os.path.basename(filepath),
-                'p_arrival': p_arrival,
-                's_arrival': s_arrival,
-                'n_windows': len(windows)
-            })
+        if self.feature_cache is not None:
+            if n_workers is not None and n_workers > 1 and len(csv_files) > 1:
+                # Lookups happened in the workers; count them from the metadata and
+                # enforce the limit once more over everything the workers wrote
+                self.feature_cache.hits += sum(1 for meta in metadata if meta.get('cached') is True)
+                self.feature_cache.misses += sum(1 for meta in metadata
+                                                 if meta.get('cached') is False)
+                self.feature_cache.evict()
+            self.report_feature_cache()
 
-        X = np.array(all_windows)
-        y = np.array(all_labels)
+        failed = [meta for meta in metadata if 'error' in meta]
+        for meta in failed:
+            print(f"Error loading {meta['filename']}: {meta['error']}")
 
         print(f"Loaded dataset shape: X={X.shape}, y={y.shape}")
+        if failed:
+            print(f"Failed files: {len(failed)} (see metadata)")
+
+        return X, y, metadata
+
+    def synthetic_windows(self, n_events, seed=None, n_workers=1, overlap=0.5, apply_filter=True):
+        """
+        Generate, preprocess and window a batch of synthetic events in memory
+        (nothing is written to disk)
+
+        Args:
+            n_events: Number of synthetic events
+            seed: Seed or np.random.Generator
+            n_workers: Threads used by SyntheticDataGenerator.generate_batch
+            overlap: Window overlap
+            apply_filter: Whether to apply the bandpass filter
+
+        Returns:
+            X: (n_events * n_windows, n_samples, 3) windows in event order
+            y: Window labels
+            p_idx, s_idx: (n_events,) arrival sample indices
+        """
+        duration = max(35, self.window_size)
+        generator = SyntheticDataGenerator(self.sampling_rate)
+        waveforms, p_idx, s_idx = generator.generate_batch(
+            n_events, duration=duration, seed=seed, n_workers=n_workers
+        )
+
+        processed = self.preprocess_batch(waveforms, apply_filter=apply_filter).astype(self.dtype, copy=False)
+        del waveforms
+
+        step = int(self.n_samples * (1 - overlap))
+        if step <= 0:
+            raise ValueError(f"overlap must be < 1 (got {overlap})")
+
+        # (n_events, n_windows, n_samples, 3), then flattened in event order
+        windows = np.lib.stride_tricks.sliding_window_view(
+            processed, self.n_samples, axis=1
+        )[:, ::step].transpose(0, 1, 3, 2)
+        starts = np.arange(windows.shape[1]) * step
+
+        X = np.ascontiguousarray(windows).reshape(-1, self.n_samples, processed.shape[2])
+        y = self.window_labels(starts[np.newaxis, :], p_idx[:, np.newaxis],
+                               s_idx[:, np.newaxis]).ravel()
+
+        return X, y, p_idx, s_idx
+
+    def load_synthetic(self, n_events, seed=None, n_workers=1, overlap=0.5, apply_filter=True):
+        """
+        Generate, preprocess and window synthetic events without touching disk
+        Arguments as synthetic_windows
+
+        Returns: X (windows), y (labels), metadata (one entry per event, as load_dataset)
+        """
+        X, y, p_idx, s_idx = self.synthetic_windows(n_events, seed, n_workers, overlap, apply_filter)
+        print(f"Generated {n_events} synthetic events in memory")
+
+        n_windows = len(X) // n_events if n_events else 0
+        metadata = [
+            {'filename': f'synthetic_event_{i:06d}', 'p_arrival': int(p), 's_arrival': int(s),
+             'n_windows': n_windows}
+            for i, (p, s) in enumerate(zip(p_idx, s_idx))
+        ]
+
+        print(f"Loaded dataset shape: X={X.shape}, y={y.shape}")
+
+        return X, y, metadata
+
+    def _load_dataset_parallel(self, csv_files, n_workers):
+        """
+        Process files in a worker pool
+
+        Workers place windows in shared memory blocks and only send back the
+        block name, labels and metadata; blocks are copied into X in file order.
+        """
+        # Make sure workers share this process's resource tracker, so shared
+        # memory blocks created in workers are not unlinked when a worker exits
+        from multiprocessing import resource_tracker
+        resource_tracker.ensure_running()
+
+        feature_cache_dir = self.feature_cache.cache_dir if self.feature_cache else None
+        feature_cache_max_gb = self.feature_cache.max_bytes / 1024 ** 3 if self.feature_cache else 20.0
+        loader_args = (self.data_dir, self.sampling_rate, self.window_size, self.cache_dir,
+                       feature_cache_dir, feature_cache_max_gb, self.dtype.str,
+                       self.storage_dtype.str)
+        chunksize = max(1, len(csv_files) // (n_workers * 4))
+
+        # Never fork: the parent process has usually imported TensorFlow already
+        methods = multiprocessing.get_all_start_methods()
+        ctx = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+        results = []
+        unclaimed = set()  # Shared memory blocks received but not yet copied and unlinked
+        try:
+            with ctx.Pool(n_workers, initializer=_init_worker, initargs=loader_args) as pool:
+                for idx, result in enumerate(pool.imap(_process_file_shared, csv_files,
+                                                       chunksize=chunksize)):
+                    if idx % 100 == 0:
+                        print(f"Processing file {idx + 1}/{len(csv_files)}")
+                    results.append(result)
+                    if result[0] is not None:
+                        unclaimed.add(result[0])
+
+            metadata = [meta for _, _, _, _, meta in results]
+            shapes = [shape for _, shape, _, _, _ in results if shape is not None and shape[0] > 0]
+            dtypes = [np.dtype(dtype) for _, shape, dtype, _, _ in results
+                      if shape is not None and shape[0] > 0]
+
+            n_windows = sum(shape[0] for shape in shapes)
+            window_shape = shapes[0][1:] if shapes else (0,)
+            dtype = np.result_type(*dtypes) if dtypes else self.dtype
+
+            X = np.empty((n_windows, *window_shape), dtype=dtype)
+            y = np.empty(n_windows, dtype=np.int64)
+
+            offset = 0
+            for shm_name, shape, dtype_str, labels, _ in results:
+                if shape is None:
+                    continue
+
+                count = shape[0]
+                if shm_name is not None:
+                    shm = shared_memory.SharedMemory(name=shm_name)
+                    try:
+                        X[offset:offset + count] = np.ndarray(shape, dtype=dtype_str, buffer=shm.buf)
+                    finally:
+                        shm.close()
+                        shm.unlink()
+                        unclaimed.discard(shm_name)
+
+                y[offset:offset + count] = labels
+                offset += count
+        finally:
+            # Release the blocks of files already returned if the pool or the copy failed
+            for shm_name in unclaimed:
+                try:
+                    shm = shared_memory.SharedMemory(name=shm_name)
+                except FileNotFoundError:
+                    continue
+                shm.close()
+                shm.unlink()
 
         return X, y, metadata
 
@@ -247,6 +608,138 @@ class SeismicDataLoader:
 
         return X_train, X_val, X_test, y_train, y_val, y_test
 
+    def prepare_indexed_split(self, X, y, metadata=None, test_size=0.2, val_size=0.1,
+                              random_state=42):
+        """
+        Prepare data for training without copying the window buffer
+
+        X gets a channel axis (a view for contiguous X) and labels are one-hot
+        encoded; the splits are WindowSubset views over these shared buffers.
+        With metadata, windows of one file always land in the same split.
+
+        Returns: train, val, test (WindowSubset)
+        """
+        # Reshape for CNN: (samples, time, channels, 1)
+        X = X.reshape(X.shape[0], X.shape[1], X.shape[2], 1)
+        y_cat = np.eye(3, dtype=np.float32)[y]
+
+        groups = file_groups(metadata) if metadata is not None else None
+        train_idx, val_idx, test_idx = split_window_indices(
+            y, groups, test_size=test_size, val_size=val_size, random_state=random_state
+        )
+
+        train = WindowSubset(X, y_cat, train_idx)
+        val = WindowSubset(X, y_cat, val_idx)
+        test = WindowSubset(X, y_cat, test_idx)
+
+        print(f"Training set: {train.shape}")
+        print(f"Validation set: {val.shape}")
+        print(f"Test set: {test.shape}")
+
+        return train, val, test
+
+    def write_shards(self, output_dir, windows_per_shard=4096, max_files=None, overlap=0.5):
+        """
+        Convert the CSV directory into a sharded dataset (see data.shards)
+        Windows are stored as storage_dtype
+        Returns: ShardedDataset
+        """
+        return convert_csv_to_shards(self, output_dir, windows_per_shard=windows_per_shard,
+                                     max_files=max_files, overlap=overlap,
+                                     dtype=self.storage_dtype)
+
+    def split_files(self, max_files=None, test_size=0.2, val_size=0.1, random_state=42):
+        """
+        Split CSV files (not windows) into train/val/test sets
+        All windows of one file end up in the same split
+        Returns: train_files, val_files, test_files
+        """
+        csv_files = sorted(glob.glob(os.path.join(self.data_dir, '*.csv')))
+
+        if max_files:
+            csv_files = csv_files[:max_files]
+
+        file_indices = np.arange(len(csv_files))
+        temp_idx, test_idx = train_test_split(
+            file_indices, test_size=test_size, random_state=random_state
+        )
+
+        val_ratio = val_size / (1 - test_size)
+        train_idx, val_idx = train_test_split(
+            temp_idx, test_size=val_ratio, random_state=random_state
+        )
+
+        train_files = [csv_files[i] for i in sorted(train_idx)]
+        val_files = [csv_files[i] for i in sorted(val_idx)]
+        test_files = [csv_files[i] for i in sorted(test_idx)]
+
+        print(f"Training files: {len(train_files)}")
+        print(f"Validation files: {len(val_files)}")
+        print(f"Test files: {len(test_files)}")
+
+        return train_files, val_files, test_files
+
+    def streaming_datasets(self, max_files=None, test_size=0.2, val_size=0.1,
+                           batch_size=32, augmentor=None, files_per_block=32,
+                           random_state=42):
+        """
+        Build lazily-loaded train/val/test datasets split by file
+        Only the training set is shuffled and augmented
+        Returns: train_data, val_data, test_data (StreamingDataset)
+        """
+        train_files, val_files, test_files = self.split_files(
+            max_files, test_size=test_size, val_size=val_size, random_state=random_state
+        )
+
+        store = None
+        if self.cache_dir:
+            store = self.sync_waveform_store(train_files + val_files + test_files)
+
+        train_data = StreamingDataset(self, train_files, batch_size=batch_size, shuffle=True,
+                                      files_per_block=files_per_block, augmentor=augmentor,
+                                      store=store, seed=random_state)
+        val_data = StreamingDataset(self, val_files, batch_size=batch_size, shuffle=False,
+                                    files_per_block=files_per_block, store=store)
+        test_data = StreamingDataset(self, test_files, batch_size=batch_size, shuffle=False,
+                                     files_per_block=files_per_block, store=store)
+
+        return train_data, val_data, test_data
+
+
+_worker_state = {}
+
+
+def _init_worker(data_dir, sampling_rate, window_size, cache_dir, feature_cache_dir,
+                 feature_cache_max_gb, dtype, storage_dtype):
+    """Pool initializer: one loader (and store handle) per worker process"""
+    loader = SeismicDataLoader(data_dir, sampling_rate, window_size, cache_dir=cache_dir,
+                               feature_cache_dir=feature_cache_dir,
+                               feature_cache_max_gb=feature_cache_max_gb,
+                               dtype=dtype, storage_dtype=storage_dtype)
+    _worker_state['loader'] = loader
+    _worker_state['store'] = WaveformStore(cache_dir) if cache_dir else None
+
+
+def _process_file_shared(filepath):
+    """
+    Worker task: process one file and copy its windows into shared memory
+    Returns: (shm_name, shape, dtype, labels, metadata)
+    """
+    loader = _worker_state['loader']
+    windows, labels, meta = loader.process_file(filepath, _worker_state['store'])
+
+    if windows is None:
+        return None, None, None, None, meta
+
+    shm_name = None
+    if windows.size > 0:
+        shm = shared_memory.SharedMemory(create=True, size=windows.nbytes)
+        np.ndarray(windows.shape, dtype=windows.dtype, buffer=shm.buf)[:] = windows
+        shm_name = shm.name
+        shm.close()
+
+    return shm_name, windows.shape, windows.dtype.str, labels, meta
+
 
 class SyntheticDataGenerator:
     """
@@ -264,11 +757,11 @@ class SyntheticDataGenerator:
         time = np.linspace(0, duration, n_samples)
 
         # Initialize waveform
-        waveform = np.zeros((n_samples, 3))
+        waveform = np.zeros((n_samples, 3), dtype=np.float32)
 
         # Add noise
         noise_level = 0.1
-        waveform += np.random.normal(0, noise_level, (n_samples, 3))
+        waveform += np.random.normal(0, noise_level, (n_samples, 3)).astype(np.float32)
 
         # P-wave arrival
         p_idx = int(p_time * self.sampling_rate)
@@ -296,6 +789,87 @@ class SyntheticDataGenerator:
 
         return time, waveform, p_idx, s_idx
 
+    def _event_templates(self):
+        """P and S wavelets used by generate_synthetic_waveform (Z-component scale 1)"""
+        p_duration, s_duration = 3, 8  # seconds
+        p_envelope = signal.windows.tukey(int(p_duration * self.sampling_rate), alpha=0.5)
+        p_signal = p_envelope * np.sin(2 * np.pi * 8 * np.linspace(0, p_duration, len(p_envelope)))
+        s_envelope = signal.windows.tukey(int(s_duration * self.sampling_rate), alpha=0.3)
+        s_signal = s_envelope * np.sin(2 * np.pi * 4 * np.linspace(0, s_duration, len(s_envelope)))
+        return p_signal.astype(np.float32), s_signal.astype(np.float32)
+
+    def _fill_batch(self, out, p_idx, s_idx, noise_level, rng, templates):
+        """Write noise plus P/S wavelets of one chunk of events into out (N, n_samples, 3)"""
+        p_signal, s_signal = templates
+        n_samples = out.shape[1]
+
+        rng.standard_normal(out=out, dtype=np.float32)
+        out *= noise_level
+
+        for arrivals, wavelet, scales in ((p_idx, p_signal, (0.3, 0.0, 0.0)),
+                                          (s_idx, s_signal, (0.5, 0.7, 0.7))):
+            # (event, wavelet sample) pairs inside the record; wavelets are cut at the end
+            cols = arrivals[:, np.newaxis] + np.arange(len(wavelet))
+            rows, lags = np.nonzero(cols < n_samples)
+            cols = cols[rows, lags]
+            channels = np.flatnonzero(scales)
+            gain = np.asarray(scales, dtype=np.float32)[channels]
+            out[rows[:, np.newaxis], cols[:, np.newaxis], channels] += wavelet[lags, np.newaxis] * gain
+
+    def generate_batch(self, n_events, duration=35, p_range=(5, 15), sp_range=(3, 10),
+                       noise_level=0.1, seed=None, n_workers=1, chunk_size=1024):
+        """
+        Generate a batch of synthetic events in memory
+
+        Uses the same wavelets as generate_synthetic_waveform, but all events
+        share one record length and are built with array operations instead of
+        a Python loop per event. The default duration covers the latest S
+        arrival plus 10 s, like the per-event records of save_synthetic_csv.
+
+        Args:
+            n_events: Number of events
+            duration: Record length in seconds
+            p_range: (min, max) P arrival time in seconds
+            sp_range: (min, max) S-P time in seconds
+            noise_level: Standard deviation of the background noise
+            seed: Seed or np.random.Generator (None = fresh entropy)
+            n_workers: Threads filling chunks in parallel
+            chunk_size: Events per chunk; each chunk has its own generator seeded
+                        from seed, so output does not depend on n_workers
+
+        Returns:
+            waveforms: (n_events, n_samples, 3) float32
+            p_idx, s_idx: (n_events,) arrival sample indices
+        """
+        rng = np.random.default_rng(seed)
+        n_samples = int(duration * self.sampling_rate)
+
+        p_time = rng.uniform(p_range[0], p_range[1], n_events)
+        s_time = p_time + rng.uniform(sp_range[0], sp_range[1], n_events)
+        p_idx = np.minimum((p_time * self.sampling_rate).astype(np.int64), n_samples - 1)
+        s_idx = np.minimum((s_time * self.sampling_rate).astype(np.int64), n_samples - 1)
+
+        waveforms = np.empty((n_events, n_samples, 3), dtype=np.float32)
+        templates = self._event_templates()
+
+        chunks = [slice(start, min(start + chunk_size, n_events))
+                  for start in range(0, n_events, chunk_size)]
+        chunk_rngs = [np.random.default_rng(s) for s in rng.integers(0, 2 ** 63, len(chunks))]
+
+        def fill(i):
+            chunk = chunks[i]
+            self._fill_batch(waveforms[chunk], p_idx[chunk], s_idx[chunk],
+                             noise_level, chunk_rngs[i], templates)
+
+        if n_workers is not None and n_workers > 1 and len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                list(executor.map(fill, range(len(chunks))))
+        else:
+            for i in range(len(chunks)):
+                fill(i)
+
+        return waveforms, p_idx, s_idx
+
     def save_synthetic_csv(self, output_dir, n_samples=100):
         """
         Generate and save synthetic dataset
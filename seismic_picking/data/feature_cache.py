@@ -0,0 +1,174 @@
+"""
+Preprocessed Feature Cache
+Persistent cache of preprocessed, windowed arrays keyed on source content and preprocessing parameters
+"""
+
+import os
+import glob
+import json
+import hashlib
+import numpy as np
+
+
+class FeatureCache:
+    """
+    Disk cache of (windows, labels, metadata) per source file
+
+    Each entry is stored as three files named after its key:
+        <key>_windows.npy, <key>_labels.npy and <key>.json
+    The .json file is written last, so an entry exists only once it is
+    complete; its modification time doubles as the LRU timestamp. Entries
+    are independent files, so several worker processes can share a cache.
+
+    put() keeps a running total of the cache size and evicts least recently
+    used entries once it exceeds max_bytes. Each process tracks its own
+    writes, and the total is rescanned from disk on every eviction.
+    """
+
+    def __init__(self, cache_dir, max_bytes=20 * 1024 ** 3, storage_dtype=None):
+        """
+        Args:
+            cache_dir: Directory holding cached entries
+            max_bytes: Size limit enforced on put() (least recently used first)
+            storage_dtype: Dtype windows are stored as (None = as given, e.g. float16)
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.storage_dtype = None if storage_dtype is None else np.dtype(storage_dtype)
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._size = None  # Running size estimate, scanned on the first put()
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(filepath, params):
+        """
+        Hash of the source file content and the preprocessing parameters
+
+        Args:
+            filepath: Source file
+            params: JSON-serializable dict of everything that affects the output
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        digest.update(json.dumps(params, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + '_windows.npy', base + '_labels.npy', base + '.json'
+
+    def get(self, key):
+        """
+        Look up an entry
+        Returns: (windows memmap, labels, meta) or None on a miss
+        """
+        windows_path, labels_path, meta_path = self._paths(key)
+
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            windows = np.load(windows_path, mmap_mode='r')
+            labels = np.load(labels_path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        # Mark as recently used
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+
+        self.hits += 1
+        return windows, labels, meta
+
+    def _entry_size(self, key):
+        """Size of an entry's files (0 for parts that do not exist)"""
+        size = 0
+        for path in self._paths(key):
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    def put(self, key, windows, labels, meta):
+        """
+        Store an entry (overwrites an existing one), then evict least
+        recently used entries if the cache has grown beyond max_bytes
+        """
+        windows_path, labels_path, meta_path = self._paths(key)
+        suffix = f'.{os.getpid()}.tmp'
+
+        if self._size is None:
+            self._size = self.size_bytes()
+        previous_size = self._entry_size(key)
+
+        # np.save appends .npy to names without it, so keep it last
+        tmp_windows = windows_path[:-4] + suffix + '.npy'
+        tmp_labels = labels_path[:-4] + suffix + '.npy'
+        np.save(tmp_windows, np.ascontiguousarray(windows, dtype=self.storage_dtype))
+        np.save(tmp_labels, np.asarray(labels))
+        os.replace(tmp_windows, windows_path)
+        os.replace(tmp_labels, labels_path)
+
+        safe_meta = {k: (v.item() if isinstance(v, np.generic) else v) for k, v in meta.items()}
+        tmp_meta = meta_path + suffix
+        with open(tmp_meta, 'w') as f:
+            json.dump(safe_meta, f)
+        os.replace(tmp_meta, meta_path)
+
+        self._size += self._entry_size(key) - previous_size
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def _entries(self):
+        """List of (last_used, size_bytes, key) for all complete entries"""
+        entries = []
+        for meta_path in glob.glob(os.path.join(self.cache_dir, '*.json')):
+            key = os.path.basename(meta_path)[:-len('.json')]
+            try:
+                last_used = os.path.getmtime(meta_path)
+                size = sum(os.path.getsize(path) for path in self._paths(key))
+            except OSError:
+                continue
+            entries.append((last_used, size, key))
+        return entries
+
+    def size_bytes(self):
+        """Total size of cached entries"""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, max_bytes=None):
+        """
+        Delete least recently used entries until the cache fits in max_bytes
+        Returns: Number of evicted entries
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+
+        n_evicted = 0
+        for _, size, key in entries:
+            if total <= max_bytes:
+                break
+            for path in reversed(self._paths(key)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+            n_evicted += 1
+
+        self._size = total
+        self.evicted += n_evicted
+        return n_evicted
+
+    def stats(self):
+        """Lookups and evictions of this process: {'hits', 'misses', 'evicted'}"""
+        return {'hits': self.hits, 'misses': self.misses, 'evicted': self.evicted}
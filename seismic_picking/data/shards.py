@@ -0,0 +1,452 @@
+"""
+Sharded On-Disk Dataset Format
+Fixed-size binary shards of preprocessed windows with a global random-access index
+"""
+
+import os
+import glob
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+
+INDEX_FILE = 'index.json'
+WINDOW_INDEX_FILE = 'window_index.npy'
+
+# Provenance of every window: source file and start sample within that file
+WINDOW_INDEX_DTYPE = np.dtype([('file_id', '<i4'), ('start', '<i8')])
+
+
+def _json_safe(value):
+    """Convert numpy scalars to plain Python values for JSON"""
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class ShardWriter:
+    """
+    Write windows and labels into fixed-size shards
+
+    Layout of output_dir:
+        shard_00000_windows.npy - (windows_per_shard, n_samples, 3) windows
+        shard_00000_labels.npy  - (windows_per_shard,) int8 labels
+        ...                       (only the last shard may be smaller)
+        window_index.npy        - (file_id, start) for every window
+        index.json              - shard list, per-file metadata and settings
+    """
+
+    def __init__(self, output_dir, window_shape, windows_per_shard=4096,
+                 dtype=np.float32, attrs=None):
+        """
+        Args:
+            output_dir: Directory to write shards to
+            window_shape: Shape of one window, e.g. (3000, 3)
+            windows_per_shard: Number of windows per shard
+            dtype: Storage dtype of windows
+            attrs: Extra JSON-serializable settings stored in the index
+        """
+        self.output_dir = output_dir
+        self.window_shape = tuple(window_shape)
+        self.windows_per_shard = windows_per_shard
+        self.dtype = np.dtype(dtype)
+        self.attrs = attrs or {}
+
+        self.shards = []
+        self.files = []
+        self.window_index = []
+
+        self._X = np.empty((windows_per_shard, *self.window_shape), dtype=self.dtype)
+        self._y = np.empty(windows_per_shard, dtype=np.int8)
+        self._n_buffered = 0
+
+        os.makedirs(output_dir, exist_ok=True)
+
+    def add_file(self, windows, labels, meta, starts):
+        """
+        Append all windows of one source file
+
+        Args:
+            windows: (n_windows, n_samples, 3) array (may be empty)
+            labels: (n_windows,) class labels
+            meta: Per-file metadata dict
+            starts: (n_windows,) start sample of each window in the source file
+        """
+        file_id = len(self.files)
+        self.files.append({key: _json_safe(value) for key, value in meta.items()})
+
+        n_windows = 0 if windows is None else len(windows)
+        if n_windows == 0:
+            return
+
+        provenance = np.empty(n_windows, dtype=WINDOW_INDEX_DTYPE)
+        provenance['file_id'] = file_id
+        provenance['start'] = starts
+        self.window_index.append(provenance)
+
+        pos = 0
+        while pos < n_windows:
+            n_copy = min(n_windows - pos, self.windows_per_shard - self._n_buffered)
+            dest = slice(self._n_buffered, self._n_buffered + n_copy)
+            self._X[dest] = windows[pos:pos + n_copy]
+            self._y[dest] = labels[pos:pos + n_copy]
+            self._n_buffered += n_copy
+            pos += n_copy
+
+            if self._n_buffered == self.windows_per_shard:
+                self._flush()
+
+    def _flush(self):
+        """Write buffered windows as a new shard"""
+        if self._n_buffered == 0:
+            return
+
+        name = f'shard_{len(self.shards):05d}'
+        np.save(os.path.join(self.output_dir, f'{name}_windows.npy'), self._X[:self._n_buffered])
+        np.save(os.path.join(self.output_dir, f'{name}_labels.npy'), self._y[:self._n_buffered])
+
+        self.shards.append({'name': name, 'n_windows': self._n_buffered})
+        self._n_buffered = 0
+
+    def close(self):
+        """Write remaining windows and the global index"""
+        self._flush()
+
+        if self.window_index:
+            window_index = np.concatenate(self.window_index)
+        else:
+            window_index = np.zeros(0, dtype=WINDOW_INDEX_DTYPE)
+        np.save(os.path.join(self.output_dir, WINDOW_INDEX_FILE), window_index)
+
+        index = {
+            'n_windows': int(sum(shard['n_windows'] for shard in self.shards)),
+            'windows_per_shard': self.windows_per_shard,
+            'window_shape': list(self.window_shape),
+            'dtype': self.dtype.str,
+            'shards': self.shards,
+            'files': self.files,
+            'attrs': self.attrs
+        }
+
+        tmp_path = os.path.join(self.output_dir, INDEX_FILE + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.output_dir, INDEX_FILE))
+
+        return index
+
+
+class ShardedDataset:
+    """
+    Random-access reader for a sharded dataset
+
+    Window i lives in shard i // windows_per_shard at row i % windows_per_shard,
+    so any window is fetched in O(1) from a memory-mapped shard.
+    """
+
+    def __init__(self, root, dtype=np.float32):
+        """
+        Args:
+            root: Directory written by ShardWriter
+            dtype: Dtype of returned windows (shards may be stored as float16)
+        """
+        self.root = root
+
+        with open(os.path.join(root, INDEX_FILE), 'r') as f:
+            index = json.load(f)
+
+        self.n_windows = index['n_windows']
+        self.windows_per_shard = index['windows_per_shard']
+        self.window_shape = tuple(index['window_shape'])
+        self.storage_dtype = np.dtype(index['dtype'])
+        self.dtype = np.dtype(dtype)
+        self.shards = index['shards']
+        self.files = index['files']
+        self.attrs = index.get('attrs', {})
+        self.window_index = np.load(os.path.join(root, WINDOW_INDEX_FILE))
+
+        self._mmaps = {}
+
+    def __len__(self):
+        return self.n_windows
+
+    def _shard_paths(self, shard_id):
+        name = self.shards[shard_id]['name']
+        return (os.path.join(self.root, f'{name}_windows.npy'),
+                os.path.join(self.root, f'{name}_labels.npy'))
+
+    def _mapped_shard(self, shard_id):
+        """Memory-mapped (windows, labels) of a shard"""
+        if shard_id not in self._mmaps:
+            windows_path, labels_path = self._shard_paths(shard_id)
+            self._mmaps[shard_id] = (np.load(windows_path, mmap_mode='r'),
+                                     np.load(labels_path, mmap_mode='r'))
+        return self._mmaps[shard_id]
+
+    def read_shard(self, shard_id):
+        """Read a whole shard into memory: (windows, labels)"""
+        windows_path, labels_path = self._shard_paths(shard_id)
+        return (np.load(windows_path).astype(self.dtype, copy=False),
+                np.load(labels_path).astype(np.int64))
+
+    def __getitem__(self, i):
+        """Get (window, label) for global window index i"""
+        if i < 0:
+            i += self.n_windows
+        if not 0 <= i < self.n_windows:
+            raise IndexError(f"window index {i} out of range")
+
+        shard_id, row = divmod(i, self.windows_per_shard)
+        windows, labels = self._mapped_shard(shard_id)
+        return windows[row].astype(self.dtype, copy=False), int(labels[row])
+
+    def get_batch(self, indices):
+        """
+        Gather windows for arbitrary global indices (order is preserved)
+        Returns: X (len(indices), n_samples, 3), y (len(indices),)
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        X = np.empty((len(indices), *self.window_shape), dtype=self.dtype)
+        y = np.empty(len(indices), dtype=np.int64)
+
+        shard_ids, rows = np.divmod(indices, self.windows_per_shard)
+        for shard_id in np.unique(shard_ids):
+            mask = shard_ids == shard_id
+            windows, labels = self._mapped_shard(int(shard_id))
+            X[mask] = windows[rows[mask]]
+            y[mask] = labels[rows[mask]]
+
+        return X, y
+
+    def file_of(self, i):
+        """Source file metadata and start sample of window i"""
+        entry = self.window_index[i]
+        return self.files[int(entry['file_id'])], int(entry['start'])
+
+    def iter_batches(self, batch_size=32, shuffle=True, seed=None,
+                     shards_in_flight=4, n_workers=4):
+        """
+        Iterate over one epoch in batches
+
+        Groups of shards_in_flight shards are read concurrently by n_workers
+        threads, their windows are shuffled together, and the next group is
+        read while the current one is being consumed.
+
+        Yields: (X_batch, y_batch)
+        """
+        rng = np.random.default_rng(seed)
+        order = np.arange(len(self.shards))
+        if shuffle:
+            rng.shuffle(order)
+
+        groups = [order[i:i + shards_in_flight] for i in range(0, len(order), shards_in_flight)]
+        if not groups:
+            return
+
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            def submit(group):
+                return [executor.submit(self.read_shard, int(shard_id)) for shard_id in group]
+
+            pending = submit(groups[0])
+            carry_X = []
+            carry_y = []
+
+            for group_idx in range(len(groups)):
+                loaded = [future.result() for future in pending]
+                if group_idx + 1 < len(groups):
+                    pending = submit(groups[group_idx + 1])
+
+                X_group = np.concatenate(carry_X + [X for X, _ in loaded])
+                y_group = np.concatenate(carry_y + [y for _, y in loaded])
+
+                if shuffle:
+                    perm = rng.permutation(len(X_group))
+                    X_group = X_group[perm]
+                    y_group = y_group[perm]
+
+                n_full = len(X_group) // batch_size * batch_size
+                for start in range(0, n_full, batch_size):
+                    yield X_group[start:start + batch_size], y_group[start:start + batch_size]
+
+                carry_X = [X_group[n_full:]]
+                carry_y = [y_group[n_full:]]
+
+            if len(carry_X[0]) > 0:
+                yield carry_X[0], carry_y[0]
+
+
+def _source_files(loader, max_files=None):
+    """CSV files converted from the loader's data_dir (sorted, first max_files)"""
+    csv_files = sorted(glob.glob(os.path.join(loader.data_dir, '*.csv')))
+    if max_files:
+        csv_files = csv_files[:max_files]
+    return csv_files
+
+
+def _files_fingerprint(csv_files):
+    """Digest of file names, sizes and modification times (like WaveformStore staleness)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for filepath in csv_files:
+        st = os.stat(filepath)
+        digest.update(f"{os.path.basename(filepath)}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def shard_attrs(loader, max_files=None, overlap=0.5):
+    """
+    Source and preprocessing settings recorded in the index of converted shards
+    (compare with ShardedDataset.attrs before reusing existing shards)
+
+    'source_files' fingerprints the converted file list, so adding, removing
+    or editing CSVs is detected as well.
+    """
+    return {
+        'data_dir': os.path.abspath(loader.data_dir),
+        'max_files': max_files,
+        'source_files': _files_fingerprint(_source_files(loader, max_files)),
+        'sampling_rate': _json_safe(loader.sampling_rate),
+        'window_size': _json_safe(loader.window_size),
+        'overlap': overlap,
+        'band': [_json_safe(loader.preprocessor.freqmin), _json_safe(loader.preprocessor.freqmax)],
+        'filter_order': _json_safe(loader.preprocessor.order)
+    }
+
+
+def convert_csv_to_shards(loader, output_dir, windows_per_shard=4096, max_files=None,
+                          overlap=0.5, dtype=np.float32):
+    """
+    Convert a directory of CSV files into a sharded dataset
+
+    Files are preprocessed and windowed with the loader's settings, one at a
+    time, so memory use is bounded by a single shard.
+
+    Args:
+        loader: SeismicDataLoader (its cache_dir waveform store is used if set)
+        output_dir: Directory to write shards to
+        windows_per_shard: Number of windows per shard
+        max_files: Maximum number of files to convert (None = all)
+        overlap: Window overlap
+        dtype: Storage dtype of windows
+
+    Returns:
+        ShardedDataset opened on output_dir
+    """
+    csv_files = _source_files(loader, max_files)
+
+    print(f"Converting {len(csv_files)} CSV files to shards in {output_dir}")
+
+    store = loader.sync_waveform_store(csv_files) if loader.cache_dir else None
+    step = int(loader.n_samples * (1 - overlap))
+
+    writer = ShardWriter(
+        output_dir,
+        window_shape=(loader.n_samples, 3),
+        windows_per_shard=windows_per_shard,
+        dtype=dtype,
+        attrs=shard_attrs(loader, max_files=max_files, overlap=overlap)
+    )
+
+    for idx, filepath in enumerate(csv_files):
+        if idx % 100 == 0:
+            print(f"Processing file {idx + 1}/{len(csv_files)}")
+
+        windows, labels, meta = loader.process_file(filepath, store, overlap=overlap)
+        if windows is None:
+            print(f"Error loading {meta['filename']}: {meta['error']}")
+            writer.add_file(None, None, meta, None)
+            continue
+
+        writer.add_file(windows, labels, meta, np.arange(len(windows)) * step)
+
+    index = writer.close()
+    print(f"Wrote {index['n_windows']} windows in {len(index['shards'])} shards")
+    loader.report_feature_cache()
+
+    return ShardedDataset(output_dir)
+
+
+class ShardSubset:
+    """
+    A subset of the windows of a ShardedDataset (e.g. one train/val/test split)
+
+    Shards are still read whole; read_shard() keeps only the subset's rows.
+    """
+
+    def __init__(self, sharded, indices):
+        """
+        Args:
+            sharded: ShardedDataset
+            indices: Global window indices belonging to this subset
+        """
+        self.sharded = sharded
+        self.indices = np.sort(np.asarray(indices, dtype=np.int64))
+        self.shard_ids = np.unique(self.indices // sharded.windows_per_shard)
+
+    def __len__(self):
+        """Number of windows in the subset"""
+        return len(self.indices)
+
+    @property
+    def window_shape(self):
+        """Shape of one window, e.g. (3000, 3)"""
+        return self.sharded.window_shape
+
+    def read_shard(self, shard_id):
+        """Read the subset's windows of one shard: (windows, labels)"""
+        windows, labels = self.sharded.read_shard(shard_id)
+        first = shard_id * self.sharded.windows_per_shard
+        lo, hi = np.searchsorted(self.indices, [first, first + len(labels)])
+        rows = self.indices[lo:hi] - first
+        if len(rows) == len(labels):
+            return windows, labels
+        return windows[rows], labels[rows]
+
+    @property
+    def input_shape(self):
+        """Model input shape: (time, channels, 1)"""
+        return (*self.sharded.window_shape, 1)
+
+    @property
+    def shape(self):
+        """Shape of the subset as if it were materialized"""
+        return (len(self), *self.input_shape)
+
+    def load(self):
+        """
+        Read the whole subset into memory
+        Returns: X (n, time, 3, 1), y (n,) class labels
+        """
+        loaded = [self.read_shard(int(shard_id)) for shard_id in self.shard_ids]
+        if not loaded:
+            return (np.zeros((0, *self.input_shape), dtype=self.sharded.dtype),
+                    np.zeros(0, dtype=np.int64))
+        X = np.concatenate([windows for windows, _ in loaded])[..., np.newaxis]
+        y = np.concatenate([labels for _, labels in loaded])
+        return X, y
+
+
+def split_shards(sharded, test_size=0.2, val_size=0.1, random_state=42):
+    """
+    Split a sharded dataset into train/val/test by source file
+
+    Uses the per-window file ids of the window index, so all windows of a
+    file end up in one split regardless of shard boundaries and shard size.
+
+    Returns: train, val, test (ShardSubset)
+    """
+    from sklearn.model_selection import train_test_split
+
+    file_ids = sharded.window_index['file_id']
+    unique_files = np.unique(file_ids)
+    if len(unique_files) < 3:
+        raise ValueError(f"Need at least 3 files with windows to split (got {len(unique_files)})")
+
+    temp_files, test_files = train_test_split(unique_files, test_size=test_size,
+                                              random_state=random_state)
+    val_ratio = val_size / (1 - test_size)
+    train_files, val_files = train_test_split(temp_files, test_size=val_ratio,
+                                              random_state=random_state)
+
+    return tuple(ShardSubset(sharded, np.flatnonzero(np.isin(file_ids, files)))
+                 for files in (train_files, val_files, test_files))
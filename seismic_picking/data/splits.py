@@ -0,0 +1,115 @@
+"""
+Index-Based Dataset Splitting
+Train/val/test splits as index arrays over one shared window buffer
+"""
+
+import numpy as np
+from sklearn.model_selection import train_test_split
+
+
+def file_groups(metadata):
+    """
+    File id of every window, from load_dataset metadata (windows are in file order)
+    """
+    n_windows = [meta['n_windows'] for meta in metadata]
+    return np.repeat(np.arange(len(metadata)), n_windows)
+
+
+def _split_units(units, strata, test_size, random_state):
+    """Stratified split of units, falling back to a plain split if a stratum is too small"""
+    try:
+        return train_test_split(units, test_size=test_size, random_state=random_state,
+                                stratify=strata)
+    except ValueError:
+        return train_test_split(units, test_size=test_size, random_state=random_state)
+
+
+def split_window_indices(y, groups=None, test_size=0.2, val_size=0.1, random_state=42):
+    """
+    Split windows into train/val/test index arrays
+
+    Without groups, windows are split stratified by label. With groups
+    (e.g. file_groups(metadata)), whole groups are assigned to one split so
+    overlapping windows of an event never leak between sets; groups are
+    stratified by which phases (P, S) they contain.
+
+    Args:
+        y: (n_windows,) class labels
+        groups: Optional (n_windows,) group id of each window
+        test_size: Fraction of data for the test set
+        val_size: Fraction of data for the validation set
+        random_state: Random seed
+
+    Returns:
+        train_idx, val_idx, test_idx: Sorted window index arrays
+    """
+    y = np.asarray(y)
+
+    if groups is None:
+        units = np.arange(len(y))
+        strata = y
+    else:
+        groups = np.asarray(groups)
+        units, group_of_window = np.unique(groups, return_inverse=True)
+        has_p = np.zeros(len(units), dtype=bool)
+        has_s = np.zeros(len(units), dtype=bool)
+        has_p[group_of_window[y == 1]] = True
+        has_s[group_of_window[y == 2]] = True
+        strata = has_p * 1 + has_s * 2
+        units = np.arange(len(units))
+
+    temp_units, test_units = _split_units(units, strata, test_size, random_state)
+
+    val_ratio = val_size / (1 - test_size)
+    train_units, val_units = _split_units(temp_units, strata[temp_units], val_ratio, random_state)
+
+    if groups is None:
+        return np.sort(train_units), np.sort(val_units), np.sort(test_units)
+
+    return (np.flatnonzero(np.isin(group_of_window, train_units)),
+            np.flatnonzero(np.isin(group_of_window, val_units)),
+            np.flatnonzero(np.isin(group_of_window, test_units)))
+
+
+class WindowSubset:
+    """
+    Lazy view of a subset of a window buffer
+
+    Holds the shared X / y buffers and an index array; windows are gathered
+    only when a batch is requested, so train, val and test all read from
+    the same copy of the data.
+    """
+
+    def __init__(self, X, y, indices):
+        """
+        Args:
+            X: Shared window buffer, e.g. (n_windows, time, 3, 1)
+            y: Shared label buffer (class ids or one-hot)
+            indices: Window indices belonging to this subset
+        """
+        self.X = X
+        self.y = y
+        self.indices = np.asarray(indices, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.indices)
+
+    @property
+    def shape(self):
+        """Shape of the subset as if it were materialized"""
+        return (len(self.indices), *self.X.shape[1:])
+
+    @property
+    def labels(self):
+        """Labels of the subset (small copy)"""
+        return self.y[self.indices]
+
+    def __getitem__(self, item):
+        """Gather windows for a position, slice or index array within the subset"""
+        return self.X[self.indices[item]]
+
+    def batches(self, batch_size=32):
+        """Yield (X_batch, y_batch) in subset order"""
+        for start in range(0, len(self.indices), batch_size):
+            batch_indices = self.indices[start:start + batch_size]
+            yield self.X[batch_indices], self.y[batch_indices]
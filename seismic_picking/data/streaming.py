@@ -0,0 +1,127 @@
+"""
+Streaming Dataset for Seismic Training
+Yields preprocessed window batches lazily so datasets larger than RAM can be trained on
+"""
+
+import numpy as np
+
+
+class StreamingDataset:
+    """
+    Lazily load, preprocess and window a list of files into training batches
+
+    Only a block of files is held in memory at a time. Windows are shuffled
+    within each block and the file order is reshuffled on every pass, so
+    each epoch sees a different batch composition.
+    """
+
+    def __init__(self, loader, csv_files, batch_size=32, shuffle=True,
+                 files_per_block=32, augmentor=None, store=None,
+                 num_classes=3, seed=None):
+        """
+        Args:
+            loader: SeismicDataLoader used for preprocessing and windowing
+            csv_files: Files belonging to this split
+            batch_size: Batch size
+            shuffle: Whether to shuffle files and windows
+            files_per_block: Number of files processed and shuffled together
+            augmentor: Optional SeismicAugmentor applied to each window
+            store: Optional WaveformStore to read waveforms from
+            num_classes: Number of classes for one-hot labels
+            seed: Random seed for shuffling
+        """
+        self.loader = loader
+        self.csv_files = list(csv_files)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.files_per_block = files_per_block
+        self.augmentor = augmentor
+        self.store = store
+        self.num_classes = num_classes
+        self.rng = np.random.default_rng(seed)
+
+    @property
+    def input_shape(self):
+        """Model input shape: (time, channels, 1)"""
+        return (self.loader.n_samples, 3, 1)
+
+    def __len__(self):
+        """Number of files in this split"""
+        return len(self.csv_files)
+
+    def _load_block(self, file_indices):
+        """Process a block of files into windows and labels"""
+        block_windows = []
+        block_labels = []
+
+        for i in file_indices:
+            windows, labels, meta = self.loader.process_file(self.csv_files[i], self.store)
+            if windows is None:
+                print(f"Error loading {meta['filename']}: {meta['error']}")
+                continue
+            if len(windows) == 0:
+                continue
+            block_windows.append(windows)
+            block_labels.append(labels)
+
+        return block_windows, block_labels
+
+    def _make_batch(self, X_batch, y_batch):
+        """Augment, add channel axis and one-hot encode a batch"""
+        if self.augmentor is not None:
+            X_batch = self.augmentor.augment_batch(X_batch)
+
+        X_batch = X_batch.astype(np.float32, copy=False)[..., np.newaxis]
+        y_batch = np.eye(self.num_classes, dtype=np.float32)[y_batch]
+
+        return X_batch, y_batch
+
+    def __iter__(self):
+        """
+        Yield (X_batch, y_batch) with X_batch (B, time, 3, 1) and one-hot y_batch
+        """
+        order = np.arange(len(self.csv_files))
+        if self.shuffle:
+            self.rng.shuffle(order)
+
+        carry_X = []
+        carry_y = []
+
+        for block_start in range(0, len(order), self.files_per_block):
+            block_windows, block_labels = self._load_block(
+                order[block_start:block_start + self.files_per_block])
+            if not block_windows:
+                continue
+
+            X_block = np.concatenate(carry_X + block_windows)
+            y_block = np.concatenate(carry_y + block_labels).astype(np.int64)
+
+            if self.shuffle:
+                perm = self.rng.permutation(len(X_block))
+                X_block = X_block[perm]
+                y_block = y_block[perm]
+
+            n_full = len(X_block) // self.batch_size * self.batch_size
+            for start in range(0, n_full, self.batch_size):
+                yield self._make_batch(X_block[start:start + self.batch_size],
+                                       y_block[start:start + self.batch_size])
+
+            carry_X = [X_block[n_full:]]
+            carry_y = [y_block[n_full:]]
+
+        if carry_X and len(carry_X[0]) > 0:
+            yield self._make_batch(carry_X[0], carry_y[0])
+
+    def to_tf_dataset(self):
+        """
+        Wrap as tf.data.Dataset (re-iterated every epoch) for model.fit
+        """
+        import tensorflow as tf
+
+        output_signature = (
+            tf.TensorSpec(shape=(None, *self.input_shape), dtype=tf.float32),
+            tf.TensorSpec(shape=(None, self.num_classes), dtype=tf.float32)
+        )
+        dataset = tf.data.Dataset.from_generator(lambda: iter(self),
+                                                 output_signature=output_signature)
+        return dataset.prefetch(tf.data.AUTOTUNE)
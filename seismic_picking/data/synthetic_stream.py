@@ -0,0 +1,169 @@
+"""
+On-the-fly Synthetic Training Stream
+Generates, windows and labels fresh synthetic events in background threads
+"""
+
+import time
+import queue
+import threading
+import numpy as np
+
+
+class SyntheticStream:
+    """
+    Endless source of synthetic training batches
+
+    Background threads keep a bounded queue of preprocessed chunks filled
+    (numpy noise generation and scipy filtering release the GIL), so
+    generation overlaps with training. Every epoch draws new events;
+    nothing is written to disk. An exception in a worker is passed through
+    the queue and re-raised in the consumer.
+    """
+
+    def __init__(self, loader, batch_size=32, steps_per_epoch=100, events_per_chunk=256,
+                 n_workers=2, queue_size=4, augmentor=None, num_classes=3, seed=None,
+                 overlap=0.5):
+        """
+        Args:
+            loader: SeismicDataLoader used for preprocessing and windowing
+            batch_size: Batch size
+            steps_per_epoch: Batches yielded per pass (one epoch)
+            events_per_chunk: Events generated per worker task
+            n_workers: Background generator threads
+            queue_size: Maximum number of ready chunks held in memory
+            augmentor: Optional SeismicAugmentor applied to each window
+            num_classes: Number of classes for one-hot labels
+            seed: Random seed (each worker gets an independent child stream)
+            overlap: Window overlap
+        """
+        self.loader = loader
+        self.batch_size = batch_size
+        self.steps_per_epoch = steps_per_epoch
+        self.events_per_chunk = events_per_chunk
+        self.n_workers = max(1, n_workers)
+        self.queue_size = queue_size
+        self.augmentor = augmentor
+        self.num_classes = num_classes
+        self.overlap = overlap
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.rng = np.random.default_rng(self.seed_sequence.spawn(1)[0])
+
+        self.wait_seconds = 0.0  # Time the consumer spent waiting for chunks
+        self.n_chunks = 0
+
+        self._queue = None
+        self._stop = threading.Event()
+        self._workers = []
+
+    @property
+    def input_shape(self):
+        """Model input shape: (time, channels, 1)"""
+        return (self.loader.n_samples, 3, 1)
+
+    @property
+    def shape(self):
+        """Shape of one epoch as if it were materialized"""
+        return (len(self), *self.input_shape)
+
+    def __len__(self):
+        """Number of windows per epoch"""
+        return self.steps_per_epoch * self.batch_size
+
+    def _put(self, item):
+        """Put an item on the queue, giving up when stopped"""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _worker(self, seed_sequence):
+        """Generate chunks until stopped"""
+        rng = np.random.default_rng(seed_sequence)
+
+        while not self._stop.is_set():
+            try:
+                X, y, _, _ = self.loader.synthetic_windows(self.events_per_chunk, seed=rng,
+                                                           overlap=self.overlap)
+                if self.augmentor is not None:
+                    X = self.augmentor.augment_batch(X, rng=rng)
+            except Exception as error:
+                # Hand the error to the consumer instead of leaving it waiting forever
+                self._put((None, error))
+                return
+
+            self._put((X, y))
+
+    def start(self):
+        """Start background workers (called automatically on first iteration)"""
+        if self._workers:
+            return
+
+        self._stop.clear()
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        for child in self.seed_sequence.spawn(self.n_workers):
+            worker = threading.Thread(target=self._worker, args=(child,), daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def stop(self):
+        """Stop background workers"""
+        self._stop.set()
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+
+    def _next_chunk(self):
+        """Take the next ready chunk from the queue (shuffled)"""
+        start = time.perf_counter()
+        X, y = self._queue.get()
+        self.wait_seconds += time.perf_counter() - start
+        if X is None:
+            raise RuntimeError("Synthetic stream worker failed") from y
+        self.n_chunks += 1
+
+        perm = self.rng.permutation(len(X))
+        return X[perm], y[perm]
+
+    def __iter__(self):
+        """
+        Yield steps_per_epoch batches (X_batch (B, time, 3, 1), one-hot y_batch)
+        Workers are stopped when the epoch ends, fails or is abandoned
+        """
+        self.start()
+
+        X_chunk = np.zeros((0, *self.input_shape[:-1]), dtype=np.float32)
+        y_chunk = np.zeros(0, dtype=np.int64)
+        pos = 0
+
+        try:
+            for _ in range(self.steps_per_epoch):
+                while len(X_chunk) - pos < self.batch_size:
+                    X_new, y_new = self._next_chunk()
+                    X_chunk = np.concatenate([X_chunk[pos:], X_new])
+                    y_chunk = np.concatenate([y_chunk[pos:], y_new])
+                    pos = 0
+
+                X_batch = X_chunk[pos:pos + self.batch_size].astype(np.float32, copy=False)
+                y_batch = y_chunk[pos:pos + self.batch_size]
+                pos += self.batch_size
+
+                yield (X_batch[..., np.newaxis],
+                       np.eye(self.num_classes, dtype=np.float32)[y_batch])
+        finally:
+            self.stop()
+
+    def to_tf_dataset(self):
+        """
+        Wrap as tf.data.Dataset (re-iterated every epoch) for model.fit
+        """
+        import tensorflow as tf
+
+        output_signature = (
+            tf.TensorSpec(shape=(None, *self.input_shape), dtype=tf.float32),
+            tf.TensorSpec(shape=(None, self.num_classes), dtype=tf.float32)
+        )
+        dataset = tf.data.Dataset.from_generator(lambda: iter(self),
+                                                 output_signature=output_signature)
+        return dataset.prefetch(tf.data.AUTOTUNE)
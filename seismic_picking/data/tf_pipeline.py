@@ -0,0 +1,235 @@
+"""
+tf.data Input Pipelines
+Build shuffled, batched, prefetched datasets from arrays, cached files or shards
+"""
+
+import time
+import numpy as np
+import tensorflow as tf
+
+
+def _with_shapes(X_batch, y_batch, window_shape, label_shape):
+    """Restore static shapes lost in tf.numpy_function"""
+    X_batch.set_shape((None, *window_shape))
+    y_batch.set_shape((None, *label_shape))
+    return X_batch, y_batch
+
+
+def _one_hot_batch(num_classes, add_channel_axis=True):
+    """Map fn: cast windows to float32, add (..., 1) and one-hot encode labels"""
+    def convert(X_batch, y_batch):
+        X_batch = tf.cast(X_batch, tf.float32)
+        if add_channel_axis:
+            X_batch = X_batch[..., tf.newaxis]
+        return X_batch, tf.one_hot(tf.cast(y_batch, tf.int32), num_classes)
+    return convert
+
+
+def _finish(dataset, cache, shuffle, shuffle_buffer, seed):
+    """Optional cache() of decoded windows followed by an optional shuffle buffer"""
+    if cache is not None:
+        dataset = dataset.cache(cache)
+    if shuffle:
+        dataset = dataset.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+    return dataset
+
+
+def index_dataset(X, y, indices=None, batch_size=32, shuffle=True, seed=None, cache=None):
+    """
+    Dataset gathering (X[idx], y[idx]) batches from an in-memory window source
+
+    Only the index array goes into the graph; windows are gathered per batch
+    in parallel map calls, so X may be an array, memmap or any indexable
+    window source (e.g. VirtualWindowDataset) and is never copied into TF.
+
+    Args:
+        X: (n, time, 3, 1) window source
+        y: Labels matching X (e.g. one-hot)
+        indices: Subset of X to use (None = all)
+        batch_size: Batch size
+        shuffle: Reshuffle the indices every epoch
+        seed: Shuffle seed
+        cache: None = no cache, '' = cache gathered batches in memory,
+               path = cache on disk (use for fixed-order validation data)
+    """
+    if indices is None:
+        indices = np.arange(len(X))
+    indices = np.asarray(indices, dtype=np.int64)
+
+    def gather(batch_indices):
+        return (np.asarray(X[batch_indices], dtype=np.float32),
+                np.asarray(y[batch_indices], dtype=np.float32))
+
+    def gather_batch(batch_indices):
+        X_batch, y_batch = tf.numpy_function(gather, [batch_indices], (tf.float32, tf.float32))
+        return _with_shapes(X_batch, y_batch, X.shape[1:], np.shape(y)[1:])
+
+    dataset = tf.data.Dataset.from_tensor_slices(indices)
+    if shuffle:
+        dataset = dataset.shuffle(len(indices), seed=seed, reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size).map(gather_batch, num_parallel_calls=tf.data.AUTOTUNE)
+
+    if cache is not None and not shuffle:
+        dataset = dataset.cache(cache)
+
+    return dataset.prefetch(tf.data.AUTOTUNE)
+
+
+def file_dataset(loader, files, store=None, batch_size=32, num_classes=3, shuffle=True,
+                 shuffle_buffer=4096, cycle_length=4, cache=None, seed=None):
+    """
+    Dataset of windows read file by file through the loader
+
+    Files are read by interleaved parallel calls to loader.process_file, so
+    the waveform store and the feature cache are used when configured.
+    Decoded windows can be cached (cache='' in memory, or a file path) so
+    later epochs skip the reads.
+
+    Args:
+        loader: SeismicDataLoader
+        files: CSV paths
+        store: Optional WaveformStore
+        cycle_length: Files read concurrently
+        cache: None, '' or cache file path
+    """
+    window_shape = (loader.n_samples, 3)
+
+    def read(file_index):
+        windows, labels, meta = loader.process_file(files[int(file_index)], store)
+        if windows is None or len(windows) == 0:
+            return (np.zeros((0, *window_shape), dtype=np.float32),
+                    np.zeros(0, dtype=np.int64))
+        return np.asarray(windows, dtype=np.float32), np.asarray(labels, dtype=np.int64)
+
+    def read_file(file_index):
+        windows, labels = tf.numpy_function(read, [file_index], (tf.float32, tf.int64))
+        windows, labels = _with_shapes(windows, labels, window_shape, ())
+        return tf.data.Dataset.from_tensor_slices((windows, labels))
+
+    dataset = tf.data.Dataset.range(len(files))
+    if shuffle and cache is None:
+        dataset = dataset.shuffle(len(files), seed=seed, reshuffle_each_iteration=True)
+    dataset = dataset.interleave(read_file, cycle_length=cycle_length,
+                                 num_parallel_calls=tf.data.AUTOTUNE,
+                                 deterministic=not shuffle)
+
+    dataset = _finish(dataset, cache, shuffle, shuffle_buffer, seed)
+
+    return (dataset.batch(batch_size)
+            .map(_one_hot_batch(num_classes), num_parallel_calls=tf.data.AUTOTUNE)
+            .prefetch(tf.data.AUTOTUNE))
+
+
+def shard_dataset(sharded, shard_ids=None, batch_size=32, num_classes=3, shuffle=True,
+                  shuffle_buffer=8192, cycle_length=4, cache=None, seed=None):
+    """
+    Dataset of windows from a ShardedDataset
+
+    Whole shards are read by interleaved parallel calls (cycle_length shards
+    at a time) and cast from the storage dtype (e.g. float16) on the fly.
+
+    Args:
+        sharded: ShardedDataset, or a ShardSubset to read only its windows
+        shard_ids: Shards to use (None = all)
+        cycle_length: Shards read concurrently
+        cache: None, '' or cache file path
+    """
+    if shard_ids is None:
+        shard_ids = (sharded.shard_ids if hasattr(sharded, 'shard_ids')
+                     else np.arange(len(sharded.shards)))
+    shard_ids = np.asarray(shard_ids, dtype=np.int64)
+    window_shape = sharded.window_shape
+
+    def read(shard_id):
+        windows, labels = sharded.read_shard(int(shard_id))
+        return np.asarray(windows, dtype=np.float32), labels
+
+    def read_shard(shard_id):
+        windows, labels = tf.numpy_function(read, [shard_id], (tf.float32, tf.int64))
+        windows, labels = _with_shapes(windows, labels, window_shape, ())
+        return tf.data.Dataset.from_tensor_slices((windows, labels))
+
+    dataset = tf.data.Dataset.from_tensor_slices(shard_ids)
+    if shuffle and cache is None:
+        dataset = dataset.shuffle(len(shard_ids), seed=seed, reshuffle_each_iteration=True)
+    dataset = dataset.interleave(read_shard, cycle_length=cycle_length,
+                                 num_parallel_calls=tf.data.AUTOTUNE,
+                                 deterministic=not shuffle)
+
+    dataset = _finish(dataset, cache, shuffle, shuffle_buffer, seed)
+
+    return (dataset.batch(batch_size)
+            .map(_one_hot_batch(num_classes), num_parallel_calls=tf.data.AUTOTUNE)
+            .prefetch(tf.data.AUTOTUNE))
+
+
+class InputStallMonitor(tf.keras.callbacks.Callback):
+    """
+    Estimate the fraction of training time spent waiting for input
+
+    Keras fetches batches inside the compiled train step, so measured step
+    times include any wait for the input pipeline. After training, the same
+    compiled step is timed on one batch already in memory (compute only); the stall
+    fraction is 1 - compute / observed. Weights and optimizer state are
+    restored after the probe.
+    """
+
+    def __init__(self, probe_batch, probe_steps=20):
+        """
+        Args:
+            probe_batch: (X_batch, y_batch) of the training batch size
+            probe_steps: Number of timed compute-only steps
+        """
+        super().__init__()
+        self.probe_batch = probe_batch
+        self.probe_steps = probe_steps
+        self.step_times = []
+        self.stall_fraction = None
+        self.observed_step = None
+        self.compute_step = None
+        self._step_start = None
+
+    def on_train_batch_begin(self, batch, logs=None):
+        self._step_start = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        # The first step of every epoch includes iterator start-up (and tracing)
+        if batch > 0:
+            self.step_times.append(time.perf_counter() - self._step_start)
+
+    def _compute_step_time(self):
+        """Mean train step time on an in-memory batch"""
+        model = self.model
+        weights = model.get_weights()
+        optimizer_state = [variable.numpy() for variable in model.optimizer.variables]
+
+        # Same compiled step fit() uses, fed from a batch already in memory
+        probe = tf.data.Dataset.from_tensors(self.probe_batch).repeat()
+        iterator = iter(probe)
+        train_function = model.make_train_function()
+        for _ in range(2):
+            train_function(iterator)
+
+        start = time.perf_counter()
+        for _ in range(self.probe_steps):
+            logs = train_function(iterator)
+        tf.nest.map_structure(lambda value: value.numpy(), logs)
+        elapsed = (time.perf_counter() - start) / self.probe_steps
+
+        model.set_weights(weights)
+        for variable, value in zip(model.optimizer.variables, optimizer_state):
+            variable.assign(value)
+
+        return elapsed
+
+    def on_train_end(self, logs=None):
+        if not self.step_times:
+            return
+
+        self.observed_step = float(np.mean(self.step_times))
+        self.compute_step = self._compute_step_time()
+        self.stall_fraction = float(np.clip(1 - self.compute_step / self.observed_step, 0, 1))
+
+        print(f"\nInput pipeline: {self.observed_step * 1000:.1f} ms/step observed, "
+              f"{self.compute_step * 1000:.1f} ms/step compute only "
+              f"-> stall fraction {self.stall_fraction:.1%}")
@@ -0,0 +1,182 @@
+"""
+Virtual Windows over Continuous Traces
+Store each preprocessed trace once and describe windows as (trace_id, start, label)
+"""
+
+import os
+import glob
+import numpy as np
+
+
+WINDOW_DTYPE = np.dtype([('trace_id', '<i4'), ('start', '<i8'), ('label', '<i1')])
+
+
+class VirtualWindowDataset:
+    """
+    Windows as index tuples into one buffer of continuous traces
+
+    Every preprocessed trace is stored once in a contiguous buffer, so dense
+    overlaps or extra random-offset windows cost a table row each instead of
+    a full window copy. Batches are sliced from the buffer on demand.
+
+    Indexing with window row numbers returns (B, n_samples, 3, 1) batches,
+    so the dataset can be used as X in WindowSubset / CustomDataGenerator.
+    """
+
+    def __init__(self, loader, traces, p_arrivals, s_arrivals, names=None):
+        """
+        Args:
+            loader: SeismicDataLoader (window length, labeling rule, dtype)
+            traces: List of preprocessed (length, 3) waveforms
+            p_arrivals, s_arrivals: Arrival sample per trace (None = unknown)
+            names: Optional trace names (e.g. file names)
+        """
+        self.loader = loader
+        self.n_samples = loader.n_samples
+
+        lengths = np.array([len(trace) for trace in traces], dtype=np.int64)
+        self.trace_offsets = np.concatenate([[0], np.cumsum(lengths)])
+        self.trace_lengths = lengths
+        if traces:
+            self.buffer = np.concatenate(traces).astype(loader.dtype, copy=False)
+        else:
+            self.buffer = np.zeros((0, 3), dtype=loader.dtype)
+
+        self.p_arrivals = np.array([np.nan if p is None else p for p in p_arrivals], dtype=np.float64)
+        self.s_arrivals = np.array([np.nan if s is None else s for s in s_arrivals], dtype=np.float64)
+        self.names = list(names) if names is not None else [str(i) for i in range(len(traces))]
+
+        self.windows = np.zeros(0, dtype=WINDOW_DTYPE)
+
+    @classmethod
+    def from_loader(cls, loader, max_files=None, overlap=0.5):
+        """
+        Load and preprocess every CSV in loader.data_dir once and add grid windows
+
+        Args:
+            loader: SeismicDataLoader
+            max_files: Maximum number of files to load (None = all)
+            overlap: Overlap of the initial window grid (e.g. 0.9 for dense windows)
+        """
+        csv_files = sorted(glob.glob(os.path.join(loader.data_dir, '*.csv')))
+        if max_files:
+            csv_files = csv_files[:max_files]
+
+        print(f"Found {len(csv_files)} CSV files")
+
+        store = loader.sync_waveform_store(csv_files) if loader.cache_dir else None
+
+        traces, p_arrivals, s_arrivals, names = [], [], [], []
+        for idx, filepath in enumerate(csv_files):
+            if idx % 100 == 0:
+                print(f"Processing file {idx + 1}/{len(csv_files)}")
+
+            try:
+                waveform, p_arrival, s_arrival = loader.load_preprocessed(filepath, store)
+            except Exception as e:
+                print(f"Error loading {os.path.basename(filepath)}: {type(e).__name__}: {e}")
+                continue
+
+            traces.append(waveform)
+            p_arrivals.append(p_arrival)
+            s_arrivals.append(s_arrival)
+            names.append(os.path.basename(filepath))
+
+        dataset = cls(loader, traces, p_arrivals, s_arrivals, names)
+        dataset.add_grid_windows(overlap)
+
+        print(f"Stored {len(traces)} traces ({len(dataset.buffer)} samples) "
+              f"with {len(dataset)} windows")
+
+        return dataset
+
+    def _add(self, trace_ids, starts):
+        """Label and append windows; returns their row numbers"""
+        trace_ids = np.asarray(trace_ids, dtype=np.int64)
+        new = np.empty(len(trace_ids), dtype=WINDOW_DTYPE)
+        new['trace_id'] = trace_ids
+        new['start'] = starts
+        new['label'] = self.loader.window_labels(
+            starts, self.p_arrivals[trace_ids], self.s_arrivals[trace_ids]
+        )
+
+        first = len(self.windows)
+        self.windows = np.concatenate([self.windows, new])
+        return np.arange(first, len(self.windows))
+
+    def add_grid_windows(self, overlap=0.5, trace_ids=None):
+        """
+        Add regularly spaced windows over the given traces (None = all)
+        Returns: Row numbers of the added windows
+        """
+        step = int(self.n_samples * (1 - overlap))
+        if step <= 0:
+            raise ValueError(f"overlap must be < 1 (got {overlap})")
+
+        if trace_ids is None:
+            trace_ids = np.arange(len(self.trace_lengths))
+        trace_ids = np.asarray(trace_ids, dtype=np.int64)
+
+        lengths = self.trace_lengths[trace_ids]
+        counts = np.maximum(0, (lengths - self.n_samples) // step + 1)
+
+        window_traces = np.repeat(trace_ids, counts)
+        first_of_trace = np.repeat(np.cumsum(counts) - counts, counts)
+        starts = (np.arange(counts.sum()) - first_of_trace) * step
+
+        return self._add(window_traces, starts)
+
+    def add_random_windows(self, n_windows, trace_ids=None, seed=None):
+        """
+        Add windows at uniformly random offsets (traces weighted by length)
+        Returns: Row numbers of the added windows
+        """
+        rng = np.random.default_rng(seed)
+
+        if trace_ids is None:
+            trace_ids = np.arange(len(self.trace_lengths))
+        trace_ids = np.asarray(trace_ids, dtype=np.int64)
+
+        n_positions = self.trace_lengths[trace_ids] - self.n_samples + 1
+        trace_ids = trace_ids[n_positions > 0]
+        n_positions = n_positions[n_positions > 0]
+        if len(trace_ids) == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        chosen = rng.choice(len(trace_ids), size=n_windows, p=n_positions / n_positions.sum())
+        starts = rng.integers(0, n_positions[chosen])
+
+        return self._add(trace_ids[chosen], starts)
+
+    @property
+    def labels(self):
+        """Class label of every window"""
+        return self.windows['label'].astype(np.int64)
+
+    @property
+    def trace_ids(self):
+        """Trace id of every window (use as groups for file-level splits)"""
+        return self.windows['trace_id'].astype(np.int64)
+
+    def __len__(self):
+        return len(self.windows)
+
+    @property
+    def shape(self):
+        """Shape as if all windows were materialized: (n_windows, time, 3, 1)"""
+        return (len(self.windows), self.n_samples, 3, 1)
+
+    def __getitem__(self, rows):
+        """
+        Slice windows from the trace buffer
+        Returns: (B, n_samples, 3, 1) for an index array / slice, (n_samples, 3, 1) for an int
+        """
+        selected = self.windows[rows]
+        single = np.ndim(selected) == 0
+        selected = np.atleast_1d(selected)
+
+        base = self.trace_offsets[selected['trace_id']] + selected['start']
+        batch = self.buffer[base[:, np.newaxis] + np.arange(self.n_samples)]
+        batch = batch[..., np.newaxis]
+
+        return batch[0] if single else batch
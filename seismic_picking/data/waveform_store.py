@@ -0,0 +1,244 @@
+"""
+Binary Waveform Store
+Compact float32 cache of CSV seismograms so datasets are parsed only once
+"""
+
+import os
+import json
+import numpy as np
+
+
+class WaveformStore:
+    """
+    Contiguous float32 waveform store with a small JSON index
+
+    Raw amplitudes (e.g. counts) can exceed the float16 range, so this store
+    is always float32; float16 storage is only offered for normalized windows.
+
+    Layout of store_dir:
+        waveforms.bin - every waveform as float32 rows of (Z, N, E), back to back
+        index.json    - per file: row offset, length, p_arrival, s_arrival and
+                        the source size/mtime used to detect changed CSVs
+
+    Entries are keyed by absolute source path, so one store can be shared by
+    several data directories holding files with the same names.
+    """
+
+    DATA_FILE = 'waveforms.bin'
+    INDEX_FILE = 'index.json'
+
+    def __init__(self, store_dir, n_channels=3):
+        """
+        Args:
+            store_dir: Directory holding the binary store
+            n_channels: Number of components per sample (default 3)
+        """
+        self.store_dir = store_dir
+        self.n_channels = n_channels
+        self.data_path = os.path.join(store_dir, self.DATA_FILE)
+        self.index_path = os.path.join(store_dir, self.INDEX_FILE)
+        self.entries = {}
+        self._data = None
+
+        os.makedirs(store_dir, exist_ok=True)
+        self._read_index()
+
+    def _read_index(self):
+        """Load index from disk (empty store if missing or unreadable)"""
+        self.entries = {}
+        if not os.path.exists(self.index_path) or not os.path.exists(self.data_path):
+            return
+
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if index.get('n_channels') == self.n_channels:
+            # Re-key by source path (older indexes were keyed by file name)
+            self.entries = {entry['source']: entry for entry in index.get('entries', {}).values()}
+
+    def _write_index(self):
+        """Atomically write index to disk"""
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'n_channels': self.n_channels, 'entries': self.entries}, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _total_rows(self):
+        """Number of float32 rows currently in the data file"""
+        if not os.path.exists(self.data_path):
+            return 0
+        row_bytes = 4 * self.n_channels
+        return os.path.getsize(self.data_path) // row_bytes
+
+    def _open_data(self):
+        """Memory-map the data file (read-only)"""
+        if self._data is None:
+            n_rows = self._total_rows()
+            if n_rows == 0:
+                self._data = np.zeros((0, self.n_channels), dtype=np.float32)
+            else:
+                self._data = np.memmap(self.data_path, dtype=np.float32, mode='r',
+                                       shape=(n_rows, self.n_channels))
+        return self._data
+
+    def _close_data(self):
+        """Drop memory map so that the data file can be rewritten"""
+        self._data = None
+
+    @staticmethod
+    def _source_signature(filepath):
+        """Size and modification time used to detect changed source files"""
+        st = os.stat(filepath)
+        return st.st_size, st.st_mtime_ns
+
+    @staticmethod
+    def _key(filepath):
+        """Index key of a source file: its absolute path"""
+        return os.path.abspath(filepath)
+
+    @staticmethod
+    def _to_native(value):
+        """Convert numpy scalars to JSON-serializable Python values"""
+        if value is None:
+            return None
+        return np.asarray(value).item()
+
+    def is_stale(self, filepath):
+        """
+        True if the CSV is not in the store or changed since it was converted
+        """
+        entry = self.entries.get(self._key(filepath))
+        if entry is None:
+            return True
+        size, mtime_ns = self._source_signature(filepath)
+        return entry['source_size'] != size or entry['source_mtime_ns'] != mtime_ns
+
+    def sync(self, csv_files, load_fn):
+        """
+        Convert new or changed CSV files into the store
+
+        Unchanged entries are left untouched; only affected files are parsed.
+        Entries whose source file no longer exists are dropped.
+
+        Args:
+            csv_files: List of CSV paths
+            load_fn: Callable returning (waveform, p_arrival, s_arrival) for a path
+
+        Returns:
+            dict: Counts of 'unchanged', 'added', 'updated', 'failed' and 'removed'
+        """
+        stats = {'unchanged': 0, 'added': 0, 'updated': 0, 'failed': 0, 'removed': 0}
+        changed = False
+
+        stale_files = []
+        for filepath in csv_files:
+            if self.is_stale(filepath):
+                stale_files.append(filepath)
+            else:
+                stats['unchanged'] += 1
+
+        if stale_files:
+            self._close_data()
+            offset = self._total_rows()
+
+            with open(self.data_path, 'ab') as f:
+                for filepath in stale_files:
+                    key = self._key(filepath)
+                    existed = key in self.entries
+
+                    waveform, p_arrival, s_arrival = load_fn(filepath)
+                    if waveform is None:
+                        stats['failed'] += 1
+                        self.entries.pop(key, None)
+                        changed = True
+                        continue
+
+                    waveform = np.ascontiguousarray(waveform, dtype=np.float32)
+                    f.write(waveform.tobytes())
+
+                    size, mtime_ns = self._source_signature(filepath)
+                    self.entries[key] = {
+                        'source': key,
+                        'source_size': size,
+                        'source_mtime_ns': mtime_ns,
+                        'offset': offset,
+                        'length': len(waveform),
+                        'p_arrival': self._to_native(p_arrival),
+                        's_arrival': self._to_native(s_arrival),
+                    }
+                    offset += len(waveform)
+                    stats['updated' if existed else 'added'] += 1
+                    changed = True
+
+        for key in list(self.entries):
+            if not os.path.exists(self.entries[key]['source']):
+                del self.entries[key]
+                stats['removed'] += 1
+                changed = True
+
+        if changed:
+            self._write_index()
+            if self.dead_fraction() > 0.5:
+                self.compact()
+
+        return stats
+
+    def dead_fraction(self):
+        """Fraction of the data file no longer referenced by the index"""
+        total = self._total_rows()
+        if total == 0:
+            return 0.0
+        live = sum(entry['length'] for entry in self.entries.values())
+        return 1.0 - live / total
+
+    def compact(self):
+        """
+        Rewrite the data file without rows of replaced or removed entries
+        """
+        old_data = self._open_data()
+        tmp_path = self.data_path + '.tmp'
+
+        offset = 0
+        new_entries = {}
+        with open(tmp_path, 'wb') as f:
+            for key, entry in sorted(self.entries.items(), key=lambda kv: kv[1]['offset']):
+                start = entry['offset']
+                f.write(np.ascontiguousarray(old_data[start:start + entry['length']]).tobytes())
+                new_entries[key] = {**entry, 'offset': offset}
+                offset += entry['length']
+
+        del old_data
+        self._close_data()
+        os.replace(tmp_path, self.data_path)
+        self.entries = new_entries
+        self._write_index()
+
+    def __contains__(self, filepath):
+        return self._key(filepath) in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, filepath):
+        """
+        Get a stored waveform
+
+        Args:
+            filepath: CSV path (relative paths are resolved against the working directory)
+
+        Returns:
+            waveform: (length, n_channels) read-only float32 memmap view
+            p_arrival, s_arrival: Arrivals as stored in the CSV (or None)
+        """
+        entry = self.entries.get(self._key(filepath))
+        if entry is None:
+            return None, None, None
+
+        data = self._open_data()
+        start = entry['offset']
+        waveform = data[start:start + entry['length']]
+
+        return waveform, entry['p_arrival'], entry['s_arrival']
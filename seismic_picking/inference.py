@@ -15,20 +15,50 @@ from tensorflow import keras
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from data.data_loader import SeismicDataLoader
+from data.continuous import ContinuousRecordReader
+from models.scanner import SeismicCNNScanner
+from models.tflite import TFLitePicker
+from models.compiled import CompiledPredictor
 from utils.visualization import SeismicPlotter
 
 
+def load_picker_model(model_path, xla=False, batch_size=256):
+    """
+    Load a Keras (.h5 / .keras) or TFLite (.tflite) model
+    All expose predict(windows, batch_size=..., verbose=...)
+
+    Args:
+        model_path: Model file
+        xla: Wrap the Keras model in an XLA-compiled fixed-signature function
+        batch_size: Batch size of the compiled function
+    """
+    if model_path.endswith('.tflite'):
+        if xla:
+            raise ValueError("XLA compilation applies to Keras models, not .tflite exports")
+        return TFLitePicker(model_path)
+
+    model = keras.models.load_model(model_path)
+    if xla:
+        return CompiledPredictor(model, batch_size=batch_size, jit_compile=True)
+    return model
+
+
 def predict_seismic_phases(waveform_csv_path, model_path='best_model.h5',
-                          sampling_rate=100, visualize=True, output_dir='outputs'):
+                          sampling_rate=100, visualize=True, output_dir='outputs',
+                          scan=False, scan_step=None, xla=False):
     """
     Predict P and S wave arrivals from seismic waveform CSV
 
     Args:
         waveform_csv_path: Path to CSV file containing waveform
-        model_path: Path to trained model (.h5 file)
+        model_path: Path to trained model (.h5 file, or .tflite for the TFLite backend)
         sampling_rate: Sampling rate in Hz
         visualize: Whether to create visualization
         output_dir: Directory to save outputs
+        scan: Run the CNN once over the trace (SeismicCNNScanner) instead of per window
+        scan_step: Scan step in samples, a multiple of the model stride
+                   (default: the windowed step rounded to the stride)
+        xla: Predict with an XLA-compiled fixed-signature function
 
     Returns:
         dict: Dictionary containing prediction results
@@ -46,7 +76,7 @@ def predict_seismic_phases(waveform_csv_path, model_path='best_model.h5',
 
     # Load model
     print(f"\n📦 Loading model from {model_path}...")
-    model = keras.models.load_model(model_path)
+    model = load_picker_model(model_path, xla=xla, batch_size=32)
     print("✅ Model loaded successfully")
 
     # Load and preprocess waveform
@@ -77,22 +107,36 @@ def predict_seismic_phases(waveform_csv_path, model_path='best_model.h5',
     waveform_processed = loader.preprocess_waveform(waveform)
     print("✅ Preprocessing complete")
 
-    # Create windows for prediction
-    print("\n🔍 Creating windows for prediction...")
-    # Use small overlap for prediction
-    windows, _ = loader.create_windows(waveform_processed,
-                                      p_arrival=0,
-                                      s_arrival=0,
-                                      overlap=0.75)
-
-    # Reshape for CNN
-    windows = windows.reshape(windows.shape[0], windows.shape[1], windows.shape[2], 1)
-    print(f"   Created {len(windows)} windows of shape {windows.shape[1:]}")
+    window_step = int(loader.n_samples * 0.25)  # 75% overlap means 25% step
 
-    # Predict
-    print("\n🤖 Running prediction...")
-    predictions = model.predict(windows, verbose=0)
-    print("✅ Prediction complete")
+    if scan:
+        if isinstance(model, TFLitePicker):
+            raise ValueError("Scanning needs the Keras model (.h5), not a .tflite export")
+        # Single pass over the trace; windows share the conv computation
+        scanner = SeismicCNNScanner(model.model if isinstance(model, CompiledPredictor) else model)
+        if scan_step is None:
+            scan_step = max(1, round(window_step / scanner.stride)) * scanner.stride
+        print(f"\n🤖 Scanning trace (step {scan_step} samples)...")
+        window_starts, predictions = scanner.scan(waveform_processed, step=scan_step)
+        print(f"✅ Scanned {len(window_starts)} window positions")
+    else:
+        # Create windows for prediction
+        print("\n🔍 Creating windows for prediction...")
+        # Use small overlap for prediction
+        windows, _ = loader.create_windows(waveform_processed,
+                                          p_arrival=0,
+                                          s_arrival=0,
+                                          overlap=0.75)
+
+        # Add channel axis for CNN (keeps the strided view, no copy)
+        windows = windows[..., np.newaxis]
+        print(f"   Created {len(windows)} windows of shape {windows.shape[1:]}")
+
+        # Predict
+        print("\n🤖 Running prediction...")
+        predictions = model.predict(windows, verbose=0)
+        window_starts = np.arange(len(windows)) * window_step
+        print("✅ Prediction complete")
 
     # Find P and S arrivals (windows with highest probabilities)
     noise_probs = predictions[:, 0]
@@ -103,10 +147,9 @@ def predict_seismic_phases(waveform_csv_path, model_path='best_model.h5',
     p_window_idx = np.argmax(p_probs)
     s_window_idx = np.argmax(s_probs)
 
-    # Convert window indices to sample indices
-    window_step = int(loader.n_samples * 0.25)  # 75% overlap means 25% step
-    p_arrival_pred = p_window_idx * window_step + loader.n_samples // 2
-    s_arrival_pred = s_window_idx * window_step + loader.n_samples // 2
+    # Convert window indices to sample indices (window centre)
+    p_arrival_pred = int(window_starts[p_window_idx] + loader.n_samples // 2)
+    s_arrival_pred = int(window_starts[s_window_idx] + loader.n_samples // 2)
 
     # Calculate times in seconds
     p_time_pred = p_arrival_pred / sampling_rate
@@ -192,6 +235,96 @@ def predict_seismic_phases(waveform_csv_path, model_path='best_model.h5',
     return results
 
 
+def predict_continuous_record(waveform_csv_path, model_path='best_model.h5',
+                              sampling_rate=100, chunk_seconds=600, batch_size=256, xla=False):
+    """
+    Predict P and S wave arrivals from a long continuous CSV record
+
+    The record is read, filtered and windowed block by block
+    (see ContinuousRecordReader), so memory use does not grow with record length.
+
+    Args:
+        waveform_csv_path: Path to CSV file containing waveform
+        model_path: Path to trained model (.h5 file, or .tflite for the TFLite backend)
+        sampling_rate: Sampling rate in Hz
+        chunk_seconds: Length of each block read from the CSV
+        batch_size: Prediction batch size
+        xla: Predict with an XLA-compiled fixed-signature function
+
+    Returns:
+        dict: Dictionary containing prediction results
+    """
+    print("=" * 60)
+    print("SEISMIC PHASE PICKER - CONTINUOUS INFERENCE")
+    print("=" * 60)
+
+    if not os.path.exists(waveform_csv_path):
+        raise FileNotFoundError(f"Waveform CSV not found: {waveform_csv_path}")
+
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"Model not found: {model_path}")
+
+    print(f"\n📦 Loading model from {model_path}...")
+    model = load_picker_model(model_path, xla=xla, batch_size=batch_size)
+    print("✅ Model loaded successfully")
+
+    loader = SeismicDataLoader('.', sampling_rate=sampling_rate, window_size=30)
+    reader = ContinuousRecordReader(waveform_csv_path, loader, chunk_seconds=chunk_seconds,
+                                    overlap=0.75)
+
+    print(f"\n🔍 Streaming {waveform_csv_path} in {chunk_seconds}s blocks...")
+    all_starts = []
+    all_predictions = []
+    for starts, windows in reader.iter_windows():
+        all_starts.append(starts)
+        all_predictions.append(model.predict(windows[..., np.newaxis],
+                                             batch_size=batch_size, verbose=0))
+
+    if not all_starts:
+        raise ValueError(f"Record is shorter than one {loader.window_size}s window")
+
+    window_starts = np.concatenate(all_starts)
+    predictions = np.concatenate(all_predictions)
+    print(f"✅ Predicted {len(window_starts)} windows over {reader.n_samples_read} samples")
+
+    # Window with highest P and S probability, picked at the window centre
+    p_window_idx = np.argmax(predictions[:, 1])
+    s_window_idx = np.argmax(predictions[:, 2])
+    p_arrival_pred = int(window_starts[p_window_idx] + loader.n_samples // 2)
+    s_arrival_pred = int(window_starts[s_window_idx] + loader.n_samples // 2)
+
+    p_time_pred = p_arrival_pred / sampling_rate
+    s_time_pred = s_arrival_pred / sampling_rate
+
+    results = {
+        'p_arrival_sample': p_arrival_pred,
+        's_arrival_sample': s_arrival_pred,
+        'p_arrival_time': float(p_time_pred),
+        's_arrival_time': float(s_time_pred),
+        'sp_time': float(s_time_pred - p_time_pred),
+        'p_confidence': float(predictions[p_window_idx, 1]),
+        's_confidence': float(predictions[s_window_idx, 2]),
+        'n_windows': int(len(window_starts)),
+        'n_samples': int(reader.n_samples_read),
+    }
+
+    if reader.p_arrival is not None:
+        results['p_arrival_true'] = int(reader.p_arrival)
+        results['p_error_samples'] = int(p_arrival_pred - reader.p_arrival)
+        results['p_error_seconds'] = float((p_arrival_pred - reader.p_arrival) / sampling_rate)
+
+    if reader.s_arrival is not None:
+        results['s_arrival_true'] = int(reader.s_arrival)
+        results['s_error_samples'] = int(s_arrival_pred - reader.s_arrival)
+        results['s_error_seconds'] = float((s_arrival_pred - reader.s_arrival) / sampling_rate)
+
+    print(f"\n📍 P-wave: {p_time_pred:.2f}s (confidence {results['p_confidence']:.2%})")
+    print(f"📍 S-wave: {s_time_pred:.2f}s (confidence {results['s_confidence']:.2%})")
+    print("=" * 60)
+
+    return results
+
+
 def main():
     """
     Command-line interface for inference
@@ -199,24 +332,50 @@ def main():
     parser = argparse.ArgumentParser(description='Seismic Phase Picking Inference')
     parser.add_argument('waveform_csv', type=str, help='Path to waveform CSV file')
     parser.add_argument('--model', type=str, default='best_model.h5',
-                       help='Path to trained model (default: best_model.h5)')
+                       help='Path to trained model, .h5 or .tflite (TFLite backend) '
+                            '(default: best_model.h5)')
     parser.add_argument('--sampling-rate', type=int, default=100,
                        help='Sampling rate in Hz (default: 100)')
     parser.add_argument('--no-viz', action='store_true',
                        help='Disable visualization')
     parser.add_argument('--output-dir', type=str, default='outputs',
                        help='Output directory for results (default: outputs)')
+    parser.add_argument('--chunk-seconds', type=float, default=None,
+                       help='Read long records in blocks of this many seconds '
+                            '(bounded memory, no visualization)')
+    parser.add_argument('--scan', action='store_true',
+                       help='Run the CNN once over the whole trace instead of per window')
+    parser.add_argument('--scan-step', type=int, default=None,
+                       help='Scan step in samples, a multiple of the model stride '
+                            '(default: windowed step rounded to the stride)')
+    parser.add_argument('--xla', action='store_true',
+                       help='Predict with an XLA-compiled fixed-signature function (Keras models)')
 
     args = parser.parse_args()
+    if args.chunk_seconds and (args.scan or args.scan_step is not None):
+        parser.error("--scan/--scan-step cannot be combined with --chunk-seconds")
 
     # Run prediction
-    results = predict_seismic_phases(
-        waveform_csv_path=args.waveform_csv,
-        model_path=args.model,
-        sampling_rate=args.sampling_rate,
-        visualize=not args.no_viz,
-        output_dir=args.output_dir
-    )
+    if args.chunk_seconds:
+        results = predict_continuous_record(
+            waveform_csv_path=args.waveform_csv,
+            model_path=args.model,
+            sampling_rate=args.sampling_rate,
+            chunk_seconds=args.chunk_seconds,
+            xla=args.xla
+        )
+        os.makedirs(args.output_dir, exist_ok=True)
+    else:
+        results = predict_seismic_phases(
+            waveform_csv_path=args.waveform_csv,
+            model_path=args.model,
+            sampling_rate=args.sampling_rate,
+            visualize=not args.no_viz,
+            output_dir=args.output_dir,
+            scan=args.scan,
+            scan_step=args.scan_step,
+            xla=args.xla
+        )
 
     # Save results to JSON
     import json
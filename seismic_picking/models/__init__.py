@@ -1,3 +1,9 @@
-from .cnn_picker import SeismicCNNPicker, UNetPicker
+from .cnn_picker import (SeismicCNNPicker, UNetPicker, SeismicCNN1DPicker, UNet1DPicker,
+                         CompactCNNPicker)
+from .scanner import SeismicCNNScanner
+from .compiled import CompiledPredictor
+from .distillation import Distiller, StudentCheckpoint
 
-__all__ = ['SeismicCNNPicker', 'UNetPicker']
+__all__ = ['SeismicCNNPicker', 'UNetPicker', 'SeismicCNN1DPicker', 'UNet1DPicker',
+           'CompactCNNPicker', 'SeismicCNNScanner', 'CompiledPredictor',
+           'Distiller', 'StudentCheckpoint']
@@ -25,9 +25,14 @@ class SeismicCNNPicker:
         self.num_classes = num_classes
         self.model = None
 
-    def build_model(self, learning_rate=0.001):
+    def build_model(self, learning_rate=0.001, jit_compile='auto'):
         """
         Build 2D CNN architecture with attention mechanism
+
+        Args:
+            learning_rate: Adam learning rate
+            jit_compile: Compile the train/predict steps with XLA
+                         ('auto' = Keras default: XLA when a GPU is available)
         """
         inputs = keras.Input(shape=self.input_shape, name='seismic_input')
 
@@ -77,12 +82,13 @@ class SeismicCNNPicker:
         self.model.compile(
             optimizer=optimizer,
             loss='categorical_crossentropy',
-            metrics=['accuracy', keras.metrics.Precision(), keras.metrics.Recall()]
+            metrics=['accuracy', keras.metrics.Precision(), keras.metrics.Recall()],
+            jit_compile=jit_compile
         )
 
         return self.model
 
-    def build_regression_model(self, learning_rate=0.001):
+    def build_regression_model(self, learning_rate=0.001, jit_compile='auto'):
         """
         Build regression model for precise arrival time prediction
         Returns: (P_arrival_time, S_arrival_time)
@@ -126,7 +132,8 @@ class SeismicCNNPicker:
         self.model.compile(
             optimizer=optimizer,
             loss={'p_arrival': 'mse', 's_arrival': 'mse'},
-            metrics={'p_arrival': 'mae', 's_arrival': 'mae'}
+            metrics={'p_arrival': 'mae', 's_arrival': 'mae'},
+            jit_compile=jit_compile
         )
 
         return self.model
@@ -164,6 +171,16 @@ class SeismicCNNPicker:
             raise ValueError("Model not built yet. Call build_model() first.")
         return self.model.summary()
 
+    def to_scanner(self, **kwargs):
+        """
+        Fully-convolutional scanner for long traces (see models.scanner)
+        Returns: SeismicCNNScanner sharing this model's weights
+        """
+        if self.model is None:
+            raise ValueError("Model not built yet. Call build_model() first.")
+        from .scanner import SeismicCNNScanner
+        return SeismicCNNScanner(self.model, **kwargs)
+
 
 class UNetPicker:
     """
@@ -175,9 +192,14 @@ class UNetPicker:
         self.input_shape = input_shape
         self.model = None
 
-    def build_model(self, learning_rate=0.001):
+    def build_model(self, learning_rate=0.001, jit_compile='auto'):
         """
         Build U-Net architecture for seismic phase picking
+
+        Args:
+            learning_rate: Adam learning rate
+            jit_compile: Compile the train/predict steps with XLA
+                         ('auto' = Keras default: XLA when a GPU is available)
         """
         inputs = keras.Input(shape=self.input_shape)
 
@@ -223,7 +245,253 @@ class UNetPicker:
         self.model.compile(
             optimizer=optimizer,
             loss='categorical_crossentropy',
-            metrics=['accuracy']
+            metrics=['accuracy'],
+            jit_compile=jit_compile
+        )
+
+        return self.model
+
+
+class SeismicCNN1DPicker(SeismicCNNPicker):
+    """
+    1D CNN variant of SeismicCNNPicker
+
+    Components are channels of a (time_steps, 3) input instead of a width-3
+    image axis, so every convolution mixes all components at once without
+    sliding over them. Same blocks, filters and layer names as the 2D model
+    at a fraction of the FLOPs and activation memory. (T, 3, 1) windows from
+    the data pipeline are accepted too (Keras drops the trailing axis).
+    """
+
+    def __init__(self, input_shape=(3000, 3), num_classes=3):
+        """
+        Args:
+            input_shape: (time_steps, channels) - default 3000 samples, 3 components (Z, N, E)
+            num_classes: 3 classes (Noise, P-wave, S-wave)
+        """
+        super().__init__(input_shape=input_shape, num_classes=num_classes)
+
+    def build_model(self, learning_rate=0.001, jit_compile='auto'):
+        """
+        Build 1D CNN architecture with attention mechanism
+        """
+        inputs = keras.Input(shape=self.input_shape, name='seismic_input')
+
+        # First Convolutional Block
+        x = layers.Conv1D(32, 7, padding='same', activation='relu', name='conv1')(inputs)
+        x = layers.BatchNormalization()(x)
+        x = layers.MaxPooling1D(2, name='pool1')(x)
+        x = layers.Dropout(0.2)(x)
+
+        # Second Convolutional Block
+        x = layers.Conv1D(64, 5, padding='same', activation='relu', name='conv2')(x)
+        x = layers.BatchNormalization()(x)
+        x = layers.MaxPooling1D(2, name='pool2')(x)
+        x = layers.Dropout(0.2)(x)
+
+        # Third Convolutional Block
+        x = layers.Conv1D(128, 3, padding='same', activation='relu', name='conv3')(x)
+        x = layers.BatchNormalization()(x)
+        x = layers.MaxPooling1D(2, name='pool3')(x)
+        x = layers.Dropout(0.3)(x)
+
+        # Fourth Convolutional Block
+        x = layers.Conv1D(256, 3, padding='same', activation='relu', name='conv4')(x)
+        x = layers.BatchNormalization()(x)
+        x = layers.MaxPooling1D(2, name='pool4')(x)
+        x = layers.Dropout(0.3)(x)
+
+        # Attention Mechanism
+        attention = layers.Conv1D(1, 1, activation='sigmoid', name='attention')(x)
+        x = layers.Multiply()([x, attention])
+
+        # Global pooling and dense layers
+        x = layers.GlobalAveragePooling1D(name='global_pool')(x)
+        x = layers.Dense(512, activation='relu', name='dense1')(x)
+        x = layers.Dropout(0.5)(x)
+        x = layers.Dense(256, activation='relu', name='dense2')(x)
+        x = layers.Dropout(0.4)(x)
+
+        outputs = layers.Dense(self.num_classes, activation='softmax', name='output')(x)
+
+        self.model = keras.Model(inputs=inputs, outputs=outputs, name='SeismicCNN1D_Picker')
+
+        optimizer = keras.optimizers.Adam(learning_rate=learning_rate)
+        self.model.compile(
+            optimizer=optimizer,
+            loss='categorical_crossentropy',
+            metrics=['accuracy', keras.metrics.Precision(), keras.metrics.Recall()],
+            jit_compile=jit_compile
+        )
+
+        return self.model
+
+    def build_regression_model(self, learning_rate=0.001, jit_compile='auto'):
+        """
+        Build 1D regression model for precise arrival time prediction
+        Returns: (P_arrival_time, S_arrival_time)
+        """
+        inputs = keras.Input(shape=self.input_shape, name='seismic_input')
+
+        x = layers.Conv1D(32, 7, padding='same', activation='relu')(inputs)
+        x = layers.BatchNormalization()(x)
+        x = layers.MaxPooling1D(2)(x)
+        x = layers.Dropout(0.2)(x)
+
+        x = layers.Conv1D(64, 5, padding='same', activation='relu')(x)
+        x = layers.BatchNormalization()(x)
+        x = layers.MaxPooling1D(2)(x)
+        x = layers.Dropout(0.2)(x)
+
+        x = layers.Conv1D(128, 3, padding='same', activation='relu')(x)
+        x = layers.BatchNormalization()(x)
+        x = layers.MaxPooling1D(2)(x)
+        x = layers.Dropout(0.3)(x)
+
+        x = layers.Conv1D(256, 3, padding='same', activation='relu')(x)
+        x = layers.BatchNormalization()(x)
+        x = layers.GlobalAveragePooling1D()(x)
+
+        x = layers.Dense(512, activation='relu')(x)
+        x = layers.Dropout(0.5)(x)
+        x = layers.Dense(256, activation='relu')(x)
+        x = layers.Dropout(0.4)(x)
+
+        p_output = layers.Dense(1, activation='linear', name='p_arrival')(x)
+        s_output = layers.Dense(1, activation='linear', name='s_arrival')(x)
+
+        self.model = keras.Model(inputs=inputs, outputs=[p_output, s_output],
+                                name='SeismicCNN1D_Regression')
+
+        optimizer = keras.optimizers.Adam(learning_rate=learning_rate)
+        self.model.compile(
+            optimizer=optimizer,
+            loss={'p_arrival': 'mse', 's_arrival': 'mse'},
+            metrics={'p_arrival': 'mae', 's_arrival': 'mae'},
+            jit_compile=jit_compile
+        )
+
+        return self.model
+
+
+class UNet1DPicker(UNetPicker):
+    """
+    1D U-Net variant of UNetPicker
+    (time_steps, 3) input with components as channels; outputs
+    per-sample (time_steps, 3) Noise/P/S probabilities
+    """
+
+    def __init__(self, input_shape=(3000, 3)):
+        super().__init__(input_shape=input_shape)
+
+    def build_model(self, learning_rate=0.001, jit_compile='auto'):
+        """
+        Build 1D U-Net architecture for seismic phase picking
+        """
+        inputs = keras.Input(shape=self.input_shape)
+
+        # Encoder
+        c1 = layers.Conv1D(32, 3, activation='relu', padding='same')(inputs)
+        c1 = layers.Conv1D(32, 3, activation='relu', padding='same')(c1)
+        p1 = layers.MaxPooling1D(2)(c1)
+
+        c2 = layers.Conv1D(64, 3, activation='relu', padding='same')(p1)
+        c2 = layers.Conv1D(64, 3, activation='relu', padding='same')(c2)
+        p2 = layers.MaxPooling1D(2)(c2)
+
+        c3 = layers.Conv1D(128, 3, activation='relu', padding='same')(p2)
+        c3 = layers.Conv1D(128, 3, activation='relu', padding='same')(c3)
+        p3 = layers.MaxPooling1D(2)(c3)
+
+        # Bottleneck
+        c4 = layers.Conv1D(256, 3, activation='relu', padding='same')(p3)
+        c4 = layers.Conv1D(256, 3, activation='relu', padding='same')(c4)
+
+        # Decoder
+        u5 = layers.UpSampling1D(2)(c4)
+        u5 = layers.concatenate([u5, c3])
+        c5 = layers.Conv1D(128, 3, activation='relu', padding='same')(u5)
+        c5 = layers.Conv1D(128, 3, activation='relu', padding='same')(c5)
+
+        u6 = layers.UpSampling1D(2)(c5)
+        u6 = layers.concatenate([u6, c2])
+        c6 = layers.Conv1D(64, 3, activation='relu', padding='same')(u6)
+        c6 = layers.Conv1D(64, 3, activation='relu', padding='same')(c6)
+
+        u7 = layers.UpSampling1D(2)(c6)
+        u7 = layers.concatenate([u7, c1])
+        c7 = layers.Conv1D(32, 3, activation='relu', padding='same')(u7)
+        c7 = layers.Conv1D(32, 3, activation='relu', padding='same')(c7)
+
+        # Output: 3 channels (Noise, P-wave, S-wave probabilities)
+        outputs = layers.Conv1D(3, 1, activation='softmax')(c7)
+
+        self.model = keras.Model(inputs=inputs, outputs=outputs, name='UNet1D_Picker')
+
+        optimizer = keras.optimizers.Adam(learning_rate=learning_rate)
+        self.model.compile(
+            optimizer=optimizer,
+            loss='categorical_crossentropy',
+            metrics=['accuracy'],
+            jit_compile=jit_compile
+        )
+
+        return self.model
+
+
+class CompactCNNPicker(SeismicCNN1DPicker):
+    """
+    Small 1D CNN picker (e.g. a distillation student)
+
+    `depth` Conv1D blocks starting at `width` filters (doubled per block),
+    global average pooling and a single dense layer. Same build/compile API
+    and (time_steps, 3) input as SeismicCNN1DPicker.
+    """
+
+    def __init__(self, input_shape=(3000, 3), num_classes=3, width=16, depth=3, dense_units=64):
+        """
+        Args:
+            input_shape: (time_steps, channels)
+            num_classes: 3 classes (Noise, P-wave, S-wave)
+            width: Filters of the first conv block
+            depth: Number of conv blocks
+            dense_units: Units of the dense layer before the output
+        """
+        super().__init__(input_shape=input_shape, num_classes=num_classes)
+        self.width = width
+        self.depth = depth
+        self.dense_units = dense_units
+
+    def build_model(self, learning_rate=0.001, jit_compile='auto'):
+        """
+        Build compact 1D CNN architecture
+        """
+        inputs = keras.Input(shape=self.input_shape, name='seismic_input')
+
+        x = inputs
+        for block in range(self.depth):
+            kernel_size = 7 if block == 0 else 5 if block == 1 else 3
+            x = layers.Conv1D(self.width * 2 ** block, kernel_size, padding='same',
+                              activation='relu', name=f'conv{block + 1}')(x)
+            # Faster moving statistics: a small student often trains for few steps
+            x = layers.BatchNormalization(momentum=0.9)(x)
+            # Aggressive pooling keeps the sequence (and compute) short
+            x = layers.MaxPooling1D(4 if block < self.depth - 1 else 2, name=f'pool{block + 1}')(x)
+
+        x = layers.GlobalAveragePooling1D(name='global_pool')(x)
+        x = layers.Dense(self.dense_units, activation='relu', name='dense1')(x)
+        x = layers.Dropout(0.3)(x)
+
+        outputs = layers.Dense(self.num_classes, activation='softmax', name='output')(x)
+
+        self.model = keras.Model(inputs=inputs, outputs=outputs, name='CompactCNN_Picker')
+
+        optimizer = keras.optimizers.Adam(learning_rate=learning_rate)
+        self.model.compile(
+            optimizer=optimizer,
+            loss='categorical_crossentropy',
+            metrics=['accuracy', keras.metrics.Precision(), keras.metrics.Recall()],
+            jit_compile=jit_compile
         )
 
         return self.model
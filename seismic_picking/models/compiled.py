@@ -0,0 +1,65 @@
+"""
+Fixed-Signature Inference Function
+Trace (and optionally XLA-compile) a picker's forward pass once for repeated prediction
+"""
+
+import numpy as np
+import tensorflow as tf
+
+
+class CompiledPredictor:
+    """
+    model(x, training=False) as a tf.function with a fixed input signature
+
+    Every batch is padded to batch_size, so the function is traced - and
+    with jit_compile XLA-compiled - exactly once. model.predict goes through
+    the generic Keras data-adapter loop and retraces on new batch shapes.
+    """
+
+    def __init__(self, model, batch_size=256, jit_compile=True):
+        """
+        Args:
+            model: Keras model
+            batch_size: Fixed batch size of the compiled function
+            jit_compile: Compile the forward pass with XLA
+        """
+        self.model = model
+        self.batch_size = batch_size
+        self.jit_compile = jit_compile
+
+        signature = tf.TensorSpec((batch_size, *model.input_shape[1:]), tf.float32)
+        self._forward = tf.function(lambda x: model(x, training=False),
+                                    input_signature=[signature], jit_compile=jit_compile)
+
+    @property
+    def input_shape(self):
+        """Input shape of the wrapped model"""
+        return self.model.input_shape
+
+    def predict_on_batch(self, X_batch):
+        """Run up to batch_size windows through the compiled function"""
+        X_batch = np.asarray(X_batch, dtype=np.float32)
+        if X_batch.ndim == len(self.input_shape) - 1:
+            X_batch = X_batch[..., np.newaxis]  # (B, T, 3) windows for a (T, 3, 1) model
+        elif X_batch.ndim == len(self.input_shape) + 1:
+            X_batch = X_batch[..., 0]  # (B, T, 3, 1) windows for a (T, 3) model
+
+        n = len(X_batch)
+        if n < self.batch_size:
+            padded = np.zeros((self.batch_size, *X_batch.shape[1:]), dtype=np.float32)
+            padded[:n] = X_batch
+            X_batch = padded
+
+        return self._forward(X_batch).numpy()[:n]
+
+    def predict(self, X, batch_size=None, verbose=0):
+        """
+        Predict in chunks of the fixed batch size (same call as keras.Model.predict;
+        batch_size is accepted for compatibility and ignored)
+        Returns: (n, ...) model outputs
+        """
+        if len(X) == 0:
+            return np.zeros((0, *self.model.output_shape[1:]), dtype=np.float32)
+        outputs = [self.predict_on_batch(X[start:start + self.batch_size])
+                   for start in range(0, len(X), self.batch_size)]
+        return np.concatenate(outputs)
@@ -0,0 +1,61 @@
+"""
+Knowledge Distillation
+Train a compact student picker on the softened outputs of a trained teacher
+"""
+
+import tensorflow as tf
+from tensorflow import keras
+from tensorflow.keras.callbacks import ModelCheckpoint
+
+
+class Distiller(keras.Model):
+    """
+    Student model trained against a frozen teacher
+
+    Loss = alpha * CE(labels, student) + (1 - alpha) * T^2 * KL(teacher_T || student_T)
+    where *_T are the class distributions softened with temperature T
+    (softmax of log-probabilities / T). The teacher runs in inference mode
+    on the same (augmented) batches the student sees. Calling the distiller
+    runs only the student, so metrics and predictions are the student's.
+    """
+
+    def __init__(self, student, teacher, temperature=4.0, alpha=0.1, **kwargs):
+        """
+        Args:
+            student: Keras student model (softmax output)
+            teacher: Trained Keras teacher model (softmax output), kept frozen
+            temperature: Softening temperature T
+            alpha: Weight of the hard-label loss
+        """
+        super().__init__(**kwargs)
+        self.student = student
+        self.teacher = teacher
+        self.teacher.trainable = False
+        self.temperature = temperature
+        self.alpha = alpha
+
+    def call(self, inputs, training=False):
+        return self.student(inputs, training=training)
+
+    def _soften(self, probabilities):
+        """Log class distribution at temperature T"""
+        log_probabilities = tf.math.log(tf.clip_by_value(probabilities, 1e-7, 1.0))
+        return tf.nn.log_softmax(log_probabilities / self.temperature, axis=-1)
+
+    def compute_loss(self, x=None, y=None, y_pred=None, sample_weight=None, training=True):
+        teacher_pred = self.teacher(x, training=False)
+
+        teacher_log = self._soften(teacher_pred)
+        soft_loss = tf.reduce_sum(tf.exp(teacher_log) * (teacher_log - self._soften(y_pred)), axis=-1)
+        hard_loss = keras.losses.categorical_crossentropy(y, y_pred)
+        loss = (self.alpha * hard_loss
+                + (1 - self.alpha) * self.temperature ** 2 * soft_loss)
+
+        return tf.reduce_mean(loss)
+
+
+class StudentCheckpoint(ModelCheckpoint):
+    """ModelCheckpoint that saves the distiller's student instead of the distiller"""
+
+    def set_model(self, model):
+        super().set_model(getattr(model, 'student', model))
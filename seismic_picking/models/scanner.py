@@ -0,0 +1,190 @@
+"""
+Fully-Convolutional Scanning for SeismicCNNPicker
+Run the convolutional trunk once over a long trace instead of once per window
+"""
+
+import numpy as np
+from tensorflow import keras
+from tensorflow.keras import layers
+
+
+class SeismicCNNScanner:
+    """
+    Single-pass sliding-window inference with a trained SeismicCNNPicker
+    (2D or SeismicCNN1DPicker)
+
+    The picker is conv stack -> attention -> global average pooling -> dense
+    head. The conv stack is run once over the whole trace (weights shared
+    with the picker), giving one feature per `stride` samples (the product
+    of the time pooling sizes, 16 for the default picker). The global
+    average of a window is then a moving sum over that feature grid, and
+    the dense head turns every window mean into P/S/noise probabilities.
+
+    In the windowed path each window is zero-padded at its own edges, so the
+    few features next to a window edge differ from the shared grid. With
+    exact_edges=True those features are recomputed from short edge patches
+    taken at the same offsets, and the output matches model.predict on the
+    corresponding windows to float tolerance. exact_edges=False skips this
+    and lets windows see their real neighbours (one conv pass per sample).
+    """
+
+    def __init__(self, model, batch_size=1024, max_samples=500_000):
+        """
+        Args:
+            model: Trained SeismicCNNPicker / SeismicCNN1DPicker keras model (fixed window input)
+            batch_size: Batch size for edge patches and the dense head
+            max_samples: Trace samples per trunk pass (bounds memory on long traces;
+                         at least one window is always processed)
+        """
+        self.model = model
+        self.batch_size = batch_size
+        self.max_samples = max_samples
+        self.n_samples = model.input_shape[1]
+
+        self.trunk, self.head = self._split_model(model)
+        self.stride, self.n_features, self.left_margin, self.right_margin = self._receptive_field()
+        # 2D pickers keep a component (width) axis that global pooling averages too
+        self.image_input = len(model.input_shape) == 4
+        self.width = self.trunk.output_shape[2] if self.image_input else 1
+
+        # Edge patches reproduce the window's zero padding on one side and are
+        # long enough that their other edge does not reach the features used
+        margin = self.left_margin + self.right_margin
+        self.left_patch = self.stride * margin
+        self.right_patch = self.stride * margin + self.n_samples % self.stride
+
+    @staticmethod
+    def _split_model(model):
+        """
+        Rebuild the conv stack on a variable-length input and the dense head
+        on pooled features, reusing the picker's layers (and weights)
+        """
+        names = [layer.name for layer in model.layers]
+        if 'attention' not in names or 'global_pool' not in names:
+            raise ValueError("Scanning needs a SeismicCNNPicker model "
+                             "(attention and global_pool layers)")
+
+        inputs = keras.Input(shape=(None, *model.input_shape[2:]), name='trace_input')
+        x = inputs
+        attention = None
+        split = names.index('global_pool')
+        for layer in model.layers[:split]:
+            if isinstance(layer, layers.InputLayer):
+                continue
+            if layer.name == 'attention':
+                attention = layer(x)
+            elif isinstance(layer, layers.Multiply):
+                x = layer([x, attention])
+            else:
+                x = layer(x)
+        trunk = keras.Model(inputs, x, name='SeismicCNN_Trunk')
+
+        pooled = keras.Input(shape=(trunk.output_shape[-1],), name='pooled_features')
+        h = pooled
+        for layer in model.layers[split + 1:]:
+            if not isinstance(layer, layers.Dropout):
+                h = layer(h)
+        head = keras.Model(pooled, h, name='SeismicCNN_Head')
+
+        return trunk, head
+
+    def _receptive_field(self):
+        """
+        Time stride, features per window and the number of features at each
+        window edge that see the window's zero padding
+        Returns: (stride, n_features, left_margin, right_margin)
+        """
+        stride = 1
+        n_features = self.n_samples
+        left = right = 0
+
+        for layer in self.trunk.layers:
+            if isinstance(layer, (layers.Conv1D, layers.Conv2D)):
+                kernel = layer.kernel_size[0]
+                if (kernel > 1 and layer.padding != 'same') or layer.strides[0] != 1:
+                    raise ValueError(f"Unsupported convolution for scanning: {layer.name}")
+                left += (kernel - 1) // 2
+                right += kernel // 2
+            elif isinstance(layer, (layers.MaxPooling1D, layers.MaxPooling2D)):
+                pool = layer.pool_size[0]
+                if layer.strides[0] != pool or layer.padding != 'valid':
+                    raise ValueError(f"Unsupported pooling for scanning: {layer.name}")
+                stride *= pool
+                n_features //= pool
+                left = -(-left // pool)
+                right = -(-right // pool)
+
+        return stride, n_features, left, right
+
+    def _feature_sums(self, X):
+        """Trunk features (summed over the component axis of 2D models), as float64"""
+        if self.image_input:
+            features = self.trunk.predict(X[..., np.newaxis], batch_size=self.batch_size, verbose=0)
+            return features.sum(axis=2, dtype=np.float64)
+        features = self.trunk.predict(X, batch_size=self.batch_size, verbose=0)
+        return features.astype(np.float64)
+
+    def _edge_sums(self, segment, offsets):
+        """Summed edge features of the windows starting at offsets (exact zero padding)"""
+        patches = np.lib.stride_tricks.sliding_window_view(segment, self.left_patch, axis=0)
+        left = self._feature_sums(patches[offsets].transpose(0, 2, 1))
+        left = left[:, :self.left_margin].sum(axis=1)
+
+        right_start = self.n_samples - self.right_patch
+        patches = np.lib.stride_tricks.sliding_window_view(segment, self.right_patch, axis=0)
+        right = self._feature_sums(patches[offsets + right_start].transpose(0, 2, 1))
+        right = right[:, -self.right_margin:].sum(axis=1)
+
+        return left + right
+
+    def _scan_segment(self, segment, offsets, exact_edges):
+        """Window-mean features for windows at offsets within one segment"""
+        # Moving sums over the shared feature grid
+        shared = self._feature_sums(segment[np.newaxis])[0]
+        cumulative = np.concatenate([np.zeros((1, shared.shape[1])), np.cumsum(shared, axis=0)])
+
+        k = offsets // self.stride
+        if exact_edges:
+            sums = (cumulative[k + self.n_features - self.right_margin]
+                    - cumulative[k + self.left_margin])
+            sums += self._edge_sums(segment, offsets)
+        else:
+            sums = cumulative[k + self.n_features] - cumulative[k]
+
+        return sums / (self.n_features * self.width)
+
+    def scan(self, waveform, step=None, exact_edges=True):
+        """
+        Probabilities for every window position along a trace
+
+        Args:
+            waveform: Preprocessed trace (n_samples, 3), any length >= one window
+            step: Window step in samples, a multiple of self.stride
+                  (default: self.stride, the finest step)
+            exact_edges: Reproduce per-window zero padding (matches the windowed path)
+
+        Returns:
+            starts: Window start samples (n_windows,)
+            predictions: (n_windows, num_classes) probabilities [Noise, P, S]
+        """
+        step = self.stride if step is None else int(step)
+        if step % self.stride != 0:
+            raise ValueError(f"step must be a multiple of the model stride ({self.stride})")
+
+        waveform = np.asarray(waveform, dtype=np.float32)
+        if len(waveform) < self.n_samples:
+            raise ValueError(f"Trace is shorter than one window ({self.n_samples} samples)")
+
+        starts = np.arange(0, len(waveform) - self.n_samples + 1, step)
+        # Window positions whose samples fit in one trunk pass of max_samples
+        positions = max(1, (self.max_samples - self.n_samples) // step + 1)
+        pooled = []
+        for first in range(0, len(starts), positions):
+            block = starts[first:first + positions]
+            segment = waveform[block[0]:block[-1] + self.n_samples]
+            pooled.append(self._scan_segment(segment, block - block[0], exact_edges))
+
+        pooled = np.concatenate(pooled).astype(np.float32)
+        predictions = self.head.predict(pooled, batch_size=self.batch_size, verbose=0)
+
+        return starts, predictions
@@ -0,0 +1,119 @@
+"""
+TFLite Export and CPU Inference Backend
+Convert trained pickers to TFLite (optionally quantized) and run them with the TFLite interpreter
+"""
+
+import numpy as np
+import tensorflow as tf
+
+try:
+    from ai_edge_litert.interpreter import Interpreter
+except ImportError:
+    Interpreter = tf.lite.Interpreter
+
+
+QUANTIZATION_MODES = ('float', 'dynamic', 'int8')
+
+
+def export_tflite(model, output_path, quantization='float', calibration_windows=None):
+    """
+    Convert a Keras picker to a TFLite flatbuffer
+
+    Args:
+        model: Trained Keras model
+        output_path: Path of the .tflite file
+        quantization: 'float' (no quantization), 'dynamic' (int8 weights,
+                      float activations) or 'int8' (int8 weights and
+                      activations, float input/output)
+        calibration_windows: Training windows shaped like the model input,
+                             required for 'int8' to calibrate activation ranges
+
+    Returns:
+        Size of the written model in bytes
+    """
+    if quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization: {quantization} (use one of {QUANTIZATION_MODES})")
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+
+    if quantization in ('dynamic', 'int8'):
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    if quantization == 'int8':
+        if calibration_windows is None or len(calibration_windows) == 0:
+            raise ValueError("int8 quantization needs calibration_windows")
+
+        window_shape = tuple(model.input_shape[1:])
+
+        def representative_dataset():
+            for window in calibration_windows:
+                window = np.asarray(window, dtype=np.float32).reshape(window_shape)
+                yield [window[np.newaxis]]
+
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+
+    tflite_model = converter.convert()
+    with open(output_path, 'wb') as f:
+        f.write(tflite_model)
+
+    return len(tflite_model)
+
+
+class TFLitePicker:
+    """
+    TFLite interpreter with the predict() interface of a Keras picker
+
+    Windows are fed batch by batch; the interpreter is resized only when the
+    batch size changes.
+    """
+
+    def __init__(self, model_path, num_threads=None):
+        """
+        Args:
+            model_path: Path to a .tflite model
+            num_threads: Interpreter threads (None = TFLite default)
+        """
+        self.model_path = model_path
+        self.interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+        self.input_details = self.interpreter.get_input_details()[0]
+        self.output_details = self.interpreter.get_output_details()[0]
+        self._batch_size = None
+
+    @property
+    def input_shape(self):
+        """Model input shape with batch dimension, like keras.Model.input_shape"""
+        return (None, *self.input_details['shape_signature'][1:])
+
+    def _resize(self, batch_size):
+        """Resize the input for a new batch size"""
+        if batch_size != self._batch_size:
+            self.interpreter.resize_tensor_input(
+                self.input_details['index'], [batch_size, *self.input_shape[1:]])
+            self.interpreter.allocate_tensors()
+            self._batch_size = batch_size
+
+    def predict_on_batch(self, X_batch):
+        """Run one batch through the interpreter"""
+        X_batch = np.asarray(X_batch, dtype=np.float32)
+        if X_batch.ndim == len(self.input_shape) - 1:
+            X_batch = X_batch[..., np.newaxis]  # (B, T, 3) windows for a (T, 3, 1) model
+        elif X_batch.ndim == len(self.input_shape) + 1:
+            X_batch = X_batch[..., 0]  # (B, T, 3, 1) windows for a (T, 3) model
+
+        self._resize(len(X_batch))
+        self.interpreter.set_tensor(self.input_details['index'], X_batch)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self.output_details['index']).copy()
+
+    def predict(self, X, batch_size=32, verbose=0):
+        """
+        Predict in batches (same call as keras.Model.predict)
+        Returns: (n, ...) model outputs
+        """
+        if len(X) == 0:
+            return np.zeros((0, *self.output_details['shape_signature'][1:]),
+                            dtype=self.output_details['dtype'])
+        outputs = [self.predict_on_batch(X[start:start + batch_size])
+                   for start in range(0, len(X), batch_size)]
+        return np.concatenate(outputs)
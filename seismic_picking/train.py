@@ -9,13 +9,28 @@ import numpy as np
 import matplotlib.pyplot as plt
 from datetime import datetime
 import json
+import time
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from models.cnn_picker import SeismicCNNPicker, UNetPicker
+from tensorflow import keras
+from tensorflow.keras.callbacks import ModelCheckpoint
+
+from models.cnn_picker import (SeismicCNNPicker, UNetPicker, SeismicCNN1DPicker, UNet1DPicker,
+                               CompactCNNPicker)
+from models.distillation import Distiller, StudentCheckpoint
+from models.tflite import export_tflite, TFLitePicker
+from models.compiled import CompiledPredictor
 from data.data_loader import SeismicDataLoader, SyntheticDataGenerator
-from utils.augmentation import SeismicAugmentor, CustomDataGenerator
+from data.streaming import StreamingDataset
+from data.synthetic_stream import SyntheticStream
+from data.splits import WindowSubset, split_window_indices
+from data.shards import ShardedDataset, ShardSubset, split_shards, shard_attrs
+from data.tf_pipeline import index_dataset, file_dataset, shard_dataset, InputStallMonitor
+from data.virtual_windows import VirtualWindowDataset
+from utils.augmentation import (SeismicAugmentor, TensorflowDataAugmentation, MixupAugmentation,
+                                CustomDataGenerator)
 from utils.visualization import SeismicPlotter, STALTADetector
 
 
@@ -33,26 +48,28 @@ class TrainingPipeline:
         self.model = None
         self.history = None
         self.data_loader = None
+        self.streamed_y_test = None
+        self.calibration_source = None  # Training windows for int8 calibration
+        self.test_data = None  # (X_test, y_test) for the TFLite accuracy check
+        self.teacher = None  # Teacher model in distillation mode
         self.plotter = SeismicPlotter(config.get('sampling_rate', 100))
 
         # Create output directory
         self.output_dir = config.get('output_dir', 'outputs')
         os.makedirs(self.output_dir, exist_ok=True)
 
-    def prepare_data(self):
+    def _init_data_loader(self):
         """
-        Load and prepare training data
+        Create the data loader, generating synthetic data if data_dir is empty
+        (unless synthetic data is generated in memory, see 'data_source')
         """
-        print("=" * 60)
-        print("PREPARING DATA")
-        print("=" * 60)
-
         data_dir = self.config['data_dir']
         sampling_rate = self.config.get('sampling_rate', 100)
         window_size = self.config.get('window_size', 30)
+        in_memory = self.config.get('data_source', 'csv') in ('synthetic', 'synthetic_stream')
 
         # Check if data directory exists and has CSV files
-        if not os.path.exists(data_dir) or len(os.listdir(data_dir)) == 0:
+        if not in_memory and (not os.path.exists(data_dir) or len(os.listdir(data_dir)) == 0):
             print(f"Warning: Data directory '{data_dir}' is empty or doesn't exist.")
             print("Generating synthetic dataset for demonstration...")
 
@@ -61,13 +78,44 @@ class TrainingPipeline:
             generator.save_synthetic_csv(data_dir, n_samples=self.config.get('n_synthetic', 200))
 
         # Initialize data loader
-        self.data_loader = SeismicDataLoader(data_dir, sampling_rate, window_size)
+        self.data_loader = SeismicDataLoader(
+            data_dir, sampling_rate, window_size,
+            cache_dir=self.config.get('cache_dir', None),
+            feature_cache_dir=self.config.get('feature_cache_dir', None),
+            feature_cache_max_gb=self.config.get('feature_cache_max_gb', 20.0),
+            storage_dtype=self.config.get('storage_dtype', 'float32')
+        )
+
+        return self.data_loader
+
+    def prepare_data(self):
+        """
+        Load and prepare training data
+        """
+        if self.config.get('data_source', 'csv') == 'synthetic_stream':
+            return self.prepare_synthetic_stream()
+
+        print("=" * 60)
+        print("PREPARING DATA")
+        print("=" * 60)
+
+        self._init_data_loader()
 
         # Load dataset
-        max_files = self.config.get('max_files', None)
-        X, y, metadata = self.data_loader.load_dataset(max_files)
+        if self.config.get('data_source', 'csv') == 'synthetic':
+            X, y, metadata = self.data_loader.load_synthetic(
+                self.config.get('n_synthetic', 200),
+                seed=self.config.get('random_seed', 42),
+                n_workers=self.config.get('n_workers', 1)
+            )
+        else:
+            max_files = self.config.get('max_files', None)
+            X, y, metadata = self.data_loader.load_dataset(max_files,
+                                                           n_workers=self.config.get('n_workers', 1))
+        failed_files = [meta['filename'] for meta in metadata if 'error' in meta]
 
         print(f"\nDataset loaded: {len(X)} samples")
+        cache_stats = self.data_loader.feature_cache_stats
         print(f"Class distribution:")
         unique, counts = np.unique(y, return_counts=True)
         for cls, count in zip(unique, counts):
@@ -75,11 +123,20 @@ class TrainingPipeline:
             print(f"  {cls_name}: {count} ({count / len(y) * 100:.1f}%)")
 
         # Prepare for training
-        X_train, X_val, X_test, y_train, y_val, y_test = self.data_loader.prepare_for_training(
-            X, y,
-            test_size=self.config.get('test_size', 0.2),
-            val_size=self.config.get('val_size', 0.1)
-        )
+        if self.config.get('split_mode', 'copy') == 'index':
+            # Splits are index views over one shared buffer (split per file)
+            X_train, X_val, X_test = self.data_loader.prepare_indexed_split(
+                X, y, metadata,
+                test_size=self.config.get('test_size', 0.2),
+                val_size=self.config.get('val_size', 0.1)
+            )
+            y_train, y_val, y_test = X_train.labels, X_val.labels, X_test.labels
+        else:
+            X_train, X_val, X_test, y_train, y_val, y_test = self.data_loader.prepare_for_training(
+                X, y,
+                test_size=self.config.get('test_size', 0.2),
+                val_size=self.config.get('val_size', 0.1)
+            )
 
         # Save metadata
         self.metadata = {
@@ -87,6 +144,8 @@ class TrainingPipeline:
             'n_train': len(X_train),
             'n_val': len(X_val),
             'n_test': len(X_test),
+            'failed_files': failed_files,
+            'feature_cache': cache_stats,
             'input_shape': X_train.shape[1:],
             'class_distribution': {
                 cls_name: int(count)
@@ -96,6 +155,201 @@ class TrainingPipeline:
 
         return X_train, X_val, X_test, y_train, y_val, y_test
 
+    def prepare_synthetic_stream(self):
+        """
+        Prepare an endless synthetic training stream plus fixed synthetic val/test sets
+        Returns: X_train (SyntheticStream), X_val, X_test, y_train (None), y_val, y_test
+        """
+        print("=" * 60)
+        print("PREPARING SYNTHETIC STREAM")
+        print("=" * 60)
+
+        self._init_data_loader()
+
+        seed = self.config.get('random_seed', 42)
+        n_events = self.config.get('n_synthetic', 200)
+        X_train = SyntheticStream(
+            self.data_loader,
+            batch_size=self.config.get('batch_size', 32),
+            steps_per_epoch=self.config.get('steps_per_epoch', 100),
+            events_per_chunk=self.config.get('events_per_chunk', 256),
+            n_workers=self.config.get('n_workers', 1),
+            seed=seed
+        )
+
+        # Fixed held-out sets so that epochs are comparable (seeds differ from training)
+        eval_sets = []
+        for offset, fraction in ((1, self.config.get('val_size', 0.1)),
+                                 (2, self.config.get('test_size', 0.2))):
+            X, y, _, _ = self.data_loader.synthetic_windows(
+                max(1, int(n_events * fraction)), seed=[seed, offset]
+            )
+            eval_sets.append((X[..., np.newaxis], np.eye(3, dtype=np.float32)[y]))
+        (X_val, y_val), (X_test, y_test) = eval_sets
+
+        print(f"Training stream: {X_train.steps_per_epoch} batches of {X_train.batch_size} per epoch")
+        print(f"Validation set: {X_val.shape}")
+        print(f"Test set: {X_test.shape}")
+
+        self.metadata = {
+            'synthetic_stream': True,
+            'n_train': len(X_train),
+            'n_val': len(X_val),
+            'n_test': len(X_test),
+            'input_shape': X_train.input_shape
+        }
+
+        return X_train, X_val, X_test, None, y_val, y_test
+
+    def prepare_shard_data(self):
+        """
+        Prepare train/val splits read from shards and an in-memory test set
+        Shards are (re)written from data_dir if shard_dir has no index or was
+        written from other files or settings
+        Returns: X_train, X_val (ShardSubset), X_test, None, None, y_test (one-hot)
+        """
+        print("=" * 60)
+        print("PREPARING SHARDED DATA")
+        print("=" * 60)
+
+        self._init_data_loader()
+
+        shard_dir = self.config.get('shard_dir', 'seismic_picking/cache/shards')
+        max_files = self.config.get('max_files', None)
+        sharded = None
+        if os.path.exists(os.path.join(shard_dir, 'index.json')):
+            sharded = ShardedDataset(shard_dir)
+            # Reuse shards only if they were written from the same files and settings
+            # (file list, sizes and modification times are fingerprinted)
+            expected = shard_attrs(self.data_loader, max_files=max_files)
+            stale = sorted(key for key, value in expected.items() if sharded.attrs.get(key) != value)
+            if sharded.storage_dtype != self.data_loader.storage_dtype:
+                stale.append('dtype')
+            if stale:
+                print(f"Shards in {shard_dir} were written with different settings "
+                      f"({', '.join(stale)}), rewriting")
+                sharded = None
+
+        if sharded is None:
+            sharded = self.data_loader.write_shards(
+                shard_dir,
+                windows_per_shard=self.config.get('windows_per_shard', 4096),
+                max_files=max_files
+            )
+
+        X_train, X_val, test_subset = split_shards(
+            sharded,
+            test_size=self.config.get('test_size', 0.2),
+            val_size=self.config.get('val_size', 0.1)
+        )
+        X_test, y_test = test_subset.load()
+        y_test = np.eye(3, dtype=np.float32)[y_test]
+
+        print(f"Train: {len(X_train)} windows in {len(X_train.shard_ids)} shards")
+        print(f"Validation: {len(X_val)} windows in {len(X_val.shard_ids)} shards")
+        print(f"Test: {len(X_test)} windows (loaded)")
+
+        self.metadata = {
+            'shard_dir': shard_dir,
+            'feature_cache': self.data_loader.feature_cache_stats,
+            'n_samples': len(sharded),
+            'n_train': len(X_train),
+            'n_val': len(X_val),
+            'n_test': len(X_test),
+            'input_shape': X_train.input_shape
+        }
+
+        return X_train, X_val, X_test, None, None, y_test
+
+    def prepare_streaming_data(self):
+        """
+        Prepare lazily-loaded datasets split by file (for datasets larger than RAM)
+        Returns: train_data, val_data, test_data (StreamingDataset)
+        """
+        print("=" * 60)
+        print("PREPARING STREAMING DATA")
+        print("=" * 60)
+
+        self._init_data_loader()
+
+        train_data, val_data, test_data = self.data_loader.streaming_datasets(
+            max_files=self.config.get('max_files', None),
+            test_size=self.config.get('test_size', 0.2),
+            val_size=self.config.get('val_size', 0.1),
+            batch_size=self.config.get('batch_size', 32),
+            files_per_block=self.config.get('files_per_block', 32)
+        )
+
+        self.metadata = {
+            'streaming': True,
+            'n_train_files': len(train_data),
+            'n_val_files': len(val_data),
+            'n_test_files': len(test_data),
+            'input_shape': train_data.input_shape
+        }
+
+        return train_data, val_data, test_data
+
+    def prepare_virtual_data(self):
+        """
+        Prepare virtual windows over continuous traces, split by trace
+        Returns: X_train, X_val, X_test, y_train, y_val, y_test (WindowSubset views, y one-hot)
+        """
+        print("=" * 60)
+        print("PREPARING VIRTUAL WINDOW DATA")
+        print("=" * 60)
+
+        self._init_data_loader()
+
+        dataset = VirtualWindowDataset.from_loader(
+            self.data_loader,
+            max_files=self.config.get('max_files', None),
+            overlap=self.config.get('virtual_overlap', 0.5)
+        )
+
+        train_idx, val_idx, test_idx = split_window_indices(
+            dataset.labels, dataset.trace_ids,
+            test_size=self.config.get('test_size', 0.2),
+            val_size=self.config.get('val_size', 0.1)
+        )
+
+        # Extra random-offset windows come from training traces only
+        n_random = self.config.get('n_random_windows', 0)
+        if n_random:
+            train_traces = np.unique(dataset.trace_ids[train_idx])
+            added = dataset.add_random_windows(n_random, train_traces,
+                                               seed=self.config.get('random_seed', 42))
+            train_idx = np.concatenate([train_idx, added])
+            print(f"Added {len(added)} random-offset training windows")
+
+        y = dataset.labels
+        y_cat = np.eye(3, dtype=np.float32)[y]
+
+        X_train = WindowSubset(dataset, y_cat, train_idx)
+        X_val = WindowSubset(dataset, y_cat, val_idx)
+        X_test = WindowSubset(dataset, y_cat, test_idx)
+
+        print(f"\nTrain set: {len(X_train)} windows")
+        print(f"Validation set: {len(X_val)} windows")
+        print(f"Test set: {len(X_test)} windows")
+
+        unique, counts = np.unique(y, return_counts=True)
+        self.metadata = {
+            'virtual_windows': True,
+            'n_traces': len(dataset.trace_lengths),
+            'n_samples': len(dataset),
+            'n_train': len(X_train),
+            'n_val': len(X_val),
+            'n_test': len(X_test),
+            'input_shape': dataset.shape[1:],
+            'class_distribution': {
+                cls_name: int(count)
+                for cls_name, count in zip(['Noise', 'P-wave', 'S-wave'], counts)
+            }
+        }
+
+        return X_train, X_val, X_test, X_train.labels, X_val.labels, X_test.labels
+
     def build_model(self, input_shape):
         """
         Build CNN model
@@ -106,23 +360,121 @@ class TrainingPipeline:
 
         model_type = self.config.get('model_type', 'cnn')
         learning_rate = self.config.get('learning_rate', 0.001)
+        jit_compile = self.config.get('jit_compile', 'auto')
+
+        if self.config.get('distillation', False):
+            return self._build_distiller(input_shape, learning_rate, jit_compile)
 
         if model_type == 'cnn':
             picker = SeismicCNNPicker(input_shape=input_shape, num_classes=3)
-            self.model = picker.build_model(learning_rate=learning_rate)
+            self.model = picker.build_model(learning_rate=learning_rate, jit_compile=jit_compile)
             print("Built CNN Picker model")
         elif model_type == 'unet':
             picker = UNetPicker(input_shape=input_shape)
-            self.model = picker.build_model(learning_rate=learning_rate)
+            self.model = picker.build_model(learning_rate=learning_rate, jit_compile=jit_compile)
             print("Built U-Net Picker model")
+        elif model_type == 'cnn1d':
+            # Components as channels: (time, 3); (time, 3, 1) batches are squeezed by Keras
+            picker = SeismicCNN1DPicker(input_shape=tuple(input_shape[:2]), num_classes=3)
+            self.model = picker.build_model(learning_rate=learning_rate, jit_compile=jit_compile)
+            print("Built 1D CNN Picker model")
+        elif model_type == 'unet1d':
+            picker = UNet1DPicker(input_shape=tuple(input_shape[:2]))
+            self.model = picker.build_model(learning_rate=learning_rate, jit_compile=jit_compile)
+            print("Built 1D U-Net Picker model")
         else:
             raise ValueError(f"Unknown model type: {model_type}")
 
+        if jit_compile is True:
+            print("XLA compilation enabled (jit_compile)")
+
         print(f"\nModel summary:")
         self.model.summary()
 
         return picker
 
+    def _build_distiller(self, input_shape, learning_rate, jit_compile):
+        """
+        Load the teacher checkpoint and wrap a compact student in a Distiller
+        """
+        teacher_path = self.config.get('teacher_model', None)
+        if not teacher_path or not os.path.exists(teacher_path):
+            raise FileNotFoundError(f"Teacher checkpoint not found: {teacher_path}")
+
+        self.teacher = keras.models.load_model(teacher_path, compile=False)
+
+        picker = CompactCNNPicker(
+            input_shape=tuple(input_shape[:2]),
+            num_classes=3,
+            width=self.config.get('student_width', 16),
+            depth=self.config.get('student_depth', 3),
+            dense_units=self.config.get('student_dense_units', 64)
+        )
+        student = picker.build_model(learning_rate=learning_rate, jit_compile=jit_compile)
+
+        self.model = Distiller(
+            student, self.teacher,
+            temperature=self.config.get('distill_temperature', 4.0),
+            alpha=self.config.get('distill_alpha', 0.1)
+        )
+        self.model.compile(
+            optimizer=keras.optimizers.Adam(learning_rate=learning_rate),
+            metrics=['accuracy'],
+            jit_compile=jit_compile
+        )
+
+        print(f"Distilling {teacher_path} ({self.teacher.count_params():,} params) "
+              f"into a compact student ({student.count_params():,} params)")
+        print(f"Temperature {self.model.temperature}, hard-label weight {self.model.alpha}")
+
+        print(f"\nStudent summary:")
+        student.summary()
+
+        return picker
+
+    def _tf_data_inputs(self, X_train, y_train, X_val, y_val, batch_size):
+        """
+        Build tf.data train/validation datasets for any of the data modes
+        Returns: train_dataset, validation_dataset
+        """
+        seed = self.config.get('random_seed', 42)
+        cycle_length = self.config.get('interleave_cycle', 4)
+        cache = self.config.get('tf_data_cache', None)
+        # Each split needs its own cache file: datasets sharing a path read
+        # back whichever split was cached first
+        train_cache, val_cache = (cache, cache) if not cache else (f"{cache}_train", f"{cache}_val")
+
+        if isinstance(X_train, ShardSubset):
+            print("Reading shards with interleaved parallel reads")
+            train_dataset = shard_dataset(X_train, X_train.shard_ids, batch_size, seed=seed,
+                                          shuffle_buffer=self.config.get('shuffle_buffer', 8192),
+                                          cycle_length=cycle_length, cache=train_cache)
+            validation_dataset = shard_dataset(X_val, X_val.shard_ids, batch_size,
+                                               shuffle=False, cycle_length=cycle_length,
+                                               cache=val_cache)
+        elif isinstance(X_train, StreamingDataset):
+            print("Reading files through the loader caches with interleaved parallel reads")
+            train_dataset = file_dataset(X_train.loader, X_train.csv_files, X_train.store,
+                                         batch_size, seed=seed,
+                                         shuffle_buffer=self.config.get('shuffle_buffer', 8192),
+                                         cycle_length=cycle_length, cache=train_cache)
+            validation_dataset = file_dataset(X_val.loader, X_val.csv_files, X_val.store,
+                                              batch_size, shuffle=False, cycle_length=cycle_length,
+                                              cache=val_cache)
+        elif isinstance(X_train, SyntheticStream):
+            train_dataset = X_train.to_tf_dataset()
+            validation_dataset = index_dataset(X_val, y_val, batch_size=batch_size, shuffle=False)
+        elif isinstance(X_train, WindowSubset):
+            train_dataset = index_dataset(X_train.X, X_train.y, X_train.indices, batch_size, seed=seed)
+            validation_dataset = index_dataset(X_val.X, X_val.y, X_val.indices, batch_size,
+                                               shuffle=False, cache=val_cache)
+        else:
+            train_dataset = index_dataset(X_train, y_train, batch_size=batch_size, seed=seed)
+            validation_dataset = index_dataset(X_val, y_val, batch_size=batch_size,
+                                               shuffle=False, cache=val_cache)
+
+        return train_dataset, validation_dataset
+
     def train(self, X_train, y_train, X_val, y_val):
         """
         Train the model
@@ -134,16 +486,110 @@ class TrainingPipeline:
         batch_size = self.config.get('batch_size', 32)
         epochs = self.config.get('epochs', 50)
         use_augmentation = self.config.get('use_augmentation', True)
+        tf_augmentation = use_augmentation and self.config.get('augmentation_backend', 'numpy') == 'tf'
+        prefetch_options = {
+            'n_workers': self.config.get('generator_workers', 0),
+            'prefetch_depth': self.config.get('prefetch_depth', 4),
+            'seed': self.config.get('random_seed', 42)
+        }
+        if prefetch_options['n_workers'] > 0:
+            print(f"Preparing batches in {prefetch_options['n_workers']} worker processes")
+
+        mixer = None
+        if self.config.get('mixup'):
+            mixer = MixupAugmentation(alpha=self.config.get('mixup_alpha', 0.2),
+                                      mode=self.config['mixup'],
+                                      seed=self.config.get('random_seed', 42))
+            print(f"Using {mixer.mode} (alpha={mixer.alpha}) on training batches")
+
+        use_tf_data = (self.config.get('input_pipeline', 'default') == 'tf_data'
+                       or isinstance(X_train, ShardSubset))
 
         # Setup data generators
-        if use_augmentation:
-            print("Using data augmentation during training")
-            augmentor = SeismicAugmentor(augmentation_prob=0.5)
+        if use_tf_data:
+            print("Using tf.data input pipeline")
+            train_generator, validation_data = self._tf_data_inputs(
+                X_train, y_train, X_val, y_val, batch_size)
+            if use_augmentation:
+                # NumPy augmentors cannot run inside the graph; use the TF-op stage
+                print("Using graph-mode tf.data augmentation during training")
+                train_generator = TensorflowDataAugmentation.augment_dataset(
+                    train_generator,
+                    augmentation_prob=0.5,
+                    sampling_rate=self.config.get('sampling_rate', 100)
+                )
+            if mixer is not None:
+                train_generator = mixer.mix_dataset(train_generator)
+        elif tf_augmentation:
+            print("Using graph-mode tf.data augmentation during training")
+            if isinstance(X_train, StreamingDataset):
+                print("Streaming training data from disk")
+                train_dataset = X_train.to_tf_dataset()
+                validation_data = X_val.to_tf_dataset()
+            elif isinstance(X_train, SyntheticStream):
+                print("Generating synthetic training data on the fly")
+                train_dataset = X_train.to_tf_dataset()
+                validation_data = (X_val, y_val)
+            elif isinstance(X_train, WindowSubset):
+                train_dataset = index_dataset(X_train.X, X_train.y, X_train.indices, batch_size)
+                validation_data = CustomDataGenerator(
+                    X_val.X, X_val.y, batch_size=batch_size, shuffle=False, indices=X_val.indices
+                )
+            else:
+                train_dataset = index_dataset(X_train, y_train, batch_size=batch_size)
+                validation_data = (X_val, y_val)
+            train_generator = TensorflowDataAugmentation.augment_dataset(
+                train_dataset,
+                augmentation_prob=0.5,
+                sampling_rate=self.config.get('sampling_rate', 100)
+            )
+            if mixer is not None:
+                train_generator = mixer.mix_dataset(train_generator)
+        elif isinstance(X_train, StreamingDataset):
+            print("Streaming training data from disk")
+            if use_augmentation:
+                print("Using data augmentation during training")
+                X_train.augmentor = SeismicAugmentor(augmentation_prob=0.5)
+            train_generator = X_train.to_tf_dataset()
+            if mixer is not None:
+                train_generator = mixer.mix_dataset(train_generator)
+            validation_data = X_val.to_tf_dataset()
+        elif isinstance(X_train, SyntheticStream):
+            print("Generating synthetic training data on the fly")
+            if use_augmentation:
+                print("Using data augmentation during training")
+                X_train.augmentor = SeismicAugmentor(augmentation_prob=0.5)
+            train_generator = X_train.to_tf_dataset()
+            if mixer is not None:
+                train_generator = mixer.mix_dataset(train_generator)
+            validation_data = (X_val, y_val)
+        elif isinstance(X_train, WindowSubset):
+            if use_augmentation:
+                print("Using data augmentation during training")
+            augmentor = SeismicAugmentor(augmentation_prob=0.5) if use_augmentation else None
+            train_generator = CustomDataGenerator(
+                X_train.X, X_train.y,
+                batch_size=batch_size,
+                augmentor=augmentor,
+                shuffle=True,
+                indices=X_train.indices,
+                mixer=mixer,
+                **prefetch_options
+            )
+            validation_data = CustomDataGenerator(
+                X_val.X, X_val.y, batch_size=batch_size, shuffle=False, indices=X_val.indices
+            )
+        elif use_augmentation or mixer is not None:
+            if use_augmentation:
+                print("Using data augmentation during training")
+            augmentor = SeismicAugmentor(augmentation_prob=0.5) if use_augmentation else None
             train_generator = CustomDataGenerator(
                 X_train, y_train,
                 batch_size=batch_size,
                 augmentor=augmentor,
-                shuffle=True
+                shuffle=True,
+                mixer=mixer,
+                **prefetch_options
             )
             validation_data = (X_val, y_val)
         else:
@@ -155,6 +601,19 @@ class TrainingPipeline:
         picker = SeismicCNNPicker()
         checkpoint_path = os.path.join(self.output_dir, 'best_model.h5')
         callbacks = picker.get_callbacks(checkpoint_path)
+        if isinstance(self.model, Distiller):
+            # Checkpoint the student, not the distiller wrapping the teacher
+            callbacks = [
+                StudentCheckpoint(checkpoint_path, monitor='val_loss', save_best_only=True, verbose=1)
+                if isinstance(callback, ModelCheckpoint) else callback
+                for callback in callbacks
+            ]
+
+        stall_monitor = None
+        if use_tf_data and self.config.get('report_input_stall', True):
+            X_probe, y_probe = next(iter(train_generator.take(1)))
+            stall_monitor = InputStallMonitor((X_probe.numpy(), y_probe.numpy()))
+            callbacks.append(stall_monitor)
 
         # Train model
         print(f"\nStarting training for {epochs} epochs...")
@@ -167,6 +626,15 @@ class TrainingPipeline:
         )
 
         print("\nTraining completed!")
+        if isinstance(self.model, Distiller):
+            self.model = self.model.student  # Evaluate, save and export the student
+        if stall_monitor is not None and stall_monitor.stall_fraction is not None:
+            self.metadata['input_stall_fraction'] = stall_monitor.stall_fraction
+        if isinstance(train_generator, CustomDataGenerator):
+            train_generator.close()
+        if isinstance(X_train, SyntheticStream):
+            X_train.stop()
+            print(f"Input wait: {X_train.wait_seconds:.1f}s for {X_train.n_chunks} generated chunks")
 
         # Save training history
         history_path = os.path.join(self.output_dir, 'training_history.json')
@@ -186,14 +654,37 @@ class TrainingPipeline:
         print("=" * 60)
 
         # Evaluate
-        results = self.model.evaluate(X_test, y_test, verbose=1)
+        if isinstance(X_test, StreamingDataset):
+            results = self.model.evaluate(X_test.to_tf_dataset(), verbose=1)
+        elif isinstance(X_test, WindowSubset):
+            test_generator = CustomDataGenerator(
+                X_test.X, X_test.y, shuffle=False, indices=X_test.indices
+            )
+            results = self.model.evaluate(test_generator, verbose=1)
+        else:
+            results = self.model.evaluate(X_test, y_test, verbose=1)
 
         print("\nTest Results:")
         for metric_name, value in zip(self.model.metrics_names, results):
             print(f"  {metric_name}: {value:.4f}")
 
         # Get predictions
-        y_pred = self.model.predict(X_test)
+        if isinstance(X_test, StreamingDataset):
+            y_true = []
+            y_pred = []
+            for X_batch, y_batch in X_test:
+                y_true.append(y_batch)
+                y_pred.append(self.model.predict_on_batch(X_batch))
+            self.streamed_y_test = np.concatenate(y_true)
+            y_pred = np.concatenate(y_pred)
+        elif isinstance(X_test, WindowSubset):
+            y_pred = self.model.predict(test_generator)
+        elif self.config.get('jit_compile', 'auto') is True:
+            # Fixed-signature XLA function: compiled once, reused for every batch
+            predictor = CompiledPredictor(self.model, batch_size=self.config.get('batch_size', 32))
+            y_pred = predictor.predict(X_test)
+        else:
+            y_pred = self.model.predict(X_test)
 
         # Save results
         results_dict = {
@@ -207,6 +698,58 @@ class TrainingPipeline:
 
         return results, y_pred
 
+    def compare_with_teacher(self, X_test, y_test):
+        """
+        Throughput and accuracy of the distilled student next to its teacher
+        """
+        print("\n" + "=" * 60)
+        print("TEACHER VS STUDENT")
+        print("=" * 60)
+
+        X_eval, y_eval = self._window_sample(
+            X_test, y_test, n_samples=self.config.get('distill_eval_samples', 512))
+        batch_size = self.config.get('batch_size', 32)
+
+        report = {}
+        predictions = {}
+        for name, model in (('teacher', self.teacher), ('student', self.model)):
+            model.predict(X_eval[:batch_size], batch_size=batch_size, verbose=0)  # Warm up
+            start = time.perf_counter()
+            predictions[name] = model.predict(X_eval, batch_size=batch_size, verbose=0)
+            elapsed = time.perf_counter() - start
+
+            report[name] = {
+                'params': int(model.count_params()),
+                'windows_per_second': len(X_eval) / elapsed
+            }
+            if y_eval is not None:
+                report[name]['accuracy'] = float(np.mean(
+                    np.argmax(predictions[name], axis=1) == np.argmax(y_eval, axis=1)))
+
+        report['speedup'] = (report['student']['windows_per_second']
+                             / report['teacher']['windows_per_second'])
+        report['agreement'] = float(np.mean(
+            np.argmax(predictions['teacher'], axis=1) == np.argmax(predictions['student'], axis=1)))
+
+        print(f"{len(X_eval)} test windows, batch {batch_size}")
+        print(f"\n{'':<10} {'Params':>12} {'Windows/s':>12} {'Accuracy':>10}")
+        for name in ('teacher', 'student'):
+            accuracy = report[name].get('accuracy')
+            print(f"{name.capitalize():<10} {report[name]['params']:>12,} "
+                  f"{report[name]['windows_per_second']:>12,.0f} "
+                  f"{'-' if accuracy is None else f'{accuracy:.4f}':>10}")
+        print(f"\nStudent speedup: {report['speedup']:.1f}x, "
+              f"agreement with teacher: {report['agreement']:.2%}")
+
+        self.metadata['distillation'] = {
+            'teacher_model': self.config.get('teacher_model'),
+            'temperature': self.config.get('distill_temperature', 4.0),
+            'alpha': self.config.get('distill_alpha', 0.1),
+            **report
+        }
+
+        return report
+
     def visualize_results(self, X_test, y_test, y_pred):
         """
         Create visualizations of results
@@ -260,6 +803,113 @@ class TrainingPipeline:
 
         return fig
 
+    def _window_sample(self, X, y=None, n_samples=256):
+        """
+        Random sample of up to n_samples windows from any data source
+        Returns: X_sample (n, time, 3, 1), y_sample (None if no labels are available)
+        """
+        rng = np.random.default_rng(self.config.get('random_seed', 42))
+
+        if isinstance(X, (StreamingDataset, SyntheticStream)):
+            X_batches, y_batches = [], []
+            for X_batch, y_batch in X:
+                X_batches.append(X_batch)
+                y_batches.append(y_batch)
+                if sum(len(batch) for batch in X_batches) >= n_samples:
+                    break
+            if isinstance(X, SyntheticStream):
+                X.stop()
+            return np.concatenate(X_batches)[:n_samples], np.concatenate(y_batches)[:n_samples]
+
+        if isinstance(X, ShardSubset):
+            X_shards, y_shards = [], []
+            for shard_id in rng.permutation(X.shard_ids):
+                windows, labels = X.read_shard(int(shard_id))
+                X_shards.append(np.asarray(windows, dtype=np.float32)[..., np.newaxis])
+                y_shards.append(np.eye(3, dtype=np.float32)[labels])
+                if sum(len(shard) for shard in X_shards) >= n_samples:
+                    break
+            return np.concatenate(X_shards)[:n_samples], np.concatenate(y_shards)[:n_samples]
+
+        if isinstance(X, WindowSubset):
+            X, y, indices = X.X, X.y, X.indices
+        else:
+            indices = np.arange(len(X))
+        indices = np.sort(rng.choice(indices, min(n_samples, len(indices)), replace=False))
+
+        return (np.asarray(X[indices], dtype=np.float32),
+                None if y is None else np.asarray(y[indices]))
+
+    def export_tflite(self):
+        """
+        Export the trained model to TFLite (optionally quantized) and compare
+        accuracy and CPU latency against the Keras model on test windows
+        """
+        quantization = self.config.get('tflite_export', None)
+        if not quantization:
+            return None
+
+        print("\n" + "=" * 60)
+        print(f"EXPORTING TFLITE MODEL ({quantization})")
+        print("=" * 60)
+
+        calibration_windows = None
+        if quantization == 'int8':
+            calibration_windows, _ = self._window_sample(
+                self.calibration_source,
+                n_samples=self.config.get('tflite_calibration_samples', 256)
+            )
+            print(f"Calibrating on {len(calibration_windows)} training windows")
+
+        tflite_path = os.path.join(self.output_dir, f'final_model_{quantization}.tflite')
+        size = export_tflite(self.model, tflite_path, quantization=quantization,
+                             calibration_windows=calibration_windows)
+        print(f"✓ TFLite model saved to {tflite_path} ({size / 2 ** 20:.2f} MB)")
+
+        report = {'path': tflite_path, 'quantization': quantization, 'size_bytes': size}
+        if self.test_data is None:
+            return report
+
+        X_eval, y_eval = self._window_sample(
+            *self.test_data, n_samples=self.config.get('tflite_eval_samples', 512))
+        batch_size = self.config.get('batch_size', 32)
+        tflite_picker = TFLitePicker(tflite_path)
+
+        timings = {}
+        predictions = {}
+        for name, predictor in (('keras', self.model), ('tflite', tflite_picker)):
+            predictor.predict(X_eval[:batch_size], batch_size=batch_size, verbose=0)  # Warm up
+            start = time.perf_counter()
+            predictions[name] = predictor.predict(X_eval, batch_size=batch_size, verbose=0)
+            timings[name] = time.perf_counter() - start
+
+        keras_labels = np.argmax(predictions['keras'], axis=-1)
+        tflite_labels = np.argmax(predictions['tflite'], axis=-1)
+        report.update({
+            'n_eval_windows': int(len(X_eval)),
+            'keras_ms_per_window': 1000 * timings['keras'] / len(X_eval),
+            'tflite_ms_per_window': 1000 * timings['tflite'] / len(X_eval),
+            'speedup': timings['keras'] / timings['tflite'],
+            'prediction_agreement': float(np.mean(keras_labels == tflite_labels)),
+            'max_probability_diff': float(np.abs(predictions['keras'] - predictions['tflite']).max())
+        })
+        if y_eval is not None and y_eval.shape == predictions['keras'].shape:
+            true_labels = np.argmax(y_eval, axis=-1)
+            report['keras_accuracy'] = float(np.mean(keras_labels == true_labels))
+            report['tflite_accuracy'] = float(np.mean(tflite_labels == true_labels))
+            report['accuracy_drift'] = report['tflite_accuracy'] - report['keras_accuracy']
+
+        print(f"\nTFLite vs Keras on {len(X_eval)} test windows (batch {batch_size}):")
+        print(f"  Latency: {report['keras_ms_per_window']:.2f} -> "
+              f"{report['tflite_ms_per_window']:.2f} ms/window ({report['speedup']:.1f}x)")
+        print(f"  Prediction agreement: {report['prediction_agreement']:.2%}, "
+              f"max |Δp|: {report['max_probability_diff']:.4f}")
+        if 'accuracy_drift' in report:
+            print(f"  Accuracy: {report['keras_accuracy']:.4f} -> {report['tflite_accuracy']:.4f} "
+                  f"(drift {report['accuracy_drift']:+.4f})")
+
+        return report
+
     def save_model(self):
         """
         Save the trained model
@@ -268,6 +918,10 @@ class TrainingPipeline:
         self.model.save(model_path)
         print(f"\n✓ Model saved to {model_path}")
 
+        tflite_report = self.export_tflite()
+        if tflite_report is not None:
+            self.metadata['tflite'] = tflite_report
+
         # Save metadata
         metadata_path = os.path.join(self.output_dir, 'metadata.json')
         full_metadata = {
@@ -293,16 +947,38 @@ class TrainingPipeline:
         print("=" * 60)
 
         # 1. Prepare data
-        X_train, X_val, X_test, y_train, y_val, y_test = self.prepare_data()
+        if self.config.get('data_source', 'csv') == 'shards':
+            X_train, X_val, X_test, y_train, y_val, y_test = self.prepare_shard_data()
+            input_shape = X_train.input_shape
+        elif self.config.get('streaming', False):
+            X_train, X_val, X_test = self.prepare_streaming_data()
+            y_train = y_val = y_test = None
+            input_shape = X_train.input_shape
+        elif self.config.get('virtual_windows', False):
+            X_train, X_val, X_test, y_train, y_val, y_test = self.prepare_virtual_data()
+            input_shape = X_train.shape[1:]
+        else:
+            X_train, X_val, X_test, y_train, y_val, y_test = self.prepare_data()
+            input_shape = X_train.shape[1:]
+
+        self.calibration_source = X_train
 
         # 2. Build model
-        self.build_model(input_shape=X_train.shape[1:])
+        self.build_model(input_shape=input_shape)
 
         # 3. Train model
         self.train(X_train, y_train, X_val, y_val)
 
         # 4. Evaluate model
         results, y_pred = self.evaluate(X_test, y_test)
+        if y_test is None:
+            y_test = self.streamed_y_test
+        self.test_data = (X_test, y_test)
+        if isinstance(X_test, StreamingDataset):
+            # Files were read through the feature cache while streaming
+            self.metadata['feature_cache'] = self.data_loader.report_feature_cache()
+        if self.teacher is not None:
+            self.compare_with_teacher(X_test, y_test)
 
         # 5. Visualize results
         self.visualize_results(X_test, y_test, y_pred)
@@ -333,15 +1009,56 @@ def main():
         'window_size': 30,
         'max_files': None,
         'n_synthetic': 200,
+        'data_source': 'csv',  # 'csv' = CSVs in data_dir, 'synthetic' = n_synthetic events generated in memory,
+                               # 'synthetic_stream' = fresh synthetic events every epoch,
+                               # 'shards' = shards in shard_dir (written from data_dir if missing)
+        'shard_dir': 'seismic_picking/cache/shards',
+        'windows_per_shard': 4096,
+        'steps_per_epoch': 100,  # batches per epoch with 'synthetic_stream'
+        'events_per_chunk': 256,  # events generated per background task with 'synthetic_stream'
+        'random_seed': 42,
+        'cache_dir': 'seismic_picking/cache/waveforms',  # binary waveform store (None = parse CSVs)
+        'feature_cache_dir': 'seismic_picking/cache/features',  # preprocessed windows (None = disabled)
+        'feature_cache_max_gb': 20.0,
+        'storage_dtype': 'float32',  # 'float16' halves feature cache and shard size
+        'n_workers': os.cpu_count() or 1,  # processes used by load_dataset (forkserver/spawn, never fork)
+        'split_mode': 'index',  # 'index' = views over one shared buffer, 'copy' = train_test_split copies
+        'streaming': False,  # stream batches from disk instead of loading X into RAM
+        'files_per_block': 32,  # files shuffled together in streaming mode
+        'virtual_windows': False,  # keep traces once and train from (trace, offset) windows
+        'virtual_overlap': 0.5,  # grid overlap in virtual window mode
+        'n_random_windows': 0,  # extra random-offset training windows in virtual window mode
 
         # Model configuration
-        'model_type': 'cnn',  # 'cnn' or 'unet'
+        'model_type': 'cnn',  # 'cnn', 'unet', 'cnn1d' or 'unet1d' (Conv1D, components as channels)
         'learning_rate': 0.001,
 
         # Training configuration
         'batch_size': 32,
         'epochs': 50,
         'use_augmentation': True,
+        'augmentation_backend': 'numpy',  # 'numpy' = SeismicAugmentor in Python, 'tf' = graph-mode tf.data stage
+        'generator_workers': 0,  # processes preparing augmented batches ahead (0 = training thread)
+        'prefetch_depth': 4,  # batches prepared ahead by generator workers
+        'mixup': None,  # None, 'mixup' or 'cutmix' (time-axis segments) on training batches
+        'mixup_alpha': 0.2,
+        'input_pipeline': 'default',  # 'tf_data' = interleaved reads, cache, shuffle buffer, parallel map, prefetch
+        'shuffle_buffer': 8192,  # windows in the tf.data shuffle buffer (file / shard sources)
+        'interleave_cycle': 4,  # files or shards read concurrently by tf.data
+        'tf_data_cache': None,  # None = no cache, '' = in memory, path = cache file
+        'report_input_stall': True,  # print the input-pipeline stall fraction in tf.data mode
+        'distillation': False,  # Train a CompactCNNPicker student on teacher_model's soft outputs
+        'teacher_model': None,  # Trained teacher checkpoint (.h5) for distillation
+        'student_width': 16,  # Filters of the student's first conv block (doubled per block)
+        'student_depth': 3,  # Student conv blocks
+        'student_dense_units': 64,
+        'distill_temperature': 4.0,
+        'distill_alpha': 0.1,  # Weight of the hard-label loss (rest: soft teacher targets)
+        'distill_eval_samples': 512,  # Test windows for the teacher vs student report
+        'jit_compile': 'auto',  # 'auto' = Keras default (XLA on GPU); True forces XLA incl. evaluation predict (CPU training can be slower)
+        'tflite_export': None,  # None, 'float', 'dynamic' (int8 weights) or 'int8' (calibrated)
+        'tflite_calibration_samples': 256,  # training windows used to calibrate int8 activations
+        'tflite_eval_samples': 512,  # test windows used to report TFLite accuracy drift and speedup
         'test_size': 0.2,
         'val_size': 0.1,
     }
@@ -1,4 +1,5 @@
 from .augmentation import SeismicAugmentor, TensorflowDataAugmentation, MixupAugmentation, CustomDataGenerator
+from .prefetch import BatchPrefetcher
 from .visualization import SeismicPlotter, STALTADetector
 
 __all__ = [
@@ -6,6 +7,7 @@ __all__ = [
     'TensorflowDataAugmentation',
     'MixupAugmentation',
     'CustomDataGenerator',
+    'BatchPrefetcher',
     'SeismicPlotter',
     'STALTADetector'
 ]
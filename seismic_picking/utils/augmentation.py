@@ -5,6 +5,7 @@ Enhances model robustness and generalization
 
 import numpy as np
 from scipy import signal
+from scipy import fft as sp_fft
 import tensorflow as tf
 
 
@@ -13,19 +14,21 @@ class SeismicAugmentor:
     Augmentation techniques specifically designed for seismic data
     """
 
-    def __init__(self, augmentation_prob=0.5):
+    def __init__(self, augmentation_prob=0.5, seed=None):
         """
         Args:
             augmentation_prob: Probability of applying each augmentation
+            seed: Seed of the generator used by augment_batch
         """
         self.prob = augmentation_prob
+        self.rng = np.random.default_rng(seed)
 
     def add_noise(self, waveform, noise_level=0.05):
         """
         Add Gaussian noise to waveform
         """
         if np.random.random() < self.prob:
-            noise = np.random.normal(0, noise_level, waveform.shape)
+            noise = np.random.normal(0, noise_level, waveform.shape).astype(waveform.dtype)
             return waveform + noise
         return waveform
 
@@ -35,7 +38,7 @@ class SeismicAugmentor:
         """
         if np.random.random() < self.prob:
             scale = np.random.uniform(*scale_range)
-            return waveform * scale
+            return (waveform * scale).astype(waveform.dtype, copy=False)
         return waveform
 
     def time_shift(self, waveform, max_shift=50):
@@ -87,24 +90,105 @@ class SeismicAugmentor:
         Mask specific frequency band
         """
         if np.random.random() < self.prob:
-            waveform_aug = waveform.copy()
-            nyquist = sampling_rate / 2
-
             # Random frequency to mask
             low_freq = np.random.uniform(*mask_freq_range)
             high_freq = low_freq + np.random.uniform(1, 5)
 
-            # Create notch filter
-            low = low_freq / nyquist
-            high = min(high_freq / nyquist, 0.99)
+            return self._bandstop(waveform, sampling_rate, low_freq, high_freq)
+        return waveform
 
-            b, a = signal.butter(2, [low, high], btype='bandstop')
+    @staticmethod
+    def _bandstop(waveform, sampling_rate, low_freq, high_freq):
+        """Zero-phase 2nd order Butterworth bandstop of every channel"""
+        waveform_aug = waveform.copy()
+        nyquist = sampling_rate / 2
 
-            for i in range(waveform_aug.shape[1]):
-                waveform_aug[:, i] = signal.filtfilt(b, a, waveform_aug[:, i])
+        # Create notch filter
+        low = low_freq / nyquist
+        high = min(high_freq / nyquist, 0.99)
 
-            return waveform_aug
-        return waveform
+        b, a = signal.butter(2, [low, high], btype='bandstop')
+
+        for i in range(waveform_aug.shape[1]):
+            waveform_aug[:, i] = signal.filtfilt(b, a, waveform_aug[:, i])
+
+        return waveform_aug
+
+    @staticmethod
+    def bandstop_gain(freqs, sampling_rate, low_freq, high_freq, order=2):
+        """
+        Gain of the zero-phase (filtfilt) Butterworth bandstop used by _bandstop
+
+        Uses the analog prototype behind signal.butter (bilinear transform
+        with prewarped band edges), so no filter has to be designed.
+
+        Args:
+            freqs: (n_freqs,) frequencies in Hz
+            sampling_rate: Sampling rate in Hz
+            low_freq, high_freq: Stop band edges in Hz, scalars or (n,) arrays
+            order: Butterworth order
+
+        Returns:
+            (n, n_freqs) gains (or (n_freqs,) for scalar edges)
+        """
+        nyquist = sampling_rate / 2
+        low = np.asarray(low_freq, dtype=np.float64)[..., np.newaxis] / nyquist
+        high = np.minimum(np.asarray(high_freq, dtype=np.float64)[..., np.newaxis] / nyquist, 0.99)
+
+        # Prewarped frequencies, as signal.butter does for digital filters (fs = 2)
+        omega = 4 * np.tan(np.pi * np.minimum(np.asarray(freqs) / nyquist, 1.0) / 2)
+        omega_low = 4 * np.tan(np.pi * low / 2)
+        omega_high = 4 * np.tan(np.pi * high / 2)
+
+        # Lowpass -> bandstop: prototype frequency = BW * w / |w0^2 - w^2|
+        with np.errstate(divide='ignore'):
+            prototype = (omega_high - omega_low) * omega / np.abs(omega_low * omega_high - omega ** 2)
+        # |H|^2 of the Butterworth prototype, which is exactly the response of
+        # filtfilt (forward pass H, backward pass conj(H))
+        return 1 / (1 + prototype ** (2 * order))
+
+    def _bandstop_fft_batch(self, X, sampling_rate, low_freq, high_freq, pad=256):
+        """
+        Band-stop every sample of (n, T, C) with its own band in one rFFT
+
+        The batch is odd-extended by pad samples on both sides (like filtfilt)
+        to limit wrap-around, transformed along time, multiplied by the
+        per-sample gain and transformed back.
+        """
+        n_time = X.shape[1]
+        pad = min(pad, n_time - 1)
+
+        extended = np.concatenate([
+            2 * X[:, :1] - X[:, pad:0:-1],
+            X,
+            2 * X[:, -1:] - X[:, -2:-pad - 2:-1]
+        ], axis=1)
+
+        # scipy.fft keeps float32 input in single precision
+        n_fft = sp_fft.next_fast_len(extended.shape[1], real=True)
+        spectrum = sp_fft.rfft(extended, n=n_fft, axis=1)
+        freqs = sp_fft.rfftfreq(n_fft, d=1 / sampling_rate)
+        gain = self.bandstop_gain(freqs, sampling_rate, low_freq, high_freq)
+        spectrum *= gain.astype(spectrum.real.dtype)[..., np.newaxis]
+
+        filtered = sp_fft.irfft(spectrum, n=n_fft, axis=1)[:, pad:pad + n_time]
+        return filtered.astype(X.dtype, copy=False)
+
+    def frequency_masking_batch(self, X, sampling_rate=100, mask_freq_range=(5, 10), rng=None):
+        """
+        Batch version of frequency_masking for (B, T, C) arrays
+
+        Each sample is masked with probability augmentation_prob, with its own
+        random band. Filtering is done in the frequency domain for the whole
+        batch (see _bandstop_fft_batch) instead of one filtfilt per channel.
+        """
+        rng = self.rng if rng is None else rng
+        X = np.array(X, copy=True)
+
+        rows = np.flatnonzero(rng.random(len(X)) < self.prob)
+        if len(rows):
+            X[rows] = self._frequency_masking_batch(X[rows], rng, sampling_rate, mask_freq_range)
+        return X
 
     def polarity_reversal(self, waveform):
         """
@@ -145,52 +229,230 @@ class SeismicAugmentor:
 
         return waveform_aug
 
+    # Batch augmentations: X is (n, T, C), parameters are drawn per sample
+
+    def _noise_batch(self, X, rng, sampling_rate):
+        noise_level = rng.uniform(0.01, 0.1, (len(X), 1, 1)).astype(X.dtype)
+        return X + rng.standard_normal(X.shape, dtype=np.float32).astype(X.dtype, copy=False) * noise_level
+
+    def _scaling_batch(self, X, rng, sampling_rate):
+        return X * rng.uniform(0.7, 1.3, (len(X), 1, 1)).astype(X.dtype)
+
+    def _time_shift_batch(self, X, rng, sampling_rate):
+        max_shift = int(sampling_rate * 0.5)
+        shift = rng.integers(-max_shift, max_shift, len(X))
+        # Circular shift per sample: out[t] = x[(t - shift) % T]
+        source = (np.arange(X.shape[1]) - shift[:, np.newaxis]) % X.shape[1]
+        return X[np.arange(len(X))[:, np.newaxis], source]
+
+    def _channel_dropout_batch(self, X, rng, sampling_rate):
+        X[np.arange(len(X)), :, rng.integers(0, X.shape[2], len(X))] = 0
+        return X
+
+    def _spikes_batch(self, X, rng, sampling_rate, max_spikes=4, spike_amplitude=0.5):
+        n = len(X)
+        n_spikes = rng.integers(1, max_spikes + 1, n)
+        rows = np.repeat(np.arange(n), max_spikes)
+        valid = (np.tile(np.arange(max_spikes), n) < np.repeat(n_spikes, max_spikes))
+        rows = rows[valid]
+        positions = rng.integers(0, X.shape[1], len(rows))
+        channels = rng.integers(0, X.shape[2], len(rows))
+        amplitudes = rng.uniform(-spike_amplitude, spike_amplitude, len(rows)).astype(X.dtype)
+        np.add.at(X, (rows, positions, channels), amplitudes)
+        return X
+
+    def _gap_batch(self, X, rng, sampling_rate):
+        gap_length = rng.integers(10, 100, len(X))
+        gap_start = rng.integers(0, X.shape[1] - gap_length)
+        t = np.arange(X.shape[1])
+        in_gap = (t >= gap_start[:, np.newaxis]) & (t < (gap_start + gap_length)[:, np.newaxis])
+        X[in_gap] = 0
+        return X
+
+    def _frequency_masking_batch(self, X, rng, sampling_rate, mask_freq_range=(5, 10)):
+        low_freq = rng.uniform(*mask_freq_range, len(X))
+        high_freq = low_freq + rng.uniform(1, 5, len(X))
+        return self._bandstop_fft_batch(X, sampling_rate, low_freq, high_freq)
+
+    def _polarity_batch(self, X, rng, sampling_rate):
+        signs = np.where(rng.random((len(X), 1, X.shape[2])) < 0.5, -1, 1).astype(X.dtype)
+        return X * signs
+
+    def augment_batch(self, X, sampling_rate=100, rng=None):
+        """
+        Batch version of apply_all_augmentations for (B, T, C) arrays
+
+        Each sample gets its own random subset (1-3) and order of the eight
+        augmentations, each applied with probability augmentation_prob and
+        with per-sample parameters, as in apply_all_augmentations. Samples
+        are grouped by the augmentation they receive at each step, so the work
+        is a few array operations per step instead of Python code per sample.
+
+        Args:
+            X: (B, T, C) batch (not modified)
+            sampling_rate: Sampling rate in Hz
+            rng: np.random.Generator (default: the augmentor's own generator)
+
+        Returns:
+            Augmented (B, T, C) batch with the dtype of X
+        """
+        rng = self.rng if rng is None else rng
+        X = np.array(X, copy=True)
+        batch_size = len(X)
+
+        augmentations = [
+            self._noise_batch,
+            self._scaling_batch,
+            self._time_shift_batch,
+            self._channel_dropout_batch,
+            self._spikes_batch,
+            self._gap_batch,
+            self._frequency_masking_batch,
+            self._polarity_batch
+        ]
+
+        # Random order of augmentations per sample; the first n_augmentations are used
+        order = np.argsort(rng.random((batch_size, len(augmentations))), axis=1)
+        n_augmentations = rng.integers(1, 4, batch_size)
+
+        for step in range(int(n_augmentations.max(initial=0))):
+            active = (step < n_augmentations) & (rng.random(batch_size) < self.prob)
+            for aug_id, aug_func in enumerate(augmentations):
+                rows = np.flatnonzero(active & (order[:, step] == aug_id))
+                if len(rows):
+                    X[rows] = aug_func(X[rows], rng, sampling_rate)
+
+        return X
+
 
 class TensorflowDataAugmentation:
     """
-    Data augmentation using TensorFlow for GPU acceleration
+    Data augmentation using TensorFlow ops for tf.data pipelines
+
+    Works on batches of shape (B, T, C) or (B, T, C, 1). Every augmentation
+    is a TF op with per-sample random parameters (no Python control flow on
+    tensors), so the stage traces into a graph and runs inside
+    Dataset.map(num_parallel_calls=AUTOTUNE), overlapping with training.
+
+    As in SeismicAugmentor.augment_batch, each sample receives 1-3 of the
+    augmentations, each applied with augmentation_prob; here they are
+    applied in a fixed order.
     """
 
+    N_AUGMENTATIONS = 6  # noise, scaling, roll, channel dropout, gap, polarity
+
     @staticmethod
-    def augment_batch(waveforms, labels, augmentation_prob=0.5):
+    def augment_batch(waveforms, labels, augmentation_prob=0.5, sampling_rate=100):
         """
         Apply augmentation to a batch during training
-        """
-
-        def augment(waveform, label):
-            # Random noise
-            if tf.random.uniform([]) < augmentation_prob:
-                noise = tf.random.normal(tf.shape(waveform), stddev=0.05)
-                waveform = waveform + noise
 
-            # Random amplitude scaling
-            if tf.random.uniform([]) < augmentation_prob:
-                scale = tf.random.uniform([], 0.8, 1.2)
-                waveform = waveform * scale
+        Args:
+            waveforms: (B, T, C) or (B, T, C, 1) tensor
+            labels: Labels, passed through unchanged
+            augmentation_prob: Probability of applying each selected augmentation
+            sampling_rate: Sampling rate in Hz (time shift is up to 0.5 s)
 
-            # Random time shift
-            if tf.random.uniform([]) < augmentation_prob:
-                shift = tf.random.uniform([], -50, 50, dtype=tf.int32)
-                waveform = tf.roll(waveform, shift, axis=0)
+        Returns:
+            (augmented waveforms, labels)
+        """
+        x = tf.convert_to_tensor(waveforms)
+        rank = x.shape.rank
+        shape = tf.shape(x)
+        batch_size, n_time, n_channels = shape[0], shape[1], shape[2]
+        trailing = [1] * (rank - 3)
+
+        def per_sample(values):
+            """(B,) -> broadcastable against x"""
+            return tf.reshape(values, [-1, 1, 1] + trailing)
+
+        def per_channel(values):
+            """(B, C) -> broadcastable against x"""
+            return tf.reshape(values, [-1, 1, n_channels] + trailing)
+
+        def per_time(values):
+            """(B, T) -> broadcastable against x"""
+            return tf.reshape(values, [-1, n_time, 1] + trailing)
+
+        # Pick 1-3 augmentations per sample via random ranks, then gate each by probability
+        n_aug = TensorflowDataAugmentation.N_AUGMENTATIONS
+        ranks = tf.argsort(tf.argsort(tf.random.uniform([batch_size, n_aug]), axis=1), axis=1)
+        n_selected = tf.random.uniform([batch_size, 1], 1, 4, dtype=tf.int32)
+        apply = (ranks < n_selected) & (tf.random.uniform([batch_size, n_aug]) < augmentation_prob)
+
+        def selected(k):
+            return per_sample(apply[:, k])
+
+        # Gaussian noise
+        noise_level = per_sample(tf.random.uniform([batch_size], 0.01, 0.1, dtype=x.dtype))
+        x = tf.where(selected(0), x + tf.random.normal(shape, dtype=x.dtype) * noise_level, x)
+
+        # Amplitude scaling
+        scale = per_sample(tf.random.uniform([batch_size], 0.7, 1.3, dtype=x.dtype))
+        x = tf.where(selected(1), x * scale, x)
+
+        # Circular time shift with a shift per sample: out[t] = x[(t - shift) % T]
+        max_shift = int(sampling_rate * 0.5)
+        shift = tf.random.uniform([batch_size, 1], -max_shift, max_shift, dtype=tf.int32)
+        source = tf.math.floormod(tf.range(n_time)[tf.newaxis, :] - shift, n_time)
+        x = tf.where(selected(2), tf.gather(x, source, batch_dims=1), x)
+
+        # Channel dropout
+        channel = tf.random.uniform([batch_size], 0, n_channels, dtype=tf.int32)
+        keep = per_channel(1 - tf.one_hot(channel, n_channels, dtype=x.dtype))
+        x = tf.where(selected(3), x * keep, x)
+
+        # Data gap
+        gap_length = tf.random.uniform([batch_size, 1], 10, 100, dtype=tf.int32)
+        gap_start = tf.cast(tf.random.uniform([batch_size, 1]) *
+                            tf.cast(n_time - gap_length, tf.float32), tf.int32)
+        t = tf.range(n_time)[tf.newaxis, :]
+        in_gap = per_time((t >= gap_start) & (t < gap_start + gap_length))
+        x = tf.where(selected(4) & in_gap, tf.zeros_like(x), x)
+
+        # Polarity reversal of random channels
+        signs = tf.where(tf.random.uniform([batch_size, n_channels]) < 0.5, -1.0, 1.0)
+        x = tf.where(selected(5), x * per_channel(tf.cast(signs, x.dtype)), x)
+
+        return x, labels
 
-            return waveform, label
+    @staticmethod
+    def augment_dataset(dataset, augmentation_prob=0.5, sampling_rate=100):
+        """
+        Add the augmentation stage to a batched (waveforms, labels) tf.data.Dataset
 
-        return tf.map_fn(lambda x: augment(x[0], x[1]),
-                        (waveforms, labels),
-                        dtype=(tf.float32, tf.float32))
+        Batches are augmented in parallel map calls and prefetched, so the
+        next batches are prepared while the model trains on the current one.
+        """
+        return dataset.map(
+            lambda waveforms, labels: TensorflowDataAugmentation.augment_batch(
+                waveforms, labels, augmentation_prob, sampling_rate),
+            num_parallel_calls=tf.data.AUTOTUNE,
+            deterministic=False
+        ).prefetch(tf.data.AUTOTUNE)
 
 
 class MixupAugmentation:
     """
     Mixup augmentation for better generalization
+
+    Batch methods pair every sample with a random partner from the same batch
+    and draw one mixing ratio per pair, using array operations only.
+    mode='cutmix' instead pastes a random time segment of the partner
+    (length (1 - lambda) * T) and mixes labels by the pasted fraction.
     """
 
-    def __init__(self, alpha=0.2):
+    def __init__(self, alpha=0.2, mode='mixup', seed=None):
         """
         Args:
             alpha: Beta distribution parameter for mixup
+            mode: 'mixup' or 'cutmix' (used by mix_batch / mix_dataset)
+            seed: Seed of the generator used by the batch methods
         """
+        if mode not in ('mixup', 'cutmix'):
+            raise ValueError(f"Unknown mix mode: {mode}")
         self.alpha = alpha
+        self.mode = mode
+        self.rng = np.random.default_rng(seed)
 
     def mixup(self, x1, x2, y1, y2):
         """
@@ -198,38 +460,115 @@ class MixupAugmentation:
         """
         lambda_param = np.random.beta(self.alpha, self.alpha)
 
-        x_mixed = lambda_param * x1 + (1 - lambda_param) * x2
-        y_mixed = lambda_param * y1 + (1 - lambda_param) * y2
+        x_mixed = (lambda_param * x1 + (1 - lambda_param) * x2).astype(x1.dtype, copy=False)
+        y_mixed = (lambda_param * y1 + (1 - lambda_param) * y2).astype(y1.dtype, copy=False)
 
         return x_mixed, y_mixed
 
-    def mixup_batch(self, X_batch, y_batch):
+    def mixup_batch(self, X_batch, y_batch, rng=None):
         """
-        Apply mixup to entire batch
+        Apply mixup to entire batch (one mixing ratio per sample)
         """
+        rng = self.rng if rng is None else rng
+        X_batch = np.asarray(X_batch)
+        y_batch = np.asarray(y_batch)
         batch_size = len(X_batch)
-        indices = np.random.permutation(batch_size)
+        indices = rng.permutation(batch_size)
 
-        X_mixed = []
-        y_mixed = []
+        lambda_param = rng.beta(self.alpha, self.alpha, batch_size)
+        lam_x = lambda_param.reshape(-1, *([1] * (X_batch.ndim - 1))).astype(X_batch.dtype)
+        lam_y = lambda_param.reshape(-1, *([1] * (y_batch.ndim - 1))).astype(y_batch.dtype)
 
-        for i in range(batch_size):
-            x_mix, y_mix = self.mixup(
-                X_batch[i], X_batch[indices[i]],
-                y_batch[i], y_batch[indices[i]]
-            )
-            X_mixed.append(x_mix)
-            y_mixed.append(y_mix)
+        X_mixed = lam_x * X_batch + (1 - lam_x) * X_batch[indices]
+        y_mixed = lam_y * y_batch + (1 - lam_y) * y_batch[indices]
+
+        return X_mixed, y_mixed
+
+    def cutmix_batch(self, X_batch, y_batch, rng=None):
+        """
+        Apply CutMix along the time axis (axis 1) to entire batch
+        """
+        rng = self.rng if rng is None else rng
+        X_batch = np.asarray(X_batch)
+        y_batch = np.asarray(y_batch)
+        batch_size, n_time = X_batch.shape[:2]
+        indices = rng.permutation(batch_size)
 
-        return np.array(X_mixed), np.array(y_mixed)
+        cut_length = np.round((1 - rng.beta(self.alpha, self.alpha, batch_size)) * n_time).astype(np.int64)
+        cut_start = rng.integers(0, n_time - cut_length + 1)
+        t = np.arange(n_time)
+        in_cut = (t >= cut_start[:, np.newaxis]) & (t < (cut_start + cut_length)[:, np.newaxis])
+
+        X_mixed = np.where(in_cut.reshape(batch_size, n_time, *([1] * (X_batch.ndim - 2))),
+                           X_batch[indices], X_batch)
+
+        lam_y = (1 - cut_length / n_time).reshape(-1, *([1] * (y_batch.ndim - 1))).astype(y_batch.dtype)
+        y_mixed = lam_y * y_batch + (1 - lam_y) * y_batch[indices]
+
+        return X_mixed, y_mixed
+
+    def mix_batch(self, X_batch, y_batch, rng=None):
+        """Apply the configured mode (mixup or cutmix) to a NumPy batch"""
+        if self.mode == 'cutmix':
+            return self.cutmix_batch(X_batch, y_batch, rng)
+        return self.mixup_batch(X_batch, y_batch, rng)
+
+    def mix_batch_tf(self, X_batch, y_batch):
+        """
+        TF-op version of mix_batch for tf.data pipelines (one-hot float labels)
+        """
+        X_batch = tf.convert_to_tensor(X_batch)
+        y_batch = tf.convert_to_tensor(y_batch)
+        shape = tf.shape(X_batch)
+        batch_size, n_time = shape[0], shape[1]
+        indices = tf.random.shuffle(tf.range(batch_size))
+
+        # Beta(alpha, alpha) from two gamma samples
+        gamma_1 = tf.random.gamma([batch_size], self.alpha)
+        gamma_2 = tf.random.gamma([batch_size], self.alpha)
+        lambda_param = gamma_1 / (gamma_1 + gamma_2)
+
+        x_trailing = [1] * (X_batch.shape.rank - 1)
+        y_trailing = [1] * (y_batch.shape.rank - 1)
+        X_other = tf.gather(X_batch, indices)
+        y_other = tf.gather(y_batch, indices)
+
+        if self.mode == 'cutmix':
+            cut_length = tf.cast(tf.round((1 - lambda_param) * tf.cast(n_time, tf.float32)), tf.int32)
+            cut_start = tf.cast(tf.random.uniform([batch_size]) *
+                                tf.cast(n_time - cut_length + 1, tf.float32), tf.int32)
+            t = tf.range(n_time)[tf.newaxis, :]
+            in_cut = (t >= cut_start[:, tf.newaxis]) & (t < (cut_start + cut_length)[:, tf.newaxis])
+            X_mixed = tf.where(tf.reshape(in_cut, [-1, n_time] + x_trailing[1:]), X_other, X_batch)
+            lambda_param = 1 - tf.cast(cut_length, tf.float32) / tf.cast(n_time, tf.float32)
+        else:
+            lam_x = tf.cast(tf.reshape(lambda_param, [-1] + x_trailing), X_batch.dtype)
+            X_mixed = lam_x * X_batch + (1 - lam_x) * X_other
+
+        lam_y = tf.cast(tf.reshape(lambda_param, [-1] + y_trailing), y_batch.dtype)
+        y_mixed = lam_y * y_batch + (1 - lam_y) * y_other
+
+        return X_mixed, y_mixed
+
+    def mix_dataset(self, dataset):
+        """
+        Add a mixing stage to a batched (waveforms, labels) tf.data.Dataset
+        """
+        return dataset.map(self.mix_batch_tf, num_parallel_calls=tf.data.AUTOTUNE,
+                           deterministic=False).prefetch(tf.data.AUTOTUNE)
 
 
 class CustomDataGenerator(tf.keras.utils.Sequence):
     """
     Custom data generator with on-the-fly augmentation
+
+    With n_workers > 0, upcoming batches are assembled and augmented by a
+    BatchPrefetcher process pool into shared memory, so training does not
+    wait for NumPy augmentation. Call close() when done to stop the workers.
     """
 
-    def __init__(self, X, y, batch_size=32, augmentor=None, shuffle=True):
+    def __init__(self, X, y, batch_size=32, augmentor=None, shuffle=True, indices=None,
+                 n_workers=0, prefetch_depth=4, seed=None, mixer=None):
         """
         Args:
             X: Input data
@@ -237,43 +576,82 @@ class CustomDataGenerator(tf.keras.utils.Sequence):
             batch_size: Batch size
             augmentor: SeismicAugmentor instance
             shuffle: Whether to shuffle data
+            indices: Subset of X / y to draw batches from (None = all);
+                     lets several generators share one buffer without copies
+            n_workers: Worker processes preparing batches ahead (0 = in this process)
+            prefetch_depth: Maximum number of batches prepared ahead
+            seed: Seed for shuffling and (with workers) per-batch augmentation
+            mixer: Optional MixupAugmentation applied to each batch after augmentation
+                   (labels must be one-hot floats)
         """
         self.X = X
         self.y = y
         self.batch_size = batch_size
         self.augmentor = augmentor
+        self.mixer = mixer
         self.shuffle = shuffle
-        self.indices = np.arange(len(X))
+        self.n_workers = n_workers
+        self.prefetch_depth = prefetch_depth
+        self.seed = seed
+        self.rng = np.random.default_rng(seed) if seed is not None else np.random
+        self.prefetcher = None
+        if indices is None:
+            self.indices = np.arange(len(X))
+        else:
+            self.indices = np.array(indices, dtype=np.int64)
 
         if self.shuffle:
-            np.random.shuffle(self.indices)
+            self.rng.shuffle(self.indices)
 
     def __len__(self):
         """Number of batches per epoch"""
-        return int(np.ceil(len(self.X) / self.batch_size))
+        return int(np.ceil(len(self.indices) / self.batch_size))
+
+    def _batch_indices(self, idx):
+        return self.indices[idx * self.batch_size:(idx + 1) * self.batch_size]
 
     def __getitem__(self, idx):
         """Get batch at index idx"""
-        batch_indices = self.indices[idx * self.batch_size:(idx + 1) * self.batch_size]
+        if self.n_workers > 0:
+            return self._prefetched_batch(idx)
+
+        batch_indices = self._batch_indices(idx)
 
         X_batch = self.X[batch_indices]
         y_batch = self.y[batch_indices]
 
-        # Apply augmentation
+        # Apply augmentation (on (B, T, C), without the extra dimension)
         if self.augmentor is not None:
-            X_augmented = []
-            for x in X_batch:
-                # Remove extra dimension for augmentation
-                x_squeeze = np.squeeze(x, axis=-1)
-                x_aug = self.augmentor.apply_all_augmentations(x_squeeze)
-                # Add dimension back
-                x_aug = np.expand_dims(x_aug, axis=-1)
-                X_augmented.append(x_aug)
-            X_batch = np.array(X_augmented)
+            X_batch = self.augmentor.augment_batch(X_batch[..., 0])[..., np.newaxis]
+
+        if self.mixer is not None:
+            X_batch, y_batch = self.mixer.mix_batch(X_batch, y_batch)
 
         return X_batch, y_batch
 
+    def _prefetched_batch(self, idx):
+        """Get batch idx from the worker pool and queue the following batches"""
+        if self.prefetcher is None:
+            from .prefetch import BatchPrefetcher
+            self.prefetcher = BatchPrefetcher(
+                self.X, self.y, self.batch_size, augmentor=self.augmentor, mixer=self.mixer,
+                n_workers=self.n_workers, depth=self.prefetch_depth, seed=self.seed
+            )
+
+        for batch_no in range(idx, min(idx + self.prefetch_depth, len(self))):
+            self.prefetcher.submit(batch_no, self._batch_indices(batch_no))
+
+        return self.prefetcher.get(idx, self._batch_indices(idx))
+
     def on_epoch_end(self):
         """Shuffle indices after each epoch"""
         if self.shuffle:
-            np.random.shuffle(self.indices)
+            self.rng.shuffle(self.indices)
+        if self.prefetcher is not None:
+            self.prefetcher.new_epoch()
+
+    def close(self):
+        """Stop prefetch workers (if any)"""
+        if self.prefetcher is not None:
+            self.prefetcher.close()
+            self.prefetcher = None
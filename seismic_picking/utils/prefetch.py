@@ -0,0 +1,216 @@
+"""
+Multi-Process Batch Prefetching
+Worker processes assemble and augment upcoming batches into a shared-memory ring
+"""
+
+import multiprocessing
+from multiprocessing import shared_memory
+import queue
+import traceback
+import numpy as np
+
+
+class BatchPrefetcher:
+    """
+    Pool of worker processes filling a ring of shared-memory batch buffers
+
+    The consumer requests batches by number; up to `depth` upcoming batches
+    are assembled (gather + augmentation) by the workers while the current
+    one is used for training. Finished batches are written straight into
+    shared memory, so only small (batch, slot) messages cross processes.
+
+    Every batch is augmented with its own generator seeded from
+    (seed, epoch, batch number), so results are reproducible regardless of
+    the number of workers or which worker picked up a batch.
+
+    Workers are forked and inherit X / y (arrays, memmaps or any indexable
+    window source) without copying. An exception while preparing a batch is
+    sent back with its traceback and re-raised by get(); a worker that dies
+    without reporting (e.g. killed by the OOM killer) is detected as well.
+    """
+
+    POLL_INTERVAL = 1.0  # Seconds between worker liveness checks while waiting
+
+    def __init__(self, X, y, batch_size, augmentor=None, n_workers=2, depth=4, seed=None,
+                 mixer=None):
+        """
+        Args:
+            X: Window source, indexable with an index array -> (B, T, C, 1)
+            y: Labels, indexable with an index array
+            batch_size: Maximum batch size (size of each ring slot)
+            augmentor: Optional SeismicAugmentor (uses augment_batch)
+            n_workers: Number of worker processes
+            depth: Number of ring slots = maximum batches in flight
+            seed: Base seed for per-batch generators
+            mixer: Optional MixupAugmentation (uses mix_batch) applied after augmentation
+        """
+        self.X = X
+        self.y = y
+        self.batch_size = batch_size
+        self.n_workers = n_workers
+        self.depth = depth
+        self.seed = int(np.random.randint(0, 2 ** 31)) if seed is None else seed
+
+        self.x_shape = (depth, batch_size, *X.shape[1:])
+        self.y_shape = (depth, batch_size, *np.shape(y)[1:])
+        self.y_dtype = np.asarray(y[:1]).dtype
+
+        self._x_shm = shared_memory.SharedMemory(
+            create=True, size=int(np.prod(self.x_shape)) * np.dtype(np.float32).itemsize)
+        self._y_shm = shared_memory.SharedMemory(
+            create=True, size=max(1, int(np.prod(self.y_shape)) * self.y_dtype.itemsize))
+        self.x_ring = np.ndarray(self.x_shape, dtype=np.float32, buffer=self._x_shm.buf)
+        self.y_ring = np.ndarray(self.y_shape, dtype=self.y_dtype, buffer=self._y_shm.buf)
+
+        # fork shares X / y with the workers; fall back to the default elsewhere
+        methods = multiprocessing.get_all_start_methods()
+        ctx = multiprocessing.get_context('fork' if 'fork' in methods else None)
+        self._tasks = ctx.Queue()
+        self._results = ctx.Queue()
+        self._workers = [
+            ctx.Process(target=_prefetch_worker,
+                        args=(X, y, augmentor, mixer, self._tasks, self._results,
+                              self._x_shm.name, self._y_shm.name,
+                              self.x_shape, self.y_shape, self.y_dtype.str, self.seed),
+                        daemon=True)
+            for _ in range(n_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+        self._free_slots = list(range(depth))
+        self._pending = {}  # (epoch, batch_no) -> slot
+        self._ready = {}    # (epoch, batch_no) -> (slot, n)
+        self.epoch = 0
+
+    def submit(self, batch_no, batch_indices):
+        """Queue a batch of the current epoch (False if no slot is free or already queued)"""
+        key = (self.epoch, batch_no)
+        if key in self._pending or key in self._ready or not self._free_slots:
+            return False
+
+        slot = self._free_slots.pop()
+        self._pending[key] = slot
+        self._tasks.put((self.epoch, batch_no, slot, np.asarray(batch_indices, dtype=np.int64)))
+        return True
+
+    def _receive(self):
+        """Move one finished batch from the workers to the ready set"""
+        while True:
+            try:
+                epoch, batch_no, slot, n, error = self._results.get(timeout=self.POLL_INTERVAL)
+                break
+            except queue.Empty:
+                dead = [worker for worker in self._workers if not worker.is_alive()]
+                if dead:
+                    raise RuntimeError(f"Prefetch worker {dead[0].pid} exited unexpectedly "
+                                       f"(exit code {dead[0].exitcode})")
+
+        key = (epoch, batch_no)
+        self._pending.pop(key, None)
+        if error is not None:
+            self._free_slots.append(slot)
+            raise RuntimeError(f"Prefetch worker failed on batch {batch_no}:\n{error}")
+        if epoch == self.epoch:
+            self._ready[key] = (slot, n)
+        else:
+            self._free_slots.append(slot)  # Stale batch of a previous epoch
+
+    def get(self, batch_no, batch_indices):
+        """
+        Wait for a batch (queued now if it was not prefetched)
+        Returns: (X_batch, y_batch) copies, the ring slot is released
+        """
+        key = (self.epoch, batch_no)
+        while key not in self._pending and key not in self._ready:
+            if self._free_slots:
+                self.submit(batch_no, batch_indices)
+            elif self._pending:
+                self._receive()  # Wait for a slot
+            else:
+                # Out-of-order access: drop a prefetched batch to make room
+                _, (slot, _) = self._ready.popitem()
+                self._free_slots.append(slot)
+
+        while key not in self._ready:
+            self._receive()
+
+        slot, n = self._ready.pop(key)
+        X_batch = self.x_ring[slot, :n].copy()
+        y_batch = self.y_ring[slot, :n].copy()
+        self._free_slots.append(slot)
+
+        return X_batch, y_batch
+
+    def new_epoch(self):
+        """Discard batches of the current epoch that were prefetched but not used"""
+        self.epoch += 1
+        for slot, _ in self._ready.values():
+            self._free_slots.append(slot)
+        self._ready = {}
+
+    def close(self):
+        """Stop workers and release shared memory"""
+        if self._workers is None:
+            return
+
+        for _ in self._workers:
+            self._tasks.put(None)
+        for worker in self._workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        self._workers = None
+
+        del self.x_ring, self.y_ring
+        for shm in (self._x_shm, self._y_shm):
+            shm.close()
+            shm.unlink()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def _prefetch_worker(X, y, augmentor, mixer, tasks, results, x_name, y_name,
+                     x_shape, y_shape, y_dtype, seed):
+    """
+    Worker loop: gather, augment and write batches into ring slots until None is received
+    """
+    x_shm = shared_memory.SharedMemory(name=x_name)
+    y_shm = shared_memory.SharedMemory(name=y_name)
+    x_ring = np.ndarray(x_shape, dtype=np.float32, buffer=x_shm.buf)
+    y_ring = np.ndarray(y_shape, dtype=y_dtype, buffer=y_shm.buf)
+
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+
+            epoch, batch_no, slot, batch_indices = task
+            n = len(batch_indices)
+
+            try:
+                rng = np.random.default_rng([seed, epoch, batch_no])
+                X_batch = np.asarray(X[batch_indices], dtype=np.float32)
+                y_batch = y[batch_indices]
+                if augmentor is not None:
+                    X_batch = augmentor.augment_batch(X_batch[..., 0], rng=rng)[..., np.newaxis]
+                if mixer is not None:
+                    X_batch, y_batch = mixer.mix_batch(X_batch, y_batch, rng=rng)
+
+                x_ring[slot, :n] = X_batch
+                y_ring[slot, :n] = y_batch
+            except Exception:
+                # Report instead of exiting silently, which would leave get() waiting forever
+                results.put((epoch, batch_no, slot, 0, traceback.format_exc()))
+                continue
+
+            results.put((epoch, batch_no, slot, n, None))
+    finally:
+        del x_ring, y_ring
+        x_shm.close()
+        y_shm.close()